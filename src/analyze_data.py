@@ -1,11 +1,18 @@
-from data.constants import PATH_DATA, PATH_IMAGE, CAR_SIZES  # Import the constants
+from data.fitness_table import FitnessTable, NB_GENOMES, genome_from_index, convert_results_to_table  # Scores of all the cars
+from data.landscape import FitnessLandscape  # To study the neighbours of the cars
+from other.utils import compute_detection_cone_points, point_out_of_window  # To compute the detection cones
+from data.constants import PATH_DATA, PATH_IMAGE, CAR_SIZES, NB_MAPS  # Import the constants
 from statistics import mean  # To use statistics on the data
+from game.track import Track  # To load the data of the maps
 import data.variables as var  # Import the variables
 import matplotlib.pyplot as plt  # To plot the boxplot
 import os  # To iterate over the files in a folder
 import numpy as np  # To use numpy arrays
+import random  # To choose random rays
 import pylab  # To use the boxplot
 import pygame  # To use pygame
+import math  # To compute distances
+import time  # To measure the time of the wall detection
 
 # Used to save image for LaTeX
 """
@@ -59,6 +66,32 @@ class BestCar:
         return self.tab[item]
 
 
+def read_scores_all_cars(num_map):
+    """
+    Read the scores of all the cars of a map in the fitness table (converted from the results of run_test_all_cars in main.py)
+
+    Args:
+        num_map (int): The number of the map
+
+    Returns:
+        list(list(int)): The dice values of the cars that have been simulated
+        list(float): The scores of these cars
+    """
+    scores = FitnessTable(num_map).scores
+    indexes = np.flatnonzero(~np.isnan(scores))  # Indexes of the cars that have been simulated
+    return [genome_from_index(index) for index in indexes.tolist()], scores[indexes].tolist()
+
+
+def convert_all_results_to_tables():
+    """
+    Convert the text files of the scores of all the cars (written by run_test_all_cars before the fitness tables) to
+    fitness tables. Their parameters are unknown, so the game never uses them instead of the simulation: run
+    run_test_all_cars to get tables that match the parameters of the maps (in 'all_cars/simulation/tables')
+    """
+    for num_map in range(NB_MAPS):
+        convert_results_to_table(num_map)
+
+
 def analyze_test_all_cars(num_map):
     """
     Analyze the data from the test file 'test_all_cars_X' created from the file main.py (with X the number of the map) and write the results in a file
@@ -74,26 +107,22 @@ def analyze_test_all_cars(num_map):
     cars = []  # List of all the cars [(x1, y1, x2, y2, x3, y3, score1), (x1, y1, x2, y2, x3, y3, score2), ...]
     best_cars = []  # List of the cars that completed a lap [(x1, y1, x2, y2, x3, y3, score1), (x1, y1, x2, y2, x3, y3, score2), ...]
 
-    with open(f'{PATH_DATA}tests/all_cars/results/{num_map}', 'r') as file_read:
-        for line in file_read:
-            data = line.split(' ')
+    if num_map == 5:
+        return  # We don't analyze the data of the map 5
 
-            # We get the score of the cars
-            if num_map == 5:
-                return  # We don't analyze the data of the map 5
-            else:
-                score = int(data[6][:-1])  # We remove
-            scores.append(score)  # We add the score to the list
-            cars.append(BestCar(data))
+    for dice_values, score in zip(*read_scores_all_cars(num_map)):
+        score = int(score)
+        scores.append(score)  # We add the score to the list
+        cars.append(BestCar(dice_values + [score]))
 
-            if score > nb_checkpoints:
-                best_cars.append(BestCar(data))
+        if score > nb_checkpoints:
+            best_cars.append(BestCar(dice_values + [score]))
 
-        # Sort the scores
-        scores.sort(reverse=True)  # We sort the scores in descending order
+    # Sort the scores
+    scores.sort(reverse=True)  # We sort the scores in descending order
 
-        # Sort the best cars by score
-        best_cars.sort(key=lambda x: x.score, reverse=True)
+    # Sort the best cars by score
+    best_cars.sort(key=lambda x: x.score, reverse=True)
 
     with open(f'{PATH_DATA}tests/all_cars/analysis/{num_map}', 'w') as file_write:
 
@@ -133,6 +162,43 @@ def analyze_test_all_cars(num_map):
             file_write.write(f'{car}\n')
 
 
+def analyze_landscape(num_map):
+    """
+    Analyze the landscape of the scores of all the cars of a map (local optima, basins of attraction, neutral networks,
+    change of the score with the mutations) and write the results in the file 'landscape_X'
+
+    Args:
+        num_map (int): The number of the map
+    """
+    landscape = FitnessLandscape(num_map)
+    name_parameters = ['Length slow', 'Length medium', 'Length fast', 'Width slow', 'Width medium', 'Width fast']
+
+    with open(f'{PATH_DATA}tests/all_cars/analysis/landscape_{num_map}', 'w') as file_write:
+        for kind in ['hamming', 'step']:
+            optima = landscape.local_optima(kind)
+            basins = landscape.basins(kind)
+            sizes_basins = np.bincount(basins[basins >= 0], minlength=NB_GENOMES)  # Number of cars in each basin
+            networks = landscape.neutral_networks(kind)
+            sizes_networks = np.bincount(networks[networks >= 0])
+            best_optimum = optima[landscape.scores[optima].argmax()]
+
+            file_write.write(f'Neighbours {kind}:\n')
+            file_write.write(f'Local optima : {len(optima)} (best : {genome_from_index(int(best_optimum))} '
+                             f'{landscape.scores[best_optimum]})\n')
+            file_write.write(f'Largest basin of attraction : {sizes_basins.max()} cars (basin of the best optimum : '
+                             f'{sizes_basins[best_optimum]} cars)\n')
+            file_write.write(f'Neutral networks : {np.count_nonzero(sizes_networks)} (largest : {sizes_networks.max()} cars)\n\n')
+
+        # Mean change of the score when a dice changes by 1, 2, 3, 4 or 5 (to choose the amplitudes of random_attribution)
+        file_write.write('Mean change of the score when a dice changes by 1, 2, 3, 4, 5:\n')
+        for name, changes in zip(name_parameters, landscape.score_changes()):
+            file_write.write(f'{name} : {" ".join(f"{change:.2f}" for change in changes)}\n')
+
+        file_write.write('\nMean gradient of the score along each dice:\n')
+        for name, gradient in zip(name_parameters, np.nanmean(landscape.gradient(), axis=0)):
+            file_write.write(f'{name} : {gradient:.2f}\n')
+
+
 def show_graph(num_map):
     """
     Show the graph of the scores
@@ -142,18 +208,13 @@ def show_graph(num_map):
     """
     scores = []  # List of the scores [score1, score2, ...]
 
-    with open(f'{PATH_DATA}tests/all_cars/results/{num_map}', 'r') as file_read:
-        for line in file_read:
-            data = line.split(' ')
-
-            # We get the score of the cars
-            if num_map == 5:
-                score = int(
-                    float(data[6][:-1]) / 100)  # We remove the \n and transform the score to a smaller value (int)
-                data[6] = str(score)  # We replace the score in the data
-            else:
-                score = int(data[6][:-1])  # We remove
-            scores.append(score)  # We add the score to the list of the
+    for score in read_scores_all_cars(num_map)[1]:
+        # We get the score of the cars
+        if num_map == 5:
+            score = int(score / 100)  # We transform the score to a smaller value (int)
+        else:
+            score = int(score)
+        scores.append(score)  # We add the score to the list of the
 
     # Sort the scores
     scores.sort(reverse=True)  # We sort the scores in descending order
@@ -230,23 +291,18 @@ def show_heat_map(num_map):
     scores = []  # List of the scores [score1, score2, ...]
     nb_checkpoints = number_checkpoints[num_map]  # The number of checkpoints of the map
 
-    with open(f'{PATH_DATA}tests/all_cars/results/{num_map}', 'r') as file_read:
-        for line in file_read:
-            data = line.split(' ')
+    if num_map == 5:
+        return
 
-            # We get the score of the cars
-            if num_map == 5:
-                return
-            else:
-                score = int(data[6][:-1])  # We remove
-
-            if score > nb_checkpoints:
-                scores.append(score // nb_checkpoints)  # We add the score to the list
-            else:
-                scores.append(score)  # We add the score to the list
+    for score in read_scores_all_cars(num_map)[1]:
+        score = int(score)
+        if score > nb_checkpoints:
+            scores.append(score // nb_checkpoints)  # We add the score to the list
+        else:
+            scores.append(score)  # We add the score to the list
 
-        # Sort the scores
-        scores.sort(reverse=True)  # We sort the scores in descending order
+    # Sort the scores
+    scores.sort(reverse=True)  # We sort the scores in descending order
 
     # Transform the scores to a 2D array of coordinates
     with open(f'{PATH_DATA}checkpoints/{num_map}', 'r') as file_read:
@@ -291,6 +347,80 @@ def show_heat_map(num_map):
     pygame.image.save(result_surface, f"images/background/heatmap_{num_map}.png")
 
 
+def detect_wall_pixel_walk(mask, front_of_car, point):
+    """
+    Detect if there is a wall between the front of the car and the point by checking all the pixels of the line (it's
+    the previous version of Car.detect_wall, used as reference to test Track.detect_wall)
+
+    Args:
+        mask (pygame.mask.Mask): mask of the walls
+        front_of_car (tuple(float, float)): the coordinates of the front of the car
+        point (tuple(float, float)): the coordinates of the point
+
+    Returns:
+        bool or float : False if there is no wall, else the distance between the front of the car and the wall
+    """
+    x1, y1 = front_of_car
+    x2, y2 = point
+
+    if x1 == x2:
+        for y in range(int(min(y1, y2)), int(max(y1, y2))):
+            if point_out_of_window((int(x1), y)) or mask.get_at((int(x1), y)):
+                return True
+        return False
+
+    a = (y2 - y1) / (x2 - x1)
+    b = y1 - a * x1
+    for x in range(int(min(x1, x2)), int(max(x1, x2))):
+        y = int(a * x + b)
+        if point_out_of_window((x, y)) or mask.get_at((x, y)):
+            return math.sqrt((x1 - x) ** 2 + (y1 - y) ** 2)
+    return False
+
+
+def analyze_wall_detection(num_map, nb_positions=10000):
+    """
+    Measure the speedup of the wall detection using the distances to the walls (Track.detect_wall) compared to the
+    pixel walk, and check that the results are the same. The rays are the detection cones of cars placed randomly on
+    the road. The results are written in the file 'wall_detection/X' (with X the number of the map)
+
+    Args:
+        num_map (int): The number of the map
+        nb_positions (int): The number of random positions (there are 3 rays per position)
+    """
+    track = Track(num_map)
+    random.seed(num_map)
+
+    # We place the cars randomly on the road with a random angle and a random cone
+    road = np.argwhere(~track.walls)  # Coordinates (y, x) of the pixels of the road
+    rays = []  # List of the rays [(front_of_car, point), ...]
+    for _ in range(nb_positions):
+        y, x = road[random.randrange(len(road))]
+        front_of_car = (x + random.random(), y + random.random())
+        width, length = random.randint(1, 6) * 16, random.randint(1, 6) * 11
+        for point in compute_detection_cone_points(random.uniform(0, 360), front_of_car, width, length):
+            rays.append((front_of_car, point))
+
+    time_before = time.perf_counter()
+    results_pixel_walk = [detect_wall_pixel_walk(track.mask, front_of_car, point) for front_of_car, point in rays]
+    time_pixel_walk = time.perf_counter() - time_before
+
+    time_before = time.perf_counter()
+    results_distances = [track.detect_wall(front_of_car, point) for front_of_car, point in rays]
+    time_distances = time.perf_counter() - time_before
+
+    # The results must be the same (within one pixel)
+    nb_differences = sum(bool(result_1) != bool(result_2) or abs(result_1 - result_2) > 1 for result_1, result_2 in zip(results_pixel_walk, results_distances))
+
+    with open(f'{PATH_DATA}tests/wall_detection/{num_map}', 'w') as file_write:
+        file_write.write(f'Number of rays : {len(rays)}\n')
+        file_write.write(f'Rays with a wall : {sum(bool(result) for result in results_pixel_walk)}\n')
+        file_write.write(f'Pixel walk : {time_pixel_walk / len(rays) * 1e6:.2f} us per ray\n')
+        file_write.write(f'Distances to the walls : {time_distances / len(rays) * 1e6:.2f} us per ray\n')
+        file_write.write(f'Speedup : {time_pixel_walk / time_distances:.2f}\n')
+        file_write.write(f'Rays with a different result : {nb_differences}\n')
+
+
 if __name__ == '__main__':
     for number_map in range(8):
         print(number_map)
@@ -1,3 +1,6 @@
+import hashlib  # To compute the hash of the parameters
+
+
 """
 This file contains data structures used in the project
 """
@@ -63,3 +66,95 @@ class MemoryCar:
         for score in self.best_scores:
             string += f' {score}'
         return string
+
+
+class SimulationParameters:
+    """
+    This class represents the physics parameters used to simulate the cars on a map. It's used by the headless simulation
+    so that a generation can be evaluated without the global variables of the game
+    """
+    def __init__(self, max_speed, turn_angle, acceleration, deceleration, drift_factor, width_cone, length_cone,
+                 time_generation, rain_mode=False, retirement=False, retirement_window=120, retirement_min_deviation=10):
+        """
+        Initialize the SimulationParameters object
+
+        Args:
+            max_speed (float): Maximum speed of the cars
+            turn_angle (float): Angle of rotation of the cars
+            acceleration (float): Acceleration of the cars
+            deceleration (float): Deceleration of the cars
+            drift_factor (float): Factor of the drift of the cars
+            width_cone (int): Width multiplier of the detection cones
+            length_cone (int): Length multiplier of the detection cones
+            time_generation (int): Time of a generation (in seconds, there are 60 ticks per second)
+            rain_mode (bool): True if the cars are drifting because of the rain
+            retirement (bool): True to stop simulating the cars that are stuck or going in the wrong way
+            retirement_window (int): Number of ticks over which the positions of a car are used to know if it is stuck
+            retirement_min_deviation (float): Standard deviation of the positions under which a car is stuck
+        """
+        self.max_speed, self.turn_angle = max_speed, turn_angle
+        self.acceleration, self.deceleration = acceleration, deceleration
+        self.drift_factor = drift_factor
+        self.width_cone, self.length_cone = width_cone, length_cone
+        self.time_generation, self.rain_mode = time_generation, rain_mode
+        self.retirement, self.retirement_window, self.retirement_min_deviation = retirement, retirement_window, retirement_min_deviation
+
+        self.min_medium_speed = max_speed / 3  # Minimum speed of the car to be considered as medium speed
+        self.min_high_speed = max_speed / 1.5  # Minimum speed of the car to be considered as high speed
+        self.nb_ticks = time_generation * 60  # Number of ticks of a generation
+
+    def __str__(self):
+        """
+        Return the string of the parameters
+        """
+        return f'SimulationParameters : max_speed = {self.max_speed} ; turn_angle = {self.turn_angle} ; ' \
+               f'acceleration = {self.acceleration} ; deceleration = {self.deceleration} ; drift_factor = {self.drift_factor} ; ' \
+               f'width_cone = {self.width_cone} ; length_cone = {self.length_cone} ; time_generation = {self.time_generation} ; ' \
+               f'rain_mode = {self.rain_mode} ; retirement = {self.retirement} ; retirement_window = {self.retirement_window} ; ' \
+               f'retirement_min_deviation = {self.retirement_min_deviation}'
+
+    def get_hash(self):
+        """
+        Return a hash of the parameters, it's the same in every execution of the program (used as a key of the scores)
+
+        Returns:
+            str: hash of the parameters
+        """
+        return hashlib.md5(str(self).encode()).hexdigest()[:16]
+
+
+class GeneticParameters:
+    """
+    This class represents the parameters of the genetic algorithm of a map. It's used by the populations evolved
+    without the global variables of the game (islands in worker processes)
+    """
+    def __init__(self, nb_cars, proportion_cars_kept, chance_crossover, chance_mutation, selection='roulette'):
+        """
+        Initialize the GeneticParameters object
+
+        Args:
+            nb_cars (int): Number of cars of the population
+            proportion_cars_kept (float): Proportion of the best cars kept for the next generation
+            chance_crossover (float): Chance of crossover of each pair of cars
+            chance_mutation (float): Chance of mutation of each dice
+            selection (str): Name of the selection of the cars copied for the next generation (see SELECTIONS in genetic_operators.py)
+        """
+        self.nb_cars, self.proportion_cars_kept = nb_cars, proportion_cars_kept
+        self.chance_crossover, self.chance_mutation = chance_crossover, chance_mutation
+        self.selection = selection
+
+    def __str__(self):
+        """
+        Return the string of the parameters
+        """
+        return f'GeneticParameters : nb_cars = {self.nb_cars} ; proportion_cars_kept = {self.proportion_cars_kept} ; ' \
+               f'chance_crossover = {self.chance_crossover} ; chance_mutation = {self.chance_mutation} ; selection = {self.selection}'
+
+    def get_nb_cars_kept(self):
+        """
+        Get the number of cars kept for the next generation (like find_cars_to_keep in genetic_algorithm.py)
+
+        Returns:
+            int: number of cars kept (between 1 and nb_cars)
+        """
+        return max(min(int(self.proportion_cars_kept * self.nb_cars), self.nb_cars), 1)
@@ -0,0 +1,238 @@
+from data.constants import PATH_DATA  # Import the constants
+import numpy as np  # To store the scores in a binary file
+import os  # To check if the fitness table exists
+
+
+"""
+This file contains the class FitnessTable used to read the scores of all the possible cars of a map in a binary file.
+There are only 6^6 = 46656 different genetics, so the score of each genetic is stored at the index of its dice values
+written in base 6. The file starts with a header of HEADER_SIZE bytes (text) describing the parameters of the simulation
+used to compute the scores, then the scores are stored as float64 (NaN if the car has not been simulated)
+"""
+
+
+NB_GENOMES = 6 ** 6  # Number of different genetics
+HEADER_SIZE = 1024  # Size of the header of the files (in bytes)
+HEADER_START = 'FITNESS_TABLE'  # First word of the header of the files
+UNKNOWN_HASH = 'unknown'  # Hash written when the parameters used to compute the scores are unknown (never matches)
+NB_GENOMES_CHECKED = 20  # Number of genetics simulated again to check that the scores of a table are the ones of the simulation
+TABLES_CHECKED = {}  # Result of the check of the tables already opened {(number of the map, hash, time of modification): bool}
+
+
+def genome_index(dice_values):
+    """
+    Get the index of a genetic in the table (its dice values minus 1 written in base 6)
+
+    Args:
+        dice_values (list(int)): the dice values of the genetic (between 1 and 6)
+
+    Returns:
+        int: index of the genetic (between 0 and 6^6 - 1)
+    """
+    index = 0
+    for value in dice_values:
+        index = index * 6 + value - 1
+    return index
+
+
+def genome_from_index(index):
+    """
+    Get the dice values of the genetic at this index of the table
+
+    Args:
+        index (int): index of the genetic (between 0 and 6^6 - 1)
+
+    Returns:
+        list(int): the dice values of the genetic
+    """
+    dice_values = []
+    for _ in range(6):
+        index, value = divmod(index, 6)
+        dice_values.append(value + 1)
+    return dice_values[::-1]
+
+
+def get_path_table(num_map, simulated=False):
+    """
+    Args:
+        num_map (int): number of the map
+        simulated (bool): True for the table written by run_test_all_cars ('all_cars/simulation/tables/X'), False for
+        the table converted from the text results ('all_cars/tables/X')
+
+    Returns:
+        str: path of the fitness table of the map
+    """
+    if simulated:
+        return f'{PATH_DATA}tests/all_cars/simulation/tables/{num_map}'
+    return f'{PATH_DATA}tests/all_cars/tables/{num_map}'
+
+
+def read_header(path):
+    """
+    Read the header of a fitness table (without reading the scores)
+
+    Args:
+        path (str): path of the file
+
+    Returns:
+        int: number of the map
+        str: hash of the parameters used to compute the scores
+        str: parameters used to compute the scores (text)
+    """
+    with open(path, 'rb') as file_table_read:
+        header = file_table_read.read(HEADER_SIZE).rstrip(b'\0').decode().split('\n')
+    if header[0] != HEADER_START:
+        raise ValueError(f'{path} is not a fitness table')
+    return int(header[1].split(' = ')[1]), header[2].split(' = ')[1], header[3]
+
+
+def write_fitness_table(path, num_map, parameters, scores):
+    """
+    Write a fitness table
+
+    Args:
+        path (str): path of the file
+        num_map (int): number of the map
+        parameters (SimulationParameters): parameters of the simulation used to compute the scores (None if unknown)
+        scores (numpy.ndarray): score of each genetic, at its index (NaN if it has not been simulated)
+    """
+    if parameters is None:
+        header = f'{HEADER_START}\nnum_map = {num_map}\nhash = {UNKNOWN_HASH}\nUnknown parameters\n'.encode()
+    else:
+        header = f'{HEADER_START}\nnum_map = {num_map}\nhash = {parameters.get_hash()}\n{parameters}\n'.encode()
+    if len(header) > HEADER_SIZE:
+        raise ValueError(f'The header of the fitness table is too long ({len(header)} bytes)')
+
+    with open(path, 'wb') as file_table_write:
+        file_table_write.write(header.ljust(HEADER_SIZE, b'\0'))
+        file_table_write.write(np.asarray(scores, dtype=np.float64).tobytes())
+
+
+def convert_results_to_table(num_map):
+    """
+    Convert the text file of the scores of all the cars ('all_cars/results/X', written by run_test_all_cars before the
+    fitness tables) to a fitness table ('all_cars/tables/X'). The text file doesn't say which parameters of the simulation were used, so the
+    table never matches any parameters (it can be analyzed but it never replaces the simulation)
+
+    Args:
+        num_map (int): number of the map
+    """
+    scores = np.full(NB_GENOMES, np.nan)
+    with open(f'{PATH_DATA}tests/all_cars/results/{num_map}', 'r') as file_read:
+        """
+        Format of the file:
+        d1 d2 d3 d4 d5 d6 score
+        ...
+        """
+        for line in file_read:
+            data = line.split()
+            if data:
+                scores[genome_index([int(value) for value in data[:6]])] = float(data[6])
+
+    write_fitness_table(get_path_table(num_map), num_map, None, scores)
+
+
+class FitnessTable:
+    """
+    Scores of all the cars of a map, read from the binary file without loading it (numpy.memmap)
+    """
+    def __init__(self, num_map=None, path=None):
+        """
+        Open the fitness table of a map
+
+        Args:
+            num_map (int): number of the map (used to find the file if the path is None)
+            path (str): path of the file
+        """
+        self.path = get_path_table(num_map) if path is None else path  # Path of the file
+        # Number of the map, hash of the parameters used to compute the scores and parameters (text)
+        self.num_map, self.hash_parameters, self.parameters = read_header(self.path)
+        self.scores = np.memmap(self.path, dtype=np.float64, mode='r', offset=HEADER_SIZE, shape=(NB_GENOMES,))  # Score of each genetic
+
+    def __str__(self):
+        """
+        Return the string representation of the table
+
+        Return:
+            str: string representation of the table
+        """
+        return f'FitnessTable of the map {self.num_map} ; {self.parameters}'
+
+    def close(self):
+        """
+        Release the scores of the file (the table can't be used anymore)
+        """
+        self.scores = None
+
+    def get_score(self, dice_values):
+        """
+        Get the score of a car
+
+        Args:
+            dice_values (list(int)): the dice values of the car
+
+        Returns:
+            float: the score of the car (NaN if it has not been simulated)
+        """
+        return float(self.scores[genome_index(dice_values)])
+
+    def match(self, parameters):
+        """
+        Check if the scores have been computed with these parameters
+
+        Args:
+            parameters (SimulationParameters): parameters of the simulation
+
+        Returns:
+            bool: True if the parameters are the same (False if the parameters of the table are unknown)
+        """
+        return self.hash_parameters != UNKNOWN_HASH and parameters.get_hash() == self.hash_parameters
+
+    def check(self, simulation, number=NB_GENOMES_CHECKED):
+        """
+        Check that the scores of the table are the ones of the simulation: the table must match the parameters of the
+        simulation, and random genetics of the table are simulated again and must get the same scores
+
+        Args:
+            simulation (Simulation): the headless simulation of the map
+            number (int): number of genetics simulated again
+
+        Returns:
+            bool: True if the table can be used instead of the simulation
+        """
+        if not self.match(simulation.parameters):
+            return False
+        indexes = np.flatnonzero(~np.isnan(self.scores))  # Genetics that have been simulated
+        if len(indexes) == 0:
+            return False
+        indexes = np.random.default_rng().choice(indexes, size=min(number, len(indexes)), replace=False)
+        genomes = [genome_from_index(index) for index in indexes.tolist()]
+        return all(score == self.scores[index] for index, score in zip(indexes.tolist(), simulation.evaluate(genomes)))
+
+
+def open_checked_table(num_map, simulation):
+    """
+    Open the fitness table written by run_test_all_cars for a map if it can be used instead of the simulation. The hash
+    of the header is read first, then a sample of the table is simulated again (only the first time the table is opened
+    with these parameters)
+
+    Args:
+        num_map (int): number of the map
+        simulation (Simulation): the headless simulation of the map
+
+    Returns:
+        FitnessTable: the table (to close after use), None if the scores have to be simulated
+    """
+    path = get_path_table(num_map, simulated=True)
+    hash_parameters = simulation.parameters.get_hash()
+    if not os.path.exists(path) or read_header(path)[1] != hash_parameters:
+        return None
+
+    fitness_table = FitnessTable(path=path)
+    key = (num_map, hash_parameters, os.path.getmtime(path))  # The table can be written again by run_test_all_cars
+    if key not in TABLES_CHECKED:
+        TABLES_CHECKED[key] = fitness_table.check(simulation)
+    if not TABLES_CHECKED[key]:
+        fitness_table.close()
+        return None
+    return fitness_table
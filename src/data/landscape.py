@@ -0,0 +1,197 @@
+from game.genetic_operators import POWERS_GENOME  # Weight of each dice in the index of a genetic
+from data.fitness_table import FitnessTable, NB_GENOMES  # Scores of all the cars
+import numpy as np  # To compute the landscape of all the cars at once
+
+
+"""
+This file contains the class FitnessLandscape used to study the scores of all the cars of a map as a landscape on the
+grid of the dice values (6 dice between 1 and 6, so 6^6 cars). Two cars are neighbours if they only differ by one dice:
+by any value ('hamming', 30 neighbours, what a crossover or a big mutation can do) or by one unit ('step', at most 12
+neighbours, what a small mutation of random_attribution does). The neighbours of all the cars are computed once, so the
+local optima, the basins of attraction and the neutral networks of the whole map are numpy operations
+"""
+
+
+DIGITS = np.arange(NB_GENOMES)[:, None] // POWERS_GENOME % 6  # Dice values minus 1 of each genetic, shape (NB_GENOMES, 6)
+
+
+def compute_neighbours(kind):
+    """
+    Compute the neighbours of all the genetics
+
+    Args:
+        kind (str): 'hamming' (one dice changed to any value) or 'step' (one dice changed by 1)
+
+    Returns:
+        numpy.ndarray: indexes of the neighbours of each genetic, -1 if the neighbour is outside the grid,
+        shape (NB_GENOMES, 30) or (NB_GENOMES, 12)
+    """
+    changes = np.arange(1, 6) if kind == 'hamming' else np.array([-1, 1])  # Changes of the value of the dice
+    neighbours = []
+    for dice in range(6):
+        for change in changes:
+            value = DIGITS[:, dice] + change
+            if kind == 'hamming':
+                value %= 6  # The 5 other values of the dice
+            neighbour = np.arange(NB_GENOMES) + (value - DIGITS[:, dice]) * POWERS_GENOME[dice]
+            neighbours.append(np.where((value >= 0) & (value < 6), neighbour, -1))
+    return np.stack(neighbours, axis=1)
+
+
+class FitnessLandscape:
+    """
+    Landscape of the scores of all the cars of a map
+    """
+    def __init__(self, num_map=None, scores=None):
+        """
+        Initialization of the landscape
+
+        Args:
+            num_map (int): number of the map (used to read its fitness table if the scores are None)
+            scores (numpy.ndarray): score of each genetic at its index (NaN if it has not been simulated)
+        """
+        self.scores = np.array(FitnessTable(num_map).scores if scores is None else scores, dtype=np.float64)  # Score of each genetic
+        self.neighbours = {}  # Neighbours of each genetic for each kind of neighbourhood (computed when needed)
+
+    def get_neighbours(self, kind='hamming'):
+        """
+        Args:
+            kind (str): 'hamming' or 'step' (see compute_neighbours)
+
+        Returns:
+            numpy.ndarray: indexes of the neighbours of each genetic (-1 if outside the grid)
+        """
+        if kind not in self.neighbours:
+            self.neighbours[kind] = compute_neighbours(kind)
+        return self.neighbours[kind]
+
+    def get_neighbour_scores(self, kind='hamming'):
+        """
+        Args:
+            kind (str): 'hamming' or 'step'
+
+        Returns:
+            numpy.ndarray: score of each neighbour of each genetic (NaN if outside the grid or not simulated)
+        """
+        neighbours = self.get_neighbours(kind)
+        return np.where(neighbours >= 0, self.scores[neighbours], np.nan)
+
+    def nearest_neighbours(self, index, k, metric='l1'):
+        """
+        Get the k genetics closest to a genetic (the genetic itself is not included)
+
+        Args:
+            index (int): index of the genetic
+            k (int): number of neighbours
+            metric (str): 'l1' (sum of the differences of the dice) or 'hamming' (number of different dice)
+
+        Returns:
+            numpy.ndarray: indexes of the neighbours, from the closest to the farthest (the order of the indexes for
+            the neighbours at the same distance)
+        """
+        differences = DIGITS - DIGITS[index]
+        distances = np.abs(differences).sum(axis=1) if metric == 'l1' else (differences != 0).sum(axis=1)
+        distances[index] = distances.max() + 1  # The genetic is not its own neighbour
+        return np.argsort(distances, kind='stable')[:k]
+
+    def hamming_ball(self, index, radius):
+        """
+        Args:
+            index (int): index of the genetic
+            radius (int): maximum number of different dice
+
+        Returns:
+            numpy.ndarray: indexes of the genetics with at most radius different dice (the genetic included)
+        """
+        return np.flatnonzero((DIGITS != DIGITS[index]).sum(axis=1) <= radius)
+
+    def local_optima(self, kind='hamming', strict=False):
+        """
+        Find the local optima: the genetics with a score greater or equal to the score of all their neighbours
+
+        Args:
+            kind (str): 'hamming' or 'step'
+            strict (bool): True if the score must be greater than the score of all the neighbours
+
+        Returns:
+            numpy.ndarray: indexes of the local optima
+        """
+        best_neighbours = np.nan_to_num(self.get_neighbour_scores(kind), nan=-np.inf).max(axis=1)
+        optima = self.scores > best_neighbours if strict else self.scores >= best_neighbours
+        return np.flatnonzero(optima & ~np.isnan(self.scores))
+
+    def basins(self, kind='hamming'):
+        """
+        Find the basin of attraction of each genetic: the local optimum reached by moving to the best neighbour while it
+        is better (steepest ascent)
+
+        Args:
+            kind (str): 'hamming' or 'step'
+
+        Returns:
+            numpy.ndarray: index of the local optimum reached from each genetic (the genetic itself if it has no better
+            neighbour, -1 if it has not been simulated)
+        """
+        neighbour_scores = np.nan_to_num(self.get_neighbour_scores(kind), nan=-np.inf)
+        best = neighbour_scores.argmax(axis=1)
+        better = neighbour_scores[np.arange(NB_GENOMES), best] > self.scores
+        climb = np.where(better, self.get_neighbours(kind)[np.arange(NB_GENOMES), best], np.arange(NB_GENOMES))
+
+        while True:  # Pointer jumping: the number of iterations is the logarithm of the length of the longest climb
+            next_climb = climb[climb]
+            if (next_climb == climb).all():
+                break
+            climb = next_climb
+        return np.where(np.isnan(self.scores), -1, climb)
+
+    def neutral_networks(self, kind='hamming', tolerance=0):
+        """
+        Find the neutral networks: the groups of genetics connected by neighbours with the same score (the mutations
+        inside a network don't change the score)
+
+        Args:
+            kind (str): 'hamming' or 'step'
+            tolerance (float): maximum difference of score between two neighbours of the same network
+
+        Returns:
+            numpy.ndarray: number of the network of each genetic (the smallest index of the network, -1 if the genetic
+            has not been simulated)
+        """
+        neighbours = self.get_neighbours(kind)
+        neutral = np.abs(self.get_neighbour_scores(kind) - self.scores[:, None]) <= tolerance  # False for NaN
+        linked = np.where(neutral, neighbours, np.arange(NB_GENOMES)[:, None])  # The genetic itself if not neutral
+
+        networks = np.arange(NB_GENOMES)
+        while True:  # Each genetic takes the smallest number of its neutral neighbours until no number changes
+            next_networks = np.minimum(networks, networks[linked].min(axis=1))
+            next_networks = next_networks[next_networks]  # Pointer jumping to propagate the numbers faster
+            if (next_networks == networks).all():
+                break
+            networks = next_networks
+        return np.where(np.isnan(self.scores), -1, networks)
+
+    def gradient(self):
+        """
+        Get the gradient of the score along each dice (centered difference inside the grid, one-sided on the borders)
+
+        Returns:
+            numpy.ndarray: derivative of the score of each genetic along each dice, shape (NB_GENOMES, 6)
+        """
+        grid = self.scores.reshape((6,) * 6)
+        return np.stack([np.gradient(grid, axis=dice).ravel() for dice in range(6)], axis=1)
+
+    def score_changes(self):
+        """
+        Get the mean absolute change of the score when a dice changes by 1, 2, 3, 4 or 5 (used to choose the amplitudes
+        of the mutations of random_attribution)
+
+        Returns:
+            numpy.ndarray: mean absolute change of the score for each dice and each change, shape (6, 5)
+        """
+        grid = self.scores.reshape((6,) * 6)
+        changes = np.zeros((6, 5))
+        for dice in range(6):
+            for change in range(1, 6):
+                differences = np.abs(np.take(grid, range(change, 6), axis=dice) - np.take(grid, range(6 - change), axis=dice))
+                changes[dice, change - 1] = np.nanmean(differences)
+        return changes
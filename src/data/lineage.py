@@ -0,0 +1,237 @@
+from game.genetic_operators import OPERATOR_RANDOM, OPERATOR_KEPT  # Operators that created the cars
+from data.fitness_table import NB_GENOMES  # Number of different genetics
+from data.constants import PATH_DATA  # Import the constants
+import numpy as np  # To store the records in a binary file
+import os  # To check if the file of the lineage exists
+
+
+"""
+This file contains the class LineageStore used to save every car evaluated by the genetic algorithm with its parents.
+The file is append-only and each car is a record of RECORD_DTYPE.itemsize bytes, its id is its position in the file.
+The records are written by blocks of SIZE_BUFFER, and two indexes are built in memory (the records of each generation
+follow each other in the file, and the records of each genetic are found with a sort of the genetics), so the queries
+(ancestry of a car, first car reaching a score...) are numpy operations on the whole store
+"""
+
+
+PATH_LINEAGE = f'{PATH_DATA}lineage'  # Path of the file of the lineage
+RECORD_DTYPE = np.dtype([('genome', '<u2'),  # Index of the genetic (see data.fitness_table.genome_index)
+                         ('parent_1', '<i4'), ('parent_2', '<i4'),  # Ids of the parents (-1 if there is no parent)
+                         ('operators', 'u1'),  # Operators that created the car (see OPERATOR_CROSSOVER... in genetic_operators.py)
+                         ('num_map', 'u1'),  # Number of the map
+                         ('run', '<u4'),  # Number of the run (a run starts with random cars)
+                         ('generation', '<u4'),  # Number of the generation in the run
+                         ('score', '<f8')])  # Score of the car
+SIZE_BUFFER = 4096  # Number of records kept in memory before being written in the file
+
+
+class LineageStore:
+    """
+    Lineage of all the cars evaluated, saved in a binary file
+    """
+    def __init__(self, path=PATH_LINEAGE):
+        """
+        Initialization of the store (the file is read the first time the store is used)
+
+        Args:
+            path (str): path of the file of the lineage
+        """
+        self.path = path  # Path of the file
+        self.chunks = None  # Arrays of the records (the records of the file, then the records added), None if not loaded
+        self.nb_records = 0  # Number of records
+        self.nb_written = 0  # Number of records written in the file
+        self.run = 0  # Number of the current run
+
+        self.generations = {}  # Index by generation {(run, generation): (id of the first record, id after the last record)}
+        self.genome_order = None  # Ids of the records sorted by genetic (index by genetic)
+        self.genome_starts = None  # Position in genome_order of the first record of each genetic
+
+        self.last_ids = {}  # Ids of the cars of the last generation recorded {genetic index: id} (the parents of the next)
+        self.pending = {}  # Parents of the cars of the next generation {genetic index: (parent_1, parent_2, operators)}
+
+    def __len__(self):
+        """
+        Returns:
+            int: number of records
+        """
+        if self.chunks is None:
+            self.load()
+        return self.nb_records
+
+    @property
+    def records(self):
+        """
+        Returns:
+            numpy.ndarray: all the records (of RECORD_DTYPE)
+        """
+        if self.chunks is None:
+            self.load()
+        if len(self.chunks) > 1:
+            self.chunks = [np.concatenate(self.chunks)]
+        return self.chunks[0]
+
+    def load(self):
+        """
+        Read the records of the file and build the index by generation
+        """
+        records = np.fromfile(self.path, dtype=RECORD_DTYPE) if os.path.exists(self.path) else np.zeros(0, RECORD_DTYPE)
+        self.chunks, self.nb_records, self.nb_written = [records], len(records), len(records)
+        self.run = int(records['run'].max()) if len(records) else 0
+
+        # The records of a generation are written together, so a generation starts where the run or the generation changes
+        changes = np.flatnonzero((np.diff(records['run'].astype(np.int64)) != 0) |
+                                 (np.diff(records['generation'].astype(np.int64)) != 0)) + 1
+        starts, stops = np.concatenate(([0], changes)), np.concatenate((changes, [len(records)]))
+        self.generations = {(int(records['run'][start]), int(records['generation'][start])): (int(start), int(stop))
+                            for start, stop in zip(starts, stops) if start < stop}
+
+    def start_run(self):
+        """
+        Start a new run (the next generation recorded has random cars)
+        """
+        if self.chunks is None:
+            self.load()
+        self.run += 1
+        self.last_ids, self.pending = {}, {}
+
+    def set_offspring(self, indexes, parents, operators, indexes_kept):
+        """
+        Remember the parents of the cars of the next generation (they are recorded when they are evaluated)
+
+        Args:
+            indexes (numpy.ndarray): indexes of the genetics of the new cars
+            parents (numpy.ndarray): positions in indexes_kept of the two parents of each new car (-1 if no parent)
+            operators (numpy.ndarray): operators that created each new car
+            indexes_kept (list(int)): indexes of the genetics of the cars kept (they are also in the next generation)
+        """
+        ids_kept = np.array([self.last_ids.get(index, -1) for index in indexes_kept] + [-1], dtype=np.int64)  # -1 for parents[i] == -1
+        ids_parents = ids_kept[parents]
+        self.pending = {index: (parent_1, parent_2, operator) for index, (parent_1, parent_2), operator
+                        in zip(np.asarray(indexes).tolist(), ids_parents.tolist(), np.asarray(operators).tolist())}
+        for index, id_kept in zip(indexes_kept, ids_kept.tolist()):
+            self.pending[index] = (id_kept, -1, OPERATOR_KEPT)
+
+    def record_generation(self, indexes, scores, num_map, generation):
+        """
+        Add the cars of a generation evaluated
+
+        Args:
+            indexes (list(int)): indexes of the genetics of the cars
+            scores (list): score of each car
+            num_map (int): number of the map
+            generation (int): number of the generation in the run
+
+        Returns:
+            numpy.ndarray: ids of the records of the cars
+        """
+        start = len(self)
+        self.nb_records += len(indexes)
+        records = np.zeros(len(indexes), dtype=RECORD_DTYPE)
+        records['genome'], records['score'] = indexes, scores
+        records['num_map'], records['run'], records['generation'] = num_map, self.run, generation
+        parents = [self.pending.get(index, (-1, -1, OPERATOR_RANDOM)) for index in indexes]
+        if parents:
+            records['parent_1'], records['parent_2'], records['operators'] = zip(*parents)
+
+        self.chunks.append(records)
+        self.generations[(self.run, generation)] = (start, start + len(records))
+        if len(self) - self.nb_written >= SIZE_BUFFER:
+            self.flush()
+
+        ids = np.arange(start, start + len(records))
+        self.last_ids, self.pending = dict(zip(indexes, ids.tolist())), {}
+        return ids
+
+    def flush(self):
+        """
+        Write the records that are not in the file yet
+        """
+        if self.chunks is None or len(self) == self.nb_written:
+            return
+        with open(self.path, 'ab') as file_lineage_write:
+            self.records[self.nb_written:].tofile(file_lineage_write)
+        self.nb_written = len(self)
+
+    def get_generation(self, run, generation):
+        """
+        Args:
+            run (int): number of the run
+            generation (int): number of the generation in the run
+
+        Returns:
+            numpy.ndarray: ids of the records of the generation
+        """
+        return np.arange(*self.generations.get((run, generation), (0, 0)))
+
+    def get_genome(self, index):
+        """
+        Args:
+            index (int): index of a genetic
+
+        Returns:
+            numpy.ndarray: ids of the records of the cars with this genetic (in the order of the records)
+        """
+        records = self.records
+        if self.genome_order is None or self.genome_starts[-1] != len(records):  # The index by genetic is rebuilt with the new records
+            self.genome_order = np.argsort(records['genome'], kind='stable')
+            self.genome_starts = np.searchsorted(records['genome'][self.genome_order], np.arange(NB_GENOMES + 1))
+        return self.genome_order[self.genome_starts[index]:self.genome_starts[index + 1]]
+
+    def get_ancestry(self, id_record, max_depth=None):
+        """
+        Get the ancestors of a car (its parents, the parents of its parents...)
+
+        Args:
+            id_record (int): id of the record of the car
+            max_depth (int): maximum number of generations of ancestors (None for all the ancestors)
+
+        Returns:
+            numpy.ndarray: ids of the records of the ancestors (from the oldest to the most recent)
+        """
+        records = self.records
+        visited = np.zeros(len(records), dtype=bool)
+        frontier = np.array([id_record])
+        depth = 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            parents = np.concatenate((records['parent_1'][frontier], records['parent_2'][frontier]))
+            parents = np.unique(parents[parents >= 0])
+            frontier = parents[~visited[parents]]
+            visited[frontier] = True
+            depth += 1
+        return np.flatnonzero(visited)
+
+    def get_best(self, run=None):
+        """
+        Args:
+            run (int): number of the run (None for the current run)
+
+        Returns:
+            int: id of the record of the best car of the run (the first one if there are several), None if no car
+        """
+        records = self.records
+        ids = np.flatnonzero(records['run'] == (self.run if run is None else run))
+        return int(ids[records['score'][ids].argmax()]) if len(ids) else None
+
+    def get_first(self, min_score, num_map=None, run=None):
+        """
+        Get the first car that reached a score (for example the first car that completed a lap)
+
+        Args:
+            min_score (float): score to reach
+            num_map (int): number of the map (None for all the maps)
+            run (int): number of the run (None for all the runs)
+
+        Returns:
+            int: id of the record of the first car with a score greater or equal to min_score (None if no car)
+        """
+        records = self.records
+        found = records['score'] >= min_score
+        if num_map is not None:
+            found &= records['num_map'] == num_map
+        if run is not None:
+            found &= records['run'] == run
+        ids = np.flatnonzero(found)
+        return int(ids[0]) if len(ids) else None
+
+
+LINEAGE = LineageStore()  # Lineage of the cars of the game
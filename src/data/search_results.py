@@ -0,0 +1,124 @@
+from data.constants import PATH_DATA  # Import the constants
+import numpy as np  # To compute the statistics of the runs
+import ast  # To read the values of the parameters written in the file
+import os  # To check if the file of the results exists
+
+
+"""
+This file contains the class SearchResults used to save the results of the search of the genetic parameters. Each run
+of the genetic algorithm (a configuration of the genetic parameters and a seed) is a line appended to the file, so a
+search stopped can be continued without running again the runs already done, and the configurations can be compared
+with any number of seeds
+"""
+
+
+class SearchResults:
+    """
+    Number of generations to complete a lap of each run of the search, saved in a text file (one file for each map and
+    each parameters of the simulation)
+    """
+    def __init__(self, num_map, hash_parameters):
+        """
+        Initialization of the results (the file is read the first time the results are used)
+
+        Args:
+            num_map (int): number of the map
+            hash_parameters (str): hash of the parameters of the simulation (the results depend on it)
+        """
+        self.path = f'{PATH_DATA}tests/genetic_parameters/search_{num_map}_{hash_parameters}'  # Path of the file
+        self.results = None  # Generations of each run {configuration key: {seed: generation}}, None if not loaded
+
+    def __len__(self):
+        """
+        Returns:
+            int: number of runs saved
+        """
+        return sum(len(generations) for generations in self.get_results().values())
+
+    @staticmethod
+    def get_key(configuration):
+        """
+        Args:
+            configuration (dict): value of each genetic parameter {name of the variable: value}
+
+        Returns:
+            tuple: key of the configuration (the parameters sorted by name)
+        """
+        return tuple(sorted(configuration.items()))
+
+    def get_results(self):
+        """
+        Returns:
+            dict: generations of each run {configuration key: {seed: generation}}
+        """
+        if self.results is None:
+            self.load()
+        return self.results
+
+    def load(self):
+        """
+        Read the runs of the file, each line is 'NAME=value ... seed generation'
+        """
+        self.results = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as file_results_read:
+            for line in file_results_read:
+                *parameters, seed, generation = line.split()
+                configuration = {name: ast.literal_eval(value) for name, value in (parameter.split('=') for parameter in parameters)}
+                self.results.setdefault(self.get_key(configuration), {})[int(seed)] = int(generation)
+
+    def add(self, configuration, seed, generation):
+        """
+        Save a run (written immediately in the file)
+
+        Args:
+            configuration (dict): value of each genetic parameter {name of the variable: value}
+            seed (int): seed of the run
+            generation (int): number of the generation where a car completed a lap (25 if no car did)
+        """
+        key = self.get_key(configuration)
+        self.get_results().setdefault(key, {})[seed] = generation
+        with open(self.path, 'a') as file_results_write:
+            file_results_write.write(f'{" ".join(f"{name}={value!r}" for name, value in key)} {seed} {generation}\n')
+
+    def get_generations(self, configuration, nb_seeds=None):
+        """
+        Args:
+            configuration (dict): value of each genetic parameter
+            nb_seeds (int): only the runs with a seed lower than nb_seeds are used (None for all the runs)
+
+        Returns:
+            dict: generation of each run of the configuration {seed: generation}
+        """
+        generations = self.get_results().get(self.get_key(configuration), {})
+        return {seed: generation for seed, generation in generations.items() if nb_seeds is None or seed < nb_seeds}
+
+    def get_score(self, configuration, nb_seeds=None):
+        """
+        Args:
+            configuration (dict): value of each genetic parameter
+            nb_seeds (int): only the runs with a seed lower than nb_seeds are used (None for all the runs)
+
+        Returns:
+            float: mean number of generations to complete a lap (NaN if there is no run)
+        """
+        generations = list(self.get_generations(configuration, nb_seeds).values())
+        return float(np.mean(generations)) if generations else np.nan
+
+    def get_best(self, number=None, min_seeds=1):
+        """
+        Get the configurations that complete a lap the fastest
+
+        Args:
+            number (int): number of configurations returned (None for all the configurations)
+            min_seeds (int): minimum number of runs of a configuration to be compared
+
+        Returns:
+            list: the best configurations (configuration, mean number of generations, number of runs), from the best
+            to the worst
+        """
+        best = [(dict(key), float(np.mean(list(generations.values()))), len(generations))
+                for key, generations in self.get_results().items() if len(generations) >= min_seeds]
+        best.sort(key=lambda result: result[1])
+        return best[:number]
@@ -1,5 +1,6 @@
 from data.constants import NB_MAPS  # Import the constants
 import pygame  # To use pygame
+import os  # To get the number of cores
 
 
 """
@@ -61,6 +62,8 @@ PLAY = False  # Play the game
 CHANGE_GENERATION = False  # True if we want to change the generation
 PLAY_LAST_RUN = False  # True if we want to play the last run again
 LAST_RUN_PLAYING = False  # True if we are playing the last run
+FAST_FORWARD = False  # True if we want to skip generations without display (activated with the key F)
+NB_GENERATIONS_FAST_FORWARD = 30  # Number of generations skipped by the fast-forward
 RAIN_MODE = False  # True if we are in the rain mode (the car are drifting)
 
 
@@ -92,6 +95,12 @@ LIST_DRIFT_FACTOR = [2.0] * NB_MAPS  # Factor of the drift for each map
 DRIFT_FACTOR = None  # Factor of the drift for the current map
 
 
+# RETIREMENT
+RETIREMENT = False  # True to stop simulating the cars that are stuck or going in the wrong way before the end of the generation
+RETIREMENT_WINDOW = 120  # Number of ticks over which the positions of a car are used to know if it is stuck
+RETIREMENT_MIN_DEVIATION = 10  # Standard deviation (in pixels) of the positions under which a car is stuck (it turns around the same point)
+
+
 # DEBUG
 SHOW_CLICS_INFO = False  # True to see the cursor position and color when clicking
 SHOW_DETECTION_CONES = False  # True to see the detection cones of the cars
@@ -101,13 +110,15 @@ SHOW_DETECTION_CONES = False  # True to see the detection cones of the cars
 TEST_ALL_CARS = False  # True to test all the cars
 TEST_MUTATION_CROSSOVER = False  # True to test the mutation and crossover
 TEST_VALUE_GENETIC_PARAMETERS = False  # True to test the value of the genetic parameters
-TEST_FINISHED = False  # True if a car completed a lap
+TEST_STEADY_STATE = False  # True to test the steady-state genetic algorithm with each replacement policy
+TEST_SEARCH_GENETIC_PARAMETERS = False  # True to search the best genetic parameters with successive halving
+STOP_COLLAPSED_TESTS = False  # True to stop the runs of the tests when the diversity of the population has collapsed (the run counts as 25 generations)
 TEST_MODE = ''  # Mode of the test ('mutation_only' or 'crossover_mutation')
-FILE_TEST = None  # File to save the results of the tests (it's the same object for all the tests)
 
 
 # CHECKPOINTS
 NUM_MAP = 0  # Number of the map
+TRACK = None  # Data of the current map used to simulate the cars (see game/track.py)
 CHANGE_CHECKPOINTS = False  # Change the checkpoint for the actual map (erase the checkpoints !)
 CHECKPOINTS = None  # List of checkpoints for the current map
 RADIUS_CHECKPOINT = None  # Radius of the checkpoints
@@ -121,6 +132,11 @@ TICKS_REMAINING = 0  # Iterations remaining for the genetic algorithm
 TIME_LAST_TURN = 0  # Time of the last turn (to compute the FPS or limit it)
 FPS_TOO_HIGH = False  # True if the FPS is too high (when it's the case we don't play and wait for it to become False)
 LAST_TIME_REMAINING = []  # List of the remaining time during the last turns (used to compute the time remaining without changing it too much)
+TURBO = False  # True to play several turns per frame (only the last one is displayed), activated with the key T
+LIST_TURBO_SPEEDS = [1, 2, 4, 8, 'max']  # Speeds of the turbo mode chosen with the keys + and - ('max': adapted to keep the FPS)
+TURBO_SPEED = 'max'  # Number of turns played per frame in turbo mode chosen by the user
+TICKS_PER_FRAME = 1  # Number of turns played per frame in turbo mode (the turbo speed, or adapted to keep the FPS of the game)
+MAX_TICKS_PER_FRAME = 200  # Maximum number of turns played per frame in turbo mode
 
 
 # GENETIC
@@ -133,6 +149,37 @@ LIST_CHANCE_CROSSOVER = [0.3] * NB_MAPS  # Chance of crossover for each map
 CHANCE_CROSSOVER = None  # Chance of crossover for the current map
 LIST_PROPORTION_CARS_KEPT = [0.1] * NB_MAPS  # Percentage used to know how many cars we keep for the next generation for each map
 PROPORTION_CARS_KEPT = None  # Percentage used to know how many cars we keep for the next generation for the current map
+LIST_SELECTION = ['roulette'] * NB_MAPS  # Selection of the cars copied for the next generation for each map (see SELECTIONS in genetic_operators.py)
+SELECTION = None  # Selection of the cars copied for the next generation for the current map
+SURROGATE = False  # True to replace the new cars predicted far below the best cars before simulating them (activated with the key S)
+LINEAGE = False  # True to save all the cars evaluated with their parents (see data/lineage.py, the file grows with each run)
+FINISH_CACHED_CARS = True  # True to give the cars already played with the same map and parameters their final score and position without moving them again
+KEY_GENERATION = None  # Map and hash of the parameters at the beginning of the generation played (the final states are saved only if they don't change)
+SPECULATION = False  # True to create and simulate the next generation in a worker process before the end of the generation (activated with the key A)
+
+
+# ISLANDS
+ISLANDS = False  # True if populations are evolved in parallel in worker processes (activated with the key I)
+NB_ISLANDS = max(1, (os.cpu_count() or 1) - 1)  # Number of islands (one process each, a core is left for the display)
+MIGRATION_INTERVAL = 5  # Number of generations between two migrations
+NB_MIGRANTS = 2  # Number of best cars sent by an island at each migration
+MIGRATION_TOPOLOGY = 'ring'  # 'ring' (to the next island) or 'random' (to a random other island)
+ISLAND_DISPLAYED = 'best'  # 'best' (island with the best car) or 'cycle' (each island in turn)
+
+
+# STEADY STATE
+NB_WORKERS_STEADY_STATE = os.cpu_count() or 1  # Number of worker processes of the steady-state genetic algorithm (0 to evaluate the cars in the main process)
+SIZE_BATCH_STEADY_STATE = 8  # Number of new cars sent at once to a worker (the simulation moves the cars of a batch at the same time)
+LIST_REPLACEMENT = ['pire', 'ancienne', 'tournoi']  # Replacement policies tested (see REPLACEMENTS in steady_state.py)
+
+
+# SEARCH OF THE GENETIC PARAMETERS
+SEARCH_GRID = {'CHANCE_MUTATION': [0.2, 0.3, 0.5, 0.8],  # Values tested for each genetic parameter (names of the variables)
+               'CHANCE_CROSSOVER': [0.1, 0.2, 0.5, 0.8],
+               'PROPORTION_CARS_KEPT': [0.1, 0.2, 0.5, 0.8]}
+NB_RANDOM_CONFIGURATIONS = 0  # Number of random configurations between the values of SEARCH_GRID (0 to test the grid)
+MIN_SEEDS_SEARCH = 5  # Number of seeds of each configuration in the first round of the successive halving
+MAX_SEEDS_SEARCH = 50  # Maximum number of seeds of a configuration
 
 
 # MENU
@@ -1,9 +1,14 @@
-from data.constants import PATH_IMAGE, CAR_SIZES, START_POSITIONS, START_ANGLES, PATH_DATA  # Import the constants
+from data.data_classes import MemoryCar, SimulationParameters, GeneticParameters  # Import the data classes
 from render.resizing import scale_image, convert_to_new_window  # To resize the images
-from data.data_classes import MemoryCar  # Import the class MemoryCar
+from data.constants import PATH_IMAGE, CAR_SIZES, PATH_DATA  # Import the constants
 from render.display import edit_background  # Display functions
+from render.sprites import SPRITE_ATLAS  # Atlas of the images of the cars
 from menus.settings_menu import SETTINGS  # Import the settings
 from game.genetic import Genetic  # Import the class Genetic
+from game.track import Track  # Import the class Track
+from game.islands import ISLAND_MODEL  # Islands evolved in worker processes
+from game.population_metrics import POPULATION_METRICS  # Metrics of the population
+from data.lineage import LINEAGE  # Lineage of the cars evaluated
 import data.variables as var  # Import the variables
 import pygame  # To use pygame
 import sys  # To use sys.exit
@@ -25,6 +30,9 @@ def init_variables(nb_cars, replay=False):
         var.NUM_GENERATION += 1
     else:  # If we start a new run
         var.NUM_GENERATION = 1  # Number of the generation
+        POPULATION_METRICS.reset()  # We forget the metrics of the previous run
+        if var.LINEAGE:
+            LINEAGE.start_run()  # The cars of the lineage are recorded in a new run
 
 
 def resize_window(dimensions):
@@ -37,6 +45,7 @@ def resize_window(dimensions):
     var.WIDTH_SCREEN, var.HEIGHT_SCREEN = dimensions  # Update the dimensions
     var.WINDOW = pygame.display.set_mode((var.WIDTH_SCREEN, var.HEIGHT_SCREEN), pygame.RESIZABLE)  # Resize the window
     update_visual_variables()  # Update the visual data
+    SPRITE_ATLAS.clear()  # The images of the cars must be scaled to the new window
     pygame.display.flip()  # Update the display
     var.BIG_RED_CAR_IMAGE = pygame.transform.rotate(scale_image(pygame.image.load(PATH_IMAGE + '/car.png'), 1.5), 90)
 
@@ -86,32 +95,19 @@ def change_map(first_time=False, reverse=False):
             else:
                 var.NUM_MAP -= 1
 
-    var.START_POSITION = START_POSITIONS[var.NUM_MAP]  # Start position of the cars
-    var.START_ANGLE = START_ANGLES[var.NUM_MAP]  # Start angle of the cars
-    var.RADIUS_CHECKPOINT = 7.5 * CAR_SIZES[var.NUM_MAP]  # Radius of the checkpoints
+    var.TRACK = Track(var.NUM_MAP)  # Data of the map used to simulate the cars (mask of the walls, checkpoints, ...)
+    var.KEY_GENERATION = None  # The cars of the generation are played again from the start, their final states are not saved
+    var.START_POSITION = var.TRACK.start_position  # Start position of the cars
+    var.START_ANGLE = var.TRACK.start_angle  # Start angle of the cars
+    var.RADIUS_CHECKPOINT = var.TRACK.radius_checkpoint  # Radius of the checkpoints
+    var.BACKGROUND_MASK = var.TRACK.mask  # Mask of the black pixels of the background (used to detect collisions)
+    var.RED_CAR_IMAGE = var.TRACK.car_image  # Image of the car
+    var.CHECKPOINTS = var.TRACK.checkpoints  # List of checkpoints
+    SPRITE_ATLAS.clear()  # The size of the car depends on the map
 
-    # We create a background to create the mask of collision, this background has a size of 1500*700
-    background = pygame.Surface((1500, 700))  # Image of the background
-    background.blit(pygame.transform.scale(pygame.image.load(f'{PATH_IMAGE}background/background_{str(var.NUM_MAP)}.png'), (1500, 585)), (0, 115))  # Blit the circuit on the background surface
-    var.BACKGROUND_MASK = pygame.mask.from_threshold(background, (0, 0, 0, 255), threshold=(1, 1, 1, 1))  # Mask of the black pixels of the background (used to detect collisions)
-
-    var.RED_CAR_IMAGE = scale_image(pygame.image.load(PATH_IMAGE + 'car.png'), CAR_SIZES[var.NUM_MAP] / 75)  # Image of the car
     create_background()  # Create the background
     var.WINDOW.blit(var.BACKGROUND, (0, 0))  # Screen initialization
 
-    var.CHECKPOINTS = []  # List of checkpoints
-    with open(f'{PATH_DATA}/checkpoints/{var.NUM_MAP}', 'r') as file_checkpoint_read:
-        """
-        Format of the file checkpoints:
-        x1 y1
-        x2 y2
-        ...
-        """
-        checkpoints = file_checkpoint_read.readlines()
-        for checkpoint in checkpoints:
-            a, b = checkpoint.split(' ')
-            var.CHECKPOINTS.append((int(a), int(b)))
-
     update_cars_parameters()  # Update all the parameters of the cars
     if SETTINGS.x is not None:  # If the settings window has been initialized
         SETTINGS.update_parameters()  # Update the settings parameters
@@ -137,6 +133,41 @@ def update_cars_parameters():
     var.CHANCE_CROSSOVER = var.LIST_CHANCE_CROSSOVER[var.NUM_MAP]  # Chance of crossover for the current map
     var.CHANCE_MUTATION = var.LIST_CHANCE_MUTATION[var.NUM_MAP]  # Chance of mutation for the current map
     var.PROPORTION_CARS_KEPT = var.LIST_PROPORTION_CARS_KEPT[var.NUM_MAP]  # Percentage used to know how many cars we keep for the next generation for the current map
+    var.SELECTION = var.LIST_SELECTION[var.NUM_MAP]  # Selection of the cars copied for the next generation for the current map
+
+
+def get_simulation_parameters():
+    """
+    Get the physics parameters of the current map (used by the headless simulation)
+
+    Returns:
+        SimulationParameters: the parameters of the simulation
+    """
+    return SimulationParameters(max_speed=var.MAX_SPEED, turn_angle=var.TURN_ANGLE, acceleration=var.ACCELERATION,
+                                deceleration=var.DECELERATION, drift_factor=var.DRIFT_FACTOR, width_cone=var.WIDTH_CONE,
+                                length_cone=var.LENGTH_CONE, time_generation=var.TIME_GENERATION, rain_mode=var.RAIN_MODE,
+                                retirement=var.RETIREMENT, retirement_window=var.RETIREMENT_WINDOW,
+                                retirement_min_deviation=var.RETIREMENT_MIN_DEVIATION)
+
+
+def get_genetic_parameters():
+    """
+    Get the parameters of the genetic algorithm of the current map (used by the islands)
+
+    Returns:
+        GeneticParameters: the parameters of the genetic algorithm
+    """
+    return GeneticParameters(nb_cars=var.NB_CARS, proportion_cars_kept=var.PROPORTION_CARS_KEPT,
+                             chance_crossover=var.CHANCE_CROSSOVER, chance_mutation=var.CHANCE_MUTATION,
+                             selection=var.SELECTION)
+
+
+def start_islands():
+    """
+    Start the islands with the parameters of the current map
+    """
+    ISLAND_MODEL.start(var.NUM_MAP, get_simulation_parameters(), get_genetic_parameters(), var.NB_ISLANDS, var.SEED,
+                       var.MIGRATION_INTERVAL, var.NB_MIGRANTS, var.MIGRATION_TOPOLOGY)
 
 
 def create_background():
@@ -214,6 +245,8 @@ def load_parameters():
                         var.LIST_CHANCE_MUTATION[actual_map] = float(line.split()[2])
                     elif param == 'proportion_selection':
                         var.LIST_PROPORTION_CARS_KEPT[actual_map] = float(line.split()[2])
+                    elif param == 'selection':
+                        var.LIST_SELECTION[actual_map] = line.split()[2]
 
 
 def load_cars():
@@ -262,6 +295,7 @@ def exit_game():
     Exit the game
     """
     save_cars()  # Save the cars
+    LINEAGE.flush()  # Write the last cars of the lineage
     sys.exit()  # Quit pygame
 
 
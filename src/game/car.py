@@ -1,12 +1,12 @@
-from other.utils import compute_detection_cone_points, point_out_of_window, create_rect_from_points, change_color_car
-from render.resizing import convert_to_new_window, scale_image  # To convert the coordinates of the car and scale the image
+from other.utils import compute_detection_cone_points, create_rect_from_points, compute_cones
+from render.resizing import convert_to_new_window  # To convert the coordinates of the car
 from data.variables_functions import checkpoint_reached  # To detect if the car has reached a checkpoint
 from render.display import draw_detection_cone  # To draw the detection cone
 from data.constants import NB_MAPS  # Number of different tracks
 from game.genetic import Genetic  # Genetic algorithm of the car
 from render.explosion import Explosion  # To render explosions
+from render.sprites import SPRITE_ATLAS  # To get the rotated images of the car
 import data.variables as var  # Variables of the game
-import pygame  # Pygame library
 import math  # Math library
 
 
@@ -58,15 +58,19 @@ class Car:
         self.pos = var.START_POSITION  # Current position of the car
         self.front_of_car = self.pos  # Current position of the front of the car
 
-        self.image = change_color_car(var.RED_CAR_IMAGE, self.color)  # Image of the car but with the right color
-        self.rotated_image = self.image  # Rotated image of the car
-        self.rotated_rect = self.image.get_rect()  # Rotated rectangle of the car
+        self.image_colors = (self.color,)  # Colors applied to the image of the car
+        self.image = SPRITE_ATLAS.get_image(self.image_colors)  # Image of the car but with the right color
+        self.half_width = self.image.get_width() / 2  # Distance between the center and the front of the car
         self.rotated_rect_shown = self.image.get_rect()  # Rotated rectangle of the car shown on the screen
 
         self.score = 0  # Score of the car
         self.next_checkpoint = 0  # Next checkpoint to reach
         self.turn_without_checkpoint = 0  # Number of turn played by the car without reaching a checkpoint
 
+        # Data used to know if the car is stuck (see detect_retirement)
+        self.sums_window = [0, 0, 0, 0]  # Sums of x, y, x² and y² of the positions of the car since the beginning of the window
+        self.turns_window = 0  # Number of turns played since the beginning of the window
+
         self.dead = False  # True if the car is dead
         self.reverse = False  # True if the car is going in the wrong way (the direction of the car will no longer change)
 
@@ -91,6 +95,15 @@ class Car:
         """
         return self.genetic == other.genetic
 
+    def __hash__(self):
+        """
+        Hash of the car (cars with the same genetic have the same hash)
+
+        Return:
+            int: hash of the car
+        """
+        return hash(self.genetic)
+
     def copy(self):
         """
         Copy the car
@@ -131,6 +144,7 @@ class Car:
             self.detect_collision()  # Detect if the car is dead
 
             self.detect_reverse()  # Detect if the car is going in the wrong way
+            self.detect_retirement()  # Stop the car if its score can't change anymore
             self.update_best_scores()  # Update the best scores of the car
 
         var.DRIFT_FACTOR = memory_drift_factor  # We reset the drift factor
@@ -174,16 +188,16 @@ class Car:
             bool or float: Detection of the wall at the top of the cone
             bool or float: Detection of the wall at the right of the cone
         """
-        width, length = self.determine_size_cone()  # We select the right cone depending on the speed of the car
+        width, length, angle_cone = self.determine_size_cone()  # We select the right cone depending on the speed of the car
         self.front_of_car = self.compute_front_of_car()  # Point at the front of the car
-        left, top, right = compute_detection_cone_points(self.angle, self.front_of_car, width, length)  # Points of the detection cone (represented by a triangle)
+        left, top, right = compute_detection_cone_points(self.angle, self.front_of_car, width, length, angle_cone)  # Points of the detection cone (represented by a triangle)
 
         return self.detect_wall(left), self.detect_wall(top), self.detect_wall(right)
 
     def detect_wall(self, point):
         """
         Detect if there is a wall between the front of the car and the point (it's in this function that we are taking
-         most of the time in the simulation)
+         most of the time in the simulation, the distances to the walls of the track are used to make it faster)
 
         Args:
             point (tuple(int, int)): the coordinates of the point
@@ -192,47 +206,22 @@ class Car:
             bool or float : True if there is a wall
             If it is a float, it is the distance between the front of the car and the wall in this direction
         """
-        x1, y1 = self.front_of_car  # Coordinates of the front of the car
-        x2, y2 = point  # Coordinates of the point
-
-        if x1 == x2:  # If the car is parallel to the wall
-            # We check if there is a wall between the front of the car and the point
-            for y in range(int(min(y1, y2)), int(max(y1, y2))):
-                x1 = int(x1)
-                # We check if the pixel is black (wall)
-                if point_out_of_window((x1, y)) or var.BACKGROUND_MASK.get_at((x1, y)):
-                    return True  # There is a wall
-
-        # We determine the equation of the line between the front of the car and the point (y = ax + b)
-        a = (y2 - y1) / (x2 - x1)
-        b = y1 - a * x1
-
-        # We check if there is a wall between the front of the car and the point
-        for x in range(int(min(x1, x2)), int(max(x1, x2))):
-            y = int(a * x + b)
-            # We check if the pixel is black (wall)
-            if point_out_of_window((x, y)) or var.BACKGROUND_MASK.get_at((x, y)):
-                return math.sqrt((x1 - x) ** 2 + (y1 - y) ** 2)  # We return the distance between the front of the car and the wall
-        return False  # There is no wall
+        return var.TRACK.detect_wall(self.front_of_car, point)
 
     def determine_size_cone(self):
         """
-        Determine the size of the detection cone according to the speed of the car
+        Determine the size of the detection cone according to the speed of the car (the cones of each genetic are
+        computed only once, see compute_cones)
 
         Returns:
-            width, length (int, int): the width and the length of the detection cone
+            width, length, angle_cone (int, int, float): the width, the length and the angle of the detection cone
         """
+        cones = compute_cones(self.genetic.dice_values, var.WIDTH_CONE, var.LENGTH_CONE)
         if self.speed < var.MIN_MEDIUM_SPEED:
-            width = self.genetic.width_slow()
-            length = self.genetic.length_slow()
+            return cones[0]
         elif self.speed < var.MIN_HIGH_SPEED:
-            width = self.genetic.width_medium()
-            length = self.genetic.length_medium()
-        else:
-            width = self.genetic.width_fast()
-            length = self.genetic.length_fast()
-
-        return width, length
+            return cones[1]
+        return cones[2]
 
     def compute_front_of_car(self):
         """
@@ -242,8 +231,8 @@ class Car:
         Returns:
             front_of_car (tuple(int, int)): the coordinates of the front of the car
         """
-        return self.pos[0] + math.cos(math.radians(-self.angle)) * self.image.get_width() / 2,\
-            self.pos[1] + math.sin(math.radians(-self.angle)) * self.image.get_width() / 2
+        radians = math.radians(-self.angle)  # Convert the angle to radians
+        return self.pos[0] + math.cos(radians) * self.half_width, self.pos[1] + math.sin(radians) * self.half_width
 
     def update_acceleration(self, wall_top):
         """
@@ -326,17 +315,13 @@ class Car:
 
     def update_pos(self):
         """
-        Update the position and angle of the car, update its image and rectangle
+        Update the position of the car and of its front
         """
         # Update the position of the car
         radians = math.radians(-self.drift_angle)  # Convert the angle to radians
         self.pos = self.pos[0] + math.cos(radians) * self.speed, self.pos[1] + math.sin(radians) * self.speed
         self.front_of_car = self.compute_front_of_car()
 
-        # Rotate the car
-        self.rotated_image = pygame.transform.rotate(self.image, self.angle)  # Rotate the image of the car
-        self.rotated_rect = self.rotated_image.get_rect(center=self.image.get_rect(center=self.pos).center)  # Rotate the rectangle of the car
-
     def detect_collision(self):
         """
         Detect collision of the car with the walls
@@ -344,7 +329,7 @@ class Car:
         if self.pos[0] < 0 or self.pos[0] > 1500 or self.pos[1] < 0 or self.pos[1] > 700:
             self.kill()  # Collision with the wall of the window
 
-        if var.BACKGROUND_MASK.overlap(pygame.mask.from_surface(self.rotated_image), self.rotated_rect.topleft) is not None:
+        if var.TRACK.detect_collision(self.pos, self.angle):
             self.kill()  # Collision with a wall
 
     def detect_reverse(self):
@@ -355,9 +340,40 @@ class Car:
         if var.NUM_MAP != 5 and self.turn_without_checkpoint > 150:
             if self.id_memory_car is None and not self.color == 'yellow':
                 # We convert the image of the car to light grayscale if it's not the best car (to show that it's going in the wrong way)
-                self.image = change_color_car(self.image, 'light_gray')
+                self.image_colors += ('light_gray',)
+                self.image = SPRITE_ATLAS.get_image(self.image_colors)
             self.reverse = True
 
+    def detect_retirement(self):
+        """
+        Stop simulating the car if it is going in the wrong way (its score can't change anymore) or if it is stuck: the
+        standard deviation of its positions during the last window is under RETIREMENT_MIN_DEVIATION, so it turns around
+        the same point
+        """
+        if not var.RETIREMENT or self.dead:
+            return
+
+        if self.reverse:
+            self.retire()
+            return
+
+        x, y = self.pos
+        self.sums_window[0] += x
+        self.sums_window[1] += y
+        self.sums_window[2] += x * x
+        self.sums_window[3] += y * y
+        self.turns_window += 1
+
+        if self.turns_window == var.RETIREMENT_WINDOW:
+            sum_x, sum_y, sum_x2, sum_y2 = self.sums_window
+            mean_x, mean_y = sum_x / self.turns_window, sum_y / self.turns_window
+            variance = sum_x2 / self.turns_window - mean_x * mean_x + sum_y2 / self.turns_window - mean_y * mean_y
+            if variance < var.RETIREMENT_MIN_DEVIATION * var.RETIREMENT_MIN_DEVIATION:
+                self.retire()
+
+            self.sums_window = [0, 0, 0, 0]
+            self.turns_window = 0
+
     def update_best_scores(self):
         """
         Update the best scores of the car if we reached a new best score
@@ -372,7 +388,7 @@ class Car:
         Args:
             surface (pygame.Surface): surface on which we draw the car (default: the window of the game)
         """
-        image_shown = scale_image(self.rotated_image, var.SCALE_RESIZE_X)  # Scale the image of the car
+        image_shown = SPRITE_ATLAS.get_sprite(self.image_colors, self.angle)  # Rotated and scaled image of the car
         self.rotated_rect_shown = image_shown.get_rect(center=convert_to_new_window(self.pos))  # Rotate the rectangle of the car
         surface.blit(image_shown, self.rotated_rect_shown)  # We display the car
         var.RECTS_BLIT_CAR.append(self.rotated_rect_shown)    # Draw the car and add the rect to the list
@@ -401,6 +417,37 @@ class Car:
         """
         self.__init__(genetic=self.genetic, best_scores=self.best_scores, color=self.color, id_memory_car=self.id_memory_car)
 
+    def retire(self):
+        """
+        Stop simulating the car before the end of the generation (its score is final)
+        """
+        self.dead = True  # The car is no longer moved
+        var.NB_CARS_ALIVE -= 1  # Decrease the number of cars alive
+        self.draw(var.BACKGROUND)  # Draw the car on the background so it stays
+
+    def finish(self, score, pos, angle, reverse):
+        """
+        End the generation of the car without moving it (it has already been played with the same map and the same
+        parameters, the simulation is deterministic so its score and its last position are known)
+
+        Args:
+            score (int or float): final score of the car
+            pos (tuple(float, float)): last position of the car
+            angle (float): last angle of the car
+            reverse (bool): True if the car was going in the wrong way
+        """
+        self.score, self.pos, self.angle = score, pos, angle
+        self.update_best_scores()  # Update the best scores of the car (it can be kept as a memory car)
+        if reverse:
+            self.reverse = True
+            if self.id_memory_car is None and not self.color == 'yellow':
+                self.image_colors += ('light_gray',)
+                self.image = SPRITE_ATLAS.get_image(self.image_colors)
+        self.dead = True  # The car is not moved
+        var.NB_CARS_ALIVE -= 1  # Decrease the number of cars alive
+        self.draw(var.BACKGROUND)  # Draw the car on the background so it stays
+        self.draw()  # Draw the car on the window (the background is only blitted where the cars move)
+
     def kill(self):
         """
         Kill the car
@@ -0,0 +1,187 @@
+from collections import OrderedDict  # To remember the order of use of the scores
+import itertools  # To list the cones that can be unused
+import os  # To check if the file of the cache exists
+
+
+"""
+This file contains the class FitnessCache used to remember the scores of the cars evaluated by the headless simulation.
+The simulation is deterministic, so a genetic always gets the same score on the same map with the same parameters.
+A car only reads the dice of the cones of the speeds it reaches, so if a car never used a cone, all the genetics that
+only differ by the dice of this cone get the same score: the score is also saved under a key where these dice are '*'
+"""
+
+
+MAX_SIZE_CACHE = 100000  # Maximum number of scores kept in memory (the least recently used are removed)
+CONES_USED = list(itertools.product((True, False), repeat=3))  # Cones (slow, medium, fast) that can be used by a car, all the cones first
+
+
+class FitnessCache:
+    """
+    Cache of the scores of the genetics, the key of a score is (dice values, number of the map, parameters of the
+    simulation) so that changing a parameter in the settings never gives the score of another configuration
+    """
+    def __init__(self, max_size=MAX_SIZE_CACHE, path=None):
+        """
+        Initialization of the cache
+
+        Args:
+            max_size (int): maximum number of scores kept in memory
+            path (str): path of the file where the scores are also saved (None to only keep them in memory)
+        """
+        self.max_size = max_size  # Maximum number of scores kept in memory
+        self.path = path  # Path of the file where the scores are saved
+        self.scores = OrderedDict()  # Scores of the genetics {key: score}, from the least to the most recently used
+        self.nb_hits, self.nb_misses = 0, 0  # Number of scores found or not found in the cache
+        self.nb_equivalent_hits = 0  # Number of scores found with the key of an equivalent genetic
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        """
+        Returns:
+            int: number of scores in memory
+        """
+        return len(self.scores)
+
+    @staticmethod
+    def get_key(dice_values, num_map, hash_parameters, cones_used=(True, True, True)):
+        """
+        Get the key of a score
+
+        Args:
+            dice_values (list(int)): dice values of the genetic
+            num_map (int): number of the map
+            hash_parameters (str): hash of the parameters of the simulation (see SimulationParameters.get_hash)
+            cones_used (tuple(bool)): True for each cone (slow, medium, fast) used by the car, the dice of the other
+            cones (length and width) are replaced by '*'
+
+        Returns:
+            str: key of the score in the cache
+        """
+        values = [str(value) if cones_used[index % 3] else '*' for index, value in enumerate(dice_values)]
+        return f'{num_map} {hash_parameters} {" ".join(values)}'
+
+    def get(self, key):
+        """
+        Get a score from the cache
+
+        Args:
+            key (str): key of the score (see get_key)
+
+        Returns:
+            int or float: score of the genetic (None if it's not in the cache)
+        """
+        score = self.scores.get(key)
+        if score is None:
+            self.nb_misses += 1
+        else:
+            self.nb_hits += 1
+            self.scores.move_to_end(key)
+        return score
+
+    def find(self, dice_values, num_map, hash_parameters):
+        """
+        Find the score of a genetic, or the score of a genetic equivalent (same dice for all the cones it used)
+
+        Args:
+            dice_values (list(int)): dice values of the genetic
+            num_map (int): number of the map
+            hash_parameters (str): hash of the parameters of the simulation
+
+        Returns:
+            int or float: score of the genetic (None if neither the genetic nor an equivalent genetic is in the cache)
+        """
+        for cones_used in CONES_USED:
+            key = self.get_key(dice_values, num_map, hash_parameters, cones_used)
+            score = self.scores.get(key)
+            if score is not None:
+                self.scores.move_to_end(key)
+                self.nb_hits += 1
+                self.nb_equivalent_hits += not all(cones_used)
+                return score
+        self.nb_misses += 1
+        return None
+
+    def add(self, key, score):
+        """
+        Add a score in the memory of the cache
+
+        Args:
+            key (str): key of the score (see get_key)
+            score (int or float): score of the genetic
+        """
+        self.scores[key] = score
+        self.scores.move_to_end(key)
+        if len(self.scores) > self.max_size:
+            self.scores.popitem(last=False)  # We remove the least recently used score
+
+    def save(self, new_scores):
+        """
+        Write new scores at the end of the file of the cache (if the cache has a file)
+
+        Args:
+            new_scores (dict): the new scores {key: score}
+        """
+        if self.path is not None and new_scores:
+            with open(self.path, 'a') as file_cache_write:
+                for key, score in new_scores.items():
+                    file_cache_write.write(f'{key} {score}\n')
+
+    def clear(self):
+        """
+        Remove all the scores from the memory (the file of the cache is kept)
+        """
+        self.scores.clear()
+
+    def load(self):
+        """
+        Load the scores saved in the file of the cache
+        """
+        with open(self.path, 'r') as file_cache_read:
+            """
+            Format of the file:
+            num_map hash_parameters d1 d2 d3 d4 d5 d6 score
+            ...
+            """
+            for line in file_cache_read:
+                key, score = line.rsplit(' ', 1)
+                self.add(key, float(score) if '.' in score else int(score))
+
+    def evaluate(self, simulation, genomes):
+        """
+        Get the scores of the genomes, only the genomes that are not in the cache (and that have no equivalent genetic
+        in the cache) are simulated (once each)
+
+        Args:
+            simulation (Simulation): headless simulation used to evaluate the genomes
+            genomes (list(list(int))): dice values of each car
+
+        Returns:
+            list: score of each car (in the same order as the genomes)
+        """
+        num_map, hash_parameters = simulation.track.num_map, simulation.parameters.get_hash()
+        keys = [self.get_key(dice_values, num_map, hash_parameters) for dice_values in genomes]
+        scores = [self.find(dice_values, num_map, hash_parameters) for dice_values in genomes]
+
+        # We simulate the genomes that are not in the cache (without duplicates)
+        missing = {}  # {key: dice values}
+        for key, dice_values, score in zip(keys, genomes, scores):
+            if score is None:
+                missing[key] = dice_values
+        new_scores = dict(zip(missing, simulation.evaluate(list(missing.values())))) if missing else {}
+
+        # The scores are also saved for the genetics equivalent to the genomes that didn't use all the cones
+        scores_saved = dict(new_scores)
+        cones_used_cars = simulation.cones_used.tolist() if missing else []  # Cones used by each genome simulated
+        for (key, score), dice_values, cones_used in zip(new_scores.items(), missing.values(), cones_used_cars):
+            if not all(cones_used):
+                scores_saved[self.get_key(dice_values, num_map, hash_parameters, cones_used)] = score
+        for key, score in scores_saved.items():
+            self.add(key, score)
+        self.save(scores_saved)
+
+        return [new_scores[key] if score is None else score for key, score in zip(keys, scores)]
+
+
+FINISHED_CARS = FitnessCache()  # Final state of the cars played in the game {key: (score, position, angle, reverse)}
@@ -1,26 +1,78 @@
+from data.fitness_table import NB_GENOMES, genome_index  # To encode the genetic in one integer
+import itertools  # To list the dice values of all the genetics
 import random  # Used to generate random numbers
 import data.variables as var  # Import the variables
 
 """
-This file contains the Genetic class used to store the genetic parameters of a car
+This file contains the Genetic class used to store the genetic parameters of a car. A genetic is stored as a single
+integer: its dice values minus 1 written in base 6 (the index of the genetic in the fitness tables), so genetics can be
+compared, hashed and stored in sets in constant time
 """
 
 
+DICE_VALUES = list(itertools.product(range(1, 7), repeat=6))  # Dice values of each genetic, at its index
+
+
+def sample_genomes(number, excluded=()):
+    """
+    Draw different random genetics without replacement
+
+    Args:
+        number (int): number of genetics to draw (less if there are not enough genetics that are not excluded)
+        excluded (set(int)): indexes of the genetics that can't be drawn
+
+    Returns:
+        list(int): indexes of the genetics drawn
+    """
+    if 2 * (number + len(excluded)) < NB_GENOMES:  # If most genetics can be drawn, we draw them one by one until we have enough
+        indexes = {}  # Genetics drawn (a dict keeps the order of the draws)
+        while len(indexes) < number:
+            index = random.randrange(NB_GENOMES)
+            if index not in excluded:
+                indexes[index] = None
+        return list(indexes)
+
+    # Else we draw len(excluded) more genetics than needed, so there are enough genetics left after removing the excluded ones
+    indexes = random.sample(range(NB_GENOMES), min(number + len(excluded), NB_GENOMES))
+    return [index for index in indexes if index not in excluded][:number]
+
+
 class Genetic:
     """
     This class is used to represent a genetic algorithm and store the genetic parameters of a car
     """
-    def __init__(self, list_parameters=None):
+    __slots__ = ('index',)
+
+    def __init__(self, list_parameters=None, index=None):
         """
         Initialization of the genetic algorithm
 
         Args:
             list_parameters (list(int)): list of the parameters of the genetic algorithm in this order : (length_slow, length_medium, length_fast, width_slow, width_medium, width_fast)
+            index (int): index of the genetic (used instead of the parameters if it's not None)
         """
-        if list_parameters is None:  # If we don't have the parameters we randomize them
-            self.dice_values = [random.randint(1, 6) for _ in range(6)]  # Dice values corresponding to this genome
+        if index is not None:
+            self.index = index  # Dice values of this genome written in base 6
+        elif list_parameters is None:  # If we don't have the parameters we randomize them
+            self.index = random.randrange(NB_GENOMES)
         else:
-            self.dice_values = list_parameters.copy()  # Dice values corresponding to this genome (we copy the list)
+            self.index = genome_index(list_parameters)
+
+    @property
+    def dice_values(self):
+        """
+        Returns:
+            tuple(int): dice values corresponding to this genome
+        """
+        return DICE_VALUES[self.index]
+
+    @dice_values.setter
+    def dice_values(self, dice_values):
+        """
+        Args:
+            dice_values (list(int)): new dice values of this genome
+        """
+        self.index = genome_index(dice_values)
 
     def __str__(self):
         """
@@ -44,7 +96,16 @@ class Genetic:
         Returns:
             bool: True if the two genetic algorithms are equals
         """
-        return self.dice_values == other.dice_values
+        return self.index == other.index
+
+    def __hash__(self):
+        """
+        Hash of the genetic algorithm (equal genetic algorithms have the same hash)
+
+        Returns:
+            int: hash of the genetic algorithm
+        """
+        return self.index
 
     def copy(self):
         """
@@ -53,7 +114,7 @@ class Genetic:
         Returns:
             Genetic: copy of the genetic algorithm
         """
-        return Genetic(self.dice_values)
+        return Genetic(index=self.index)
 
     def length_slow(self):
         """
@@ -62,7 +123,7 @@ class Genetic:
         Returns:
             int: length of the slow dice
         """
-        return self.dice_values[0] * var.LENGTH_CONE
+        return DICE_VALUES[self.index][0] * var.LENGTH_CONE
 
     def length_medium(self):
         """
@@ -71,7 +132,7 @@ class Genetic:
         Returns:
             int: length of the medium dice
         """
-        return self.dice_values[1] * var.LENGTH_CONE
+        return DICE_VALUES[self.index][1] * var.LENGTH_CONE
 
     def length_fast(self):
         """
@@ -80,7 +141,7 @@ class Genetic:
         Returns:
             int: length of the fast dice
         """
-        return self.dice_values[2] * var.LENGTH_CONE
+        return DICE_VALUES[self.index][2] * var.LENGTH_CONE
 
     def width_slow(self):
         """
@@ -89,7 +150,7 @@ class Genetic:
         Returns:
             int: width of the slow dice
         """
-        return self.dice_values[3] * var.WIDTH_CONE
+        return DICE_VALUES[self.index][3] * var.WIDTH_CONE
 
     def width_medium(self):
         """
@@ -98,7 +159,7 @@ class Genetic:
         Returns:
             int: width of the medium dice
         """
-        return self.dice_values[4] * var.WIDTH_CONE
+        return DICE_VALUES[self.index][4] * var.WIDTH_CONE
 
     def width_fast(self):
         """
@@ -107,4 +168,4 @@ class Genetic:
         Returns:
             int: width of the fast dice
         """
-        return self.dice_values[5] * var.WIDTH_CONE
+        return DICE_VALUES[self.index][5] * var.WIDTH_CONE
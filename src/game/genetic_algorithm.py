@@ -1,12 +1,20 @@
 from data.data_classes import MemoryCar  # Import the car memory
-import itertools  # Used to get all the combinations of cars
+from game.genetic_operators import next_generation, remove_duplicates, genome_indexes, SELECTIONS, OPERATOR_RANDOM  # To apply the genetic algorithm to all the cars at once
 import data.variables as var  # Variables of the game
-import random  # Used to generate random numbers
+import numpy as np  # To store the genetics of the cars in an array
+import random  # Used to seed the generator of the genetic algorithm
 from game.car import Car  # Import the car
+from game.genetic import Genetic  # To create new genetics
+from game.population_metrics import POPULATION_METRICS  # Metrics of the population
+from game.surrogate import SURROGATE_MODEL  # To predict the scores of the new cars
+from game.speculation import SPECULATION  # New cars created before the end of the generation
+from data.lineage import LINEAGE  # To save the parents of the cars
+from data.variables_functions import get_simulation_parameters  # To know the parameters of the scores
 from menus.garage_menu import GARAGE
 
 """
-This file contains all the functions used to apply the genetic algorithm to the cars (selection, mutation, crossover)
+This file contains all the functions used to apply the genetic algorithm to the cars (selection, mutation, crossover),
+the operators themselves are in game.genetic_operators
 """
 
 
@@ -23,18 +31,17 @@ def apply_genetic(cars):
     cars = [car for car in cars if not car.id_memory_car]  # We remove the cars that are only here for the visuals
 
     if cars:
+        record_generation(cars)  # Metrics, lineage and predictions of the generation
+
         # We sort the cars by score
         cars = sorted(cars, key=lambda c: c.score, reverse=True)  # Sort the cars by score
 
         cars_to_keep = find_cars_to_keep(cars)  # We find the cars to keep (the best cars)
-        cars = init_cars(cars_to_keep, var.NB_CARS - len(cars_to_keep))  # Select the best cars that we will mutate
-
-        # We change the genetic algorithm mode if we are in the test mode
-        if var.TEST_MUTATION_CROSSOVER:
-            cars = apply_genetic_test(cars, cars_to_keep)
-        else:
-            crossover(cars)  # Crossover the cars
-            cars = mutate(cars, cars_to_keep)  # Mutate the cars
+        new_cars = SPECULATION.take(cars, cars_to_keep, var.NB_CARS - len(cars_to_keep))  # New cars created in advance
+        if new_cars is None:  # Selection, crossover and mutation
+            new_cars = create_new_genomes(np.array([car.genetic.dice_values for car in cars_to_keep], dtype=np.int8),
+                                          [car.score for car in cars_to_keep], var.NB_CARS - len(cars_to_keep))
+        cars = create_new_cars(cars_to_keep, *new_cars)
         add_cars_to_keep(cars, cars_to_keep)  # We add the best cars to the list
     else:
         cars = [Car() for _ in range(var.NB_CARS)]  # If there is no car, we add random cars
@@ -42,155 +49,120 @@ def apply_genetic(cars):
     return cars
 
 
-def find_cars_to_keep(cars):
+def record_generation(cars):
     """
-    Find the cars to we will crossover and mutate (the best cars) and add the best to the memory
+    Save the generation evaluated: diversity and scores of the population, lineage of the cars and scores used to
+    predict the scores of the next cars
 
     Args:
-        cars (list): list of all the cars
-
-    Returns:
-        list: list of cars to keep
+        cars (list): list of the cars evaluated
     """
-    number_to_keep = max(min(int(var.PROPORTION_CARS_KEPT * len(cars)), var.NB_CARS), 1)  # Number of cars to keep (between 1 and NB_CARS)
-    cars_to_keep = cars[:number_to_keep]  # We keep the best cars
-
-    best_car = cars_to_keep[0]  # We get the best car
-    var.MEMORY_CARS.append(MemoryCar(id_car=var.ACTUAL_IDS_MEMORY_CARS, name=f'Génération_{var.NUM_GENERATION}',
-                                     color='gray', genetic=best_car.genetic, best_scores=best_car.best_scores))  # Add the best car to the memory
-    var.ACTUAL_IDS_MEMORY_CARS += 1  # We increment the id of the memory cars
-    GARAGE.reload_page = True  # We reload the garage page
-
-    return cars_to_keep
+    genomes, scores = [car.genetic.dice_values for car in cars], [car.score for car in cars]
+    POPULATION_METRICS.update(genomes, scores)  # Diversity and scores of the generation
+    if var.LINEAGE:  # We save the cars evaluated with their parents
+        LINEAGE.record_generation([car.genetic.index for car in cars], scores, var.NUM_MAP, var.NUM_GENERATION)
+    if var.SURROGATE:  # The scores are used to predict the scores of the next cars
+        SURROGATE_MODEL.set_configuration(var.NUM_MAP, get_simulation_parameters().get_hash())
+        SURROGATE_MODEL.add(genomes, scores)
 
 
-def init_cars(cars_to_keep, number_cars):
+def record_island(num_generation, genomes, scores):
     """
-    Initialize the cars we will crossover and mutate
+    Save the last generation of the island displayed as if it had been played (the cars have been evaluated by the
+    island): the metrics of the population are updated and its best car is added to the memory
 
     Args:
-        cars_to_keep (list): list of cars we will copy
-        number_cars (int): number of cars we will mutate and crossover
+        num_generation (int): number of the generation of the island
+        genomes (numpy.ndarray): the genetics of the cars, from the best to the worst car
+        scores (numpy.ndarray): the score of each car
 
     Returns:
-        list: list of the cars we will mutate and crossover
-    """
-    # Calculate the weights based on the car scores
-    weights = [car.score for car in cars_to_keep]
-    total_weight = sum(weights)
-    if total_weight == 0:  # To avoid division by 0
-        total_weight = 1
-    probabilities = [weight / total_weight for weight in weights]
-
-    selected_cars = random.choices(cars_to_keep, probabilities, k=number_cars)  # We choose the cars based on their probabilities
-    cars = [car.copy() for car in selected_cars]
-
+        list: list of the cars of the generation, from the best to the worst car
+    """
+    var.NUM_GENERATION = num_generation  # The generations of the island replace the generations of the game
+    cars = [Car(genetic=Genetic(index=int(index))) for index in genome_indexes(genomes)]
+    for car, score in zip(cars, scores.tolist()):
+        car.score = score if var.NUM_MAP == 5 else int(score)
+        car.update_best_scores()
+
+    if var.LINEAGE:
+        LINEAGE.pending = {}  # The parents of the cars of the islands are not known
+    record_generation(cars)  # Metrics, lineage and predictions of the generation
+    find_cars_to_keep(cars)  # The best car is added to the memory
     return cars
 
 
-def apply_genetic_test(cars, cars_to_keep):
+def find_cars_to_keep(cars):
     """
-    Do the correct genetic algorithm based on the test mode
+    Find the cars to we will crossover and mutate (the best cars) and add the best to the memory
 
     Args:
-        cars (list): list of cars
-        cars_to_keep (list): list of cars we will not mutate and keep in the next turn
+        cars (list): list of all the cars
 
     Returns:
-        list: list of cars with the genetic algorithm applied
+        list: list of cars to keep
     """
-    if var.TEST_MODE == 'mutation_only':
-        cars = mutate(cars, cars_to_keep)  # Mutate the cars
-    elif var.TEST_MODE == 'crossover_mutation':
-        crossover(cars)
-        cars = mutate(cars, cars_to_keep)  # Mutate the cars
+    number_to_keep = max(min(int(var.PROPORTION_CARS_KEPT * len(cars)), var.NB_CARS), 1)  # Number of cars to keep (between 1 and NB_CARS)
+    cars_to_keep = cars[:number_to_keep]  # We keep the best cars
 
-    return cars
+    best_car = cars_to_keep[0]  # We get the best car
+    var.MEMORY_CARS.append(MemoryCar(id_car=var.ACTUAL_IDS_MEMORY_CARS, name=f'Génération_{var.NUM_GENERATION}',
+                                     color='gray', genetic=best_car.genetic, best_scores=best_car.best_scores))  # Add the best car to the memory
+    var.ACTUAL_IDS_MEMORY_CARS += 1  # We increment the id of the memory cars
+    GARAGE.reload_page = True  # We reload the garage page
+
+    return cars_to_keep
 
 
-def crossover(cars):
+def create_new_cars(cars_to_keep, genomes, parents, operators):
     """
-    Crossover the cars (exchange some attributes between two cars of the list multiple times)
+    Create the new cars from their genetics (and remember their parents for the lineage)
 
     Args:
-        cars (list): list of cars
+        cars_to_keep (list): list of the best cars
+        genomes (numpy.ndarray): the genetics of the new cars (see create_new_genomes)
+        parents (numpy.ndarray): the positions in cars_to_keep of the two parents of each new car
+        operators (numpy.ndarray): the operators that created each new car
 
     Returns:
-        list: list of cars crossed
+        list: list of the new cars
     """
-    for car1, car2 in itertools.combinations(cars, 2):  # We take all the combinations of cars
-        if random.random() < var.CHANCE_CROSSOVER and car1 != car2:  # If we do a crossover (we don't crossover a car with itself)
-            # We choose between 1 and 6 random attributes to exchange
-            ids_changed_attributes = random.sample(range(0, 6), random.randint(1, 6))
-            for i, value in enumerate(car1.genetic.dice_values):  # We exchange the attributes
-                if i in ids_changed_attributes:
-                    car1.genetic.dice_values[i], car2.genetic.dice_values[i] = car2.genetic.dice_values[i], value
+    indexes = genome_indexes(genomes)
+    if var.LINEAGE:
+        LINEAGE.set_offspring(indexes, parents, operators, [car.genetic.index for car in cars_to_keep])
+    return [Car(genetic=Genetic(index=int(index))) for index in indexes]
 
 
-def mutate(cars, cars_to_keep):
+def create_new_genomes(genomes_to_keep, scores_to_keep, number_cars):
     """
-    Mutate the cars
+    Create the genetics of the new cars from the genetics of the best cars (also used to create them in advance)
 
     Args:
-        cars (list): list of cars
-        cars_to_keep (list): list of cars we will not mutate and keep in the next turn
+        genomes_to_keep (numpy.ndarray): the genetics of the best cars
+        scores_to_keep (list): the scores of the best cars
+        number_cars (int): number of new cars
 
     Returns:
-        list: list of cars mutated
-    """
-    new_cars = []  # List of new cars
-
-    for car in cars:
-        added = False
-        while not added:
-            mutate_one_car(car)  # Mutate the car
-            if car not in new_cars and car not in cars_to_keep:  # If the car is not already in the list or if we have tried too many times
-                added = True
-                new_cars.append(car)  # We add the car to the list
-
-    return new_cars
-
-
-def mutate_one_car(car):
+        numpy.ndarray: the genetics of the new cars
+        numpy.ndarray: the positions in genomes_to_keep of the two parents of each new car (-1 if no parent)
+        numpy.ndarray: the operators that created each new car (see OPERATOR_CROSSOVER... in genetic_operators.py)
     """
-    Mutate one car
+    rng = np.random.default_rng(random.getrandbits(64))  # Generator seeded by the random module (seeded by var.SEED)
 
-    Args:
-        car (Car): the car to mutate
-    """
-    has_muted = False  # True if the car has mutated
-    while not has_muted:  # We try mutating the car until it mutates
-        dice_values = car.genetic.dice_values.copy()  # We copy the dice values
-        for index, value in enumerate(car.genetic.dice_values):
-            if random.random() < var.CHANCE_MUTATION:
-                has_muted = True
-                dice_values[index] = random_attribution(value)  # We change the value of the dice
-        car.genetic.dice_values = dice_values
+    # We don't crossover the cars if we test the mutation only
+    chance_crossover = 0 if var.TEST_MUTATION_CROSSOVER and var.TEST_MODE == 'mutation_only' else var.CHANCE_CROSSOVER
 
+    genomes, parents, operators = next_generation(rng, genomes_to_keep, scores_to_keep, number_cars, chance_crossover,
+                                                  var.CHANCE_MUTATION, SELECTIONS[var.SELECTION], return_parents=True)
 
-def random_attribution(value):
-    """
-    We want to attribute a random value to a variable, but we want that values close to the actual value has more chance
-
-    Args:
-        value (int): the actual value (between 1 and 6)
-
-    Returns:
-        value (int): the new value (between 1 and 6)
-    """
-    random_value = random.random()
-    if random_value < 1/5:
-        value = value + random.uniform(-5, 5)  # We add a random value between -1 and 1
-    elif random_value < 1/4:
-        value = value + random.uniform(-4, 4)
-    elif random_value < 1/3:
-        value = value + random.uniform(-3, 3)
-    elif random_value < 1/2:
-        value = value + random.uniform(-2, 2)
-    else:
-        value = value + random.uniform(-1, 1)
-    return max(1, min(6, round(value)))  # We round the value between 1 and 6
+    if var.SURROGATE:  # The new cars predicted far below the worst car kept are replaced before being simulated
+        SURROGATE_MODEL.screen(rng, genomes, min(scores_to_keep), lambda number: next_generation(
+            rng, genomes_to_keep, scores_to_keep, number, chance_crossover, var.CHANCE_MUTATION, SELECTIONS[var.SELECTION],
+            return_parents=True), parents, operators)
+        remove_duplicates(rng, genomes, genome_indexes(genomes_to_keep), var.CHANCE_MUTATION, operators)  # The new cars can be the same
+        parents[operators == OPERATOR_RANDOM] = -1
 
+    return genomes, parents, operators
 
 
 def add_cars_to_keep(cars, cars_to_keep):
@@ -0,0 +1,314 @@
+from data.fitness_table import NB_GENOMES  # Number of different genetics
+import numpy as np  # To apply the operators to all the genetics at the same time
+import math  # To round the number of rounds of crossover
+
+
+"""
+This file contains the operators of the genetic algorithm (selection, crossover, mutation) applied to a whole population
+at once. A population is a numpy array of shape (number of cars, 6) and type int8 with the dice values of one car per
+line, and all the random numbers are drawn from a numpy.random.Generator so that a seed gives always the same results
+"""
+
+
+POWERS_GENOME = 6 ** np.arange(5, -1, -1)  # Weight of each dice in the index of a genetic (base 6)
+THRESHOLDS_MUTATION = np.array([1/5, 1/4, 1/3, 1/2])  # Thresholds of the random value choosing the amplitude of a mutation
+AMPLITUDES_MUTATION = np.array([5, 4, 3, 2, 1])  # Maximal change of a dice for each interval between the thresholds
+MAX_ROUNDS_CROSSOVER = 16  # Maximum number of rounds of crossover (so the crossover is linear in the number of cars)
+MAX_TRIES_MUTATION = 20  # Number of mutations tried before giving a random new genetic to a car that is already in the population
+SIZE_TOURNAMENT = 3  # Number of cars in each tournament of the tournament selection
+PROPORTION_TRUNCATION = 0.5  # Proportion of the best cars that can be chosen by the truncation selection
+
+# Operators that created a car (flags, a car can be crossed and mutated)
+OPERATOR_CROSSOVER = 1  # The car has exchanged dice with another car
+OPERATOR_MUTATION = 2  # The car has been mutated
+OPERATOR_RANDOM = 4  # The car has a random genetic (first generation, or no different genetic found by mutation)
+OPERATOR_KEPT = 8  # The car is a best car of the previous generation kept for the next generation
+
+
+def genome_indexes(genomes):
+    """
+    Get the index of each genetic of the population (see data.fitness_table.genome_index)
+
+    Args:
+        genomes (numpy.ndarray): the population, shape (n, 6)
+
+    Returns:
+        numpy.ndarray: the indexes of the genetics, shape (n,)
+    """
+    return (genomes.astype(np.int64) - 1) @ POWERS_GENOME
+
+
+def genomes_from_indexes(indexes):
+    """
+    Get the population corresponding to indexes of genetics
+
+    Args:
+        indexes (numpy.ndarray): the indexes of the genetics, shape (n,)
+
+    Returns:
+        numpy.ndarray: the population, shape (n, 6)
+    """
+    return (np.asarray(indexes, dtype=np.int64)[:, None] // POWERS_GENOME % 6 + 1).astype(np.int8)
+
+
+def roulette_selection(rng, scores, number):
+    """
+    Choose cars with a probability proportional to their score (with replacement)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        number (int): number of cars to choose
+
+    Returns:
+        numpy.ndarray: the indexes of the cars chosen
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    total = scores.sum()
+    if total <= 0:  # If all the scores are 0, all the cars have the same chance
+        return rng.integers(0, len(scores), size=number)
+    return rng.choice(len(scores), size=number, p=scores / total)
+
+
+def tournament_selection(rng, scores, number):
+    """
+    Choose cars with tournaments: for each car chosen, SIZE_TOURNAMENT random cars are compared and the best one wins
+    (only the order of the scores matters, not their values)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        number (int): number of cars to choose
+
+    Returns:
+        numpy.ndarray: the indexes of the cars chosen
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    candidates = rng.integers(0, len(scores), size=(number, SIZE_TOURNAMENT))
+    return candidates[np.arange(number), scores[candidates].argmax(axis=1)]
+
+
+def rank_selection(rng, scores, number):
+    """
+    Choose cars with a probability proportional to their rank (1 for the worst car, n for the best, the cars with the
+    same score have the same rank), so a car with a much better score doesn't take all the places
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        number (int): number of cars to choose
+
+    Returns:
+        numpy.ndarray: the indexes of the cars chosen
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    ranks = np.searchsorted(np.sort(scores), scores, side='right')  # Number of cars with a score lower or equal
+    return rng.choice(len(scores), size=number, p=ranks / ranks.sum())
+
+
+def truncation_selection(rng, scores, number):
+    """
+    Choose cars uniformly among the best PROPORTION_TRUNCATION of the cars
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        number (int): number of cars to choose
+
+    Returns:
+        numpy.ndarray: the indexes of the cars chosen
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    nb_best = max(1, int(PROPORTION_TRUNCATION * len(scores)))
+    best = np.argsort(-scores, kind='stable')[:nb_best]
+    return best[rng.integers(0, nb_best, size=number)]
+
+
+def stochastic_universal_sampling(rng, scores, number):
+    """
+    Choose cars with a probability proportional to their score like the roulette, but with equally spaced pointers
+    on the roulette (one random start), so each car is chosen a number of times very close to its expected number
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        number (int): number of cars to choose
+
+    Returns:
+        numpy.ndarray: the indexes of the cars chosen (in a random order)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    total = scores.sum()
+    if total <= 0:  # If all the scores are 0, all the cars have the same chance
+        scores, total = np.ones(len(scores)), len(scores)
+    pointers = (rng.random() + np.arange(number)) * (total / number)
+    chosen = np.searchsorted(np.cumsum(scores), pointers, side='right')
+    return rng.permutation(np.minimum(chosen, len(scores) - 1))  # minimum for the rounding errors of the sum
+
+
+SELECTIONS = {'roulette': roulette_selection, 'tournoi': tournament_selection, 'rang': rank_selection,
+              'troncature': truncation_selection, 'sus': stochastic_universal_sampling}  # Selections by name (name used in the settings)
+
+
+def crossover(rng, genomes, chance_crossover, partners=None):
+    """
+    Crossover the cars of the population (exchange between 1 and 6 random dice between two cars, multiple times).
+    The previous version tried each pair of cars with a probability chance_crossover, so each car did on average
+    chance_crossover * (n - 1) crossovers but there were n² pairs. Here the cars are paired at random in rounds (each car
+    is in one pair per round) and each pair is crossed with a probability chosen so that each car still does on average
+    chance_crossover * (n - 1) crossovers, but never more than MAX_ROUNDS_CROSSOVER (the cost is linear in n)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        genomes (numpy.ndarray): the population (modified in place)
+        chance_crossover (float): the chance of crossover of each pair of cars
+        partners (numpy.ndarray): the second parent of each car (modified in place, None if not needed): the first
+        parent of the last car it was crossed with
+    """
+    nb_cars = len(genomes)
+    rate = chance_crossover * (nb_cars - 1)  # Average number of crossovers of each car
+    if rate <= 0:
+        return
+    nb_rounds = min(math.ceil(rate), MAX_ROUNDS_CROSSOVER)
+    chance_pair = min(1, rate / nb_rounds)  # Chance of crossover of each pair of a round
+
+    for _ in range(nb_rounds):
+        pairs = rng.permutation(nb_cars)[:nb_cars - nb_cars % 2].reshape(-1, 2)  # Random pairs of cars
+        pairs = pairs[rng.random(len(pairs)) < chance_pair]  # Pairs that are crossed
+
+        # We choose between 1 and 6 random dice to exchange for each pair (the ranks of random values give random dice)
+        nb_dice = rng.integers(1, 7, size=len(pairs))
+        exchanged = rng.random((len(pairs), 6)).argsort(axis=1).argsort(axis=1) < nb_dice[:, None]
+
+        first, second = genomes[pairs[:, 0]], genomes[pairs[:, 1]]
+        genomes[pairs[:, 0]] = np.where(exchanged, second, first)
+        genomes[pairs[:, 1]] = np.where(exchanged, first, second)
+
+        if partners is not None:  # partners[:, 0] is the first parent of each car
+            partners[pairs[:, 0], 1], partners[pairs[:, 1], 1] = partners[pairs[:, 1], 0], partners[pairs[:, 0], 0]
+
+
+def random_attribution(rng, values):
+    """
+    Attribute a random value to each dice, values close to the actual value have more chance (same distribution as the
+    previous version: the value changes by up to 5, 4, 3, 2 or 1 with a chance of 1/5, 1/20, 1/12, 1/6 and 1/2)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        values (numpy.ndarray): the actual values (between 1 and 6)
+
+    Returns:
+        numpy.ndarray: the new values (between 1 and 6)
+    """
+    amplitudes = AMPLITUDES_MUTATION[np.searchsorted(THRESHOLDS_MUTATION, rng.random(values.shape), side='right')]
+    new_values = np.rint(values + rng.uniform(-amplitudes, amplitudes))  # Rounded like round (half to even)
+    return np.clip(new_values, 1, 6).astype(np.int8)
+
+
+def mutate(rng, genomes, chance_mutation):
+    """
+    Mutate the cars of the population, each dice mutates with a probability chance_mutation and each car has at least
+    one dice that mutates
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        genomes (numpy.ndarray): the population
+        chance_mutation (float): the chance of mutation of each dice
+
+    Returns:
+        numpy.ndarray: the population mutated
+    """
+    if chance_mutation <= 0:  # No dice can mutate
+        return genomes.copy()
+
+    mutated = rng.random(genomes.shape) < chance_mutation  # Dice that mutate
+    cars = np.flatnonzero(~mutated.any(axis=1))
+    while len(cars):  # We draw again the dice of the cars without mutation
+        mutated[cars] = rng.random((len(cars), 6)) < chance_mutation
+        cars = cars[~mutated[cars].any(axis=1)]
+
+    return np.where(mutated, random_attribution(rng, genomes), genomes)
+
+
+def find_duplicates(genomes, excluded):
+    """
+    Find the cars that have the same genetic as a previous car of the population or as an excluded genetic
+
+    Args:
+        genomes (numpy.ndarray): the population
+        excluded (numpy.ndarray): indexes of the excluded genetics
+
+    Returns:
+        numpy.ndarray: True for each duplicated car
+    """
+    indexes = genome_indexes(genomes)
+    duplicates = np.ones(len(genomes), dtype=bool)
+    duplicates[np.unique(indexes, return_index=True)[1]] = False  # The first car of each genetic is not a duplicate
+    return duplicates | np.isin(indexes, excluded)
+
+
+def remove_duplicates(rng, genomes, excluded, chance_mutation, operators=None):
+    """
+    Mutate again the duplicated cars until they are all different, after MAX_TRIES_MUTATION tries the cars still
+    duplicated get random genetics that are not in the population (if there are enough genetics)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        genomes (numpy.ndarray): the population (modified in place)
+        excluded (numpy.ndarray): indexes of the genetics that can't be in the population
+        chance_mutation (float): the chance of mutation of each dice
+        operators (numpy.ndarray): the operators that created each car (modified in place, None if not needed)
+    """
+    for _ in range(MAX_TRIES_MUTATION):
+        duplicates = find_duplicates(genomes, excluded)
+        if not duplicates.any():
+            return
+        genomes[duplicates] = mutate(rng, genomes[duplicates], chance_mutation)
+        if operators is not None:
+            operators[duplicates] |= OPERATOR_MUTATION
+
+    duplicates = np.flatnonzero(find_duplicates(genomes, excluded))
+    if len(duplicates):
+        used = np.concatenate((np.delete(genome_indexes(genomes), duplicates), excluded))
+        free = np.setdiff1d(np.arange(NB_GENOMES), used)  # Genetics that are not in the population
+        duplicates = duplicates[:len(free)]
+        genomes[duplicates] = genomes_from_indexes(rng.choice(free, size=len(duplicates), replace=False))
+        if operators is not None:
+            operators[duplicates] = OPERATOR_RANDOM
+
+
+def next_generation(rng, genomes_to_keep, scores_to_keep, number, chance_crossover, chance_mutation,
+                    selection=roulette_selection, return_parents=False):
+    """
+    Create the new cars of the next generation from the best cars: selection, crossover, mutation. The new cars are all
+    different and different from the best cars
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        genomes_to_keep (numpy.ndarray): the genetics of the best cars
+        scores_to_keep (numpy.ndarray): the scores of the best cars
+        number (int): number of new cars
+        chance_crossover (float): the chance of crossover of each pair of cars
+        chance_mutation (float): the chance of mutation of each dice
+        selection (function): the selection used to choose the cars that are copied (see SELECTIONS)
+        return_parents (bool): True to also return the parents of the new cars and the operators that created them
+
+    Returns:
+        numpy.ndarray: the genetics of the new cars, shape (number, 6)
+        numpy.ndarray: (if return_parents) the indexes in genomes_to_keep of the two parents of each new car, shape
+        (number, 2), -1 if the car has no second parent (not crossed) or no parent (random genetic)
+        numpy.ndarray: (if return_parents) the operators that created each new car (see OPERATOR_CROSSOVER...)
+    """
+    chosen = selection(rng, scores_to_keep, number)
+    genomes = genomes_to_keep[chosen]  # Copies of the chosen cars
+    parents = np.stack((chosen, np.full(number, -1)), axis=1).astype(np.int64)
+    crossover(rng, genomes, chance_crossover, parents)
+    operators = np.where(parents[:, 1] >= 0, OPERATOR_CROSSOVER, 0).astype(np.uint8)
+    mutated = mutate(rng, genomes, chance_mutation)
+    operators[(mutated != genomes).any(axis=1)] |= OPERATOR_MUTATION
+    genomes = mutated
+    remove_duplicates(rng, genomes, genome_indexes(genomes_to_keep), chance_mutation, operators)
+    parents[operators == OPERATOR_RANDOM] = -1
+    if return_parents:
+        return genomes, parents, operators
+    return genomes
@@ -0,0 +1,124 @@
+import numpy as np  # To draw the random configurations and compute the medians
+import itertools  # To create the configurations of the grid
+
+
+"""
+This file contains the search of the genetic parameters with successive halving: every configuration is run with a few
+seeds, then only the configurations completing a lap faster than the median get more seeds, and so on until one
+configuration is left or the configurations have the maximum number of seeds. The bad configurations are stopped after
+a few runs, so most of the simulation time is spent on the good ones
+"""
+
+
+def grid_configurations(grid):
+    """
+    Create all the configurations of a grid
+
+    Args:
+        grid (dict): values tested for each genetic parameter {name of the variable: list of values}
+
+    Returns:
+        list(dict): the configurations {name of the variable: value}
+    """
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+def random_configurations(rng, grid, number):
+    """
+    Draw random configurations between the smallest and the greatest value of each parameter of a grid (rounded to 2
+    decimals so that the same configuration can be found again in the results)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        grid (dict): values tested for each genetic parameter {name of the variable: list of values}
+        number (int): number of configurations
+
+    Returns:
+        list(dict): the configurations {name of the variable: value}, all different
+    """
+    configurations = {}
+    for _ in range(100 * number):  # The number of different configurations can be lower than number
+        configuration = {name: round(float(rng.uniform(min(values), max(values))), 2) for name, values in grid.items()}
+        configurations[tuple(configuration.values())] = configuration
+        if len(configurations) == number:
+            break
+    return list(configurations.values())
+
+
+class SuccessiveHalving:
+    """
+    Search of the best configuration of the genetic parameters (the lowest mean number of generations to complete a lap)
+    """
+    def __init__(self, results, run, min_seeds=5, max_seeds=50, factor=2):
+        """
+        Initialization of the search
+
+        Args:
+            results (SearchResults): results of the runs (the runs already saved are not run again)
+            run (function): function running the genetic algorithm (configuration, seed) -> number of the generation
+            where a car completed a lap
+            min_seeds (int): number of seeds of each configuration in the first round
+            max_seeds (int): maximum number of seeds of a configuration
+            factor (int): the number of seeds is multiplied by factor at each round
+        """
+        self.results, self.run_genetic = results, run
+        self.min_seeds, self.max_seeds, self.factor = min_seeds, max_seeds, factor
+        self.rounds = []  # Each round (number of seeds, number of configurations, median of the mean generations)
+        self.nb_runs = 0  # Number of runs of the genetic algorithm
+        self.nb_runs_saved = 0  # Number of runs found in the results of the previous searches
+
+    def __str__(self):
+        """
+        Return the string of the search (written in the files of the tests)
+        """
+        rounds = ' ; '.join(f'{nb_seeds} seeds {nb_configurations} configurations median {median:.2f}'
+                            for nb_seeds, nb_configurations, median in self.rounds)
+        return f'nb_runs = {self.nb_runs} ; nb_runs_saved = {self.nb_runs_saved} ; rounds = {rounds}'
+
+    def evaluate(self, configuration, nb_seeds, first_seed=0):
+        """
+        Run the configuration with the seeds first_seed to nb_seeds - 1 (the runs already saved are not run again)
+
+        Args:
+            configuration (dict): value of each genetic parameter {name of the variable: value}
+            nb_seeds (int): number of seeds
+            first_seed (int): first seed not run by the previous rounds
+
+        Returns:
+            float: mean number of generations to complete a lap with these seeds
+        """
+        generations = self.results.get_generations(configuration, nb_seeds)
+        for seed in range(first_seed, nb_seeds):
+            if seed in generations:
+                self.nb_runs_saved += 1
+            else:
+                self.results.add(configuration, seed, self.run_genetic(configuration, seed))
+                self.nb_runs += 1
+        return self.results.get_score(configuration, nb_seeds)
+
+    def search(self, configurations):
+        """
+        Find the best configurations with successive halving (all the configurations use the same seeds, so they are
+        compared on the same first generations)
+
+        Args:
+            configurations (list(dict)): configurations tested
+
+        Returns:
+            list: the configurations of the last round (configuration, mean number of generations), from the best to
+            the worst
+        """
+        nb_seeds, first_seed = min(self.min_seeds, self.max_seeds), 0
+        while True:
+            scores = np.array([self.evaluate(configuration, nb_seeds, first_seed) for configuration in configurations])
+            median = float(np.median(scores))
+            self.rounds.append((nb_seeds, len(configurations), median))
+
+            if len(configurations) == 1 or nb_seeds >= self.max_seeds:
+                order = np.argsort(scores, kind='stable')
+                return [(configurations[i], float(scores[i])) for i in order]
+
+            # Only the configurations better than the median get more seeds (the best ones if none is better)
+            better = scores < median if (scores < median).any() else scores == scores.min()
+            configurations = [configuration for configuration, kept in zip(configurations, better) if kept]
+            nb_seeds, first_seed = min(nb_seeds * self.factor, self.max_seeds), nb_seeds
@@ -0,0 +1,264 @@
+from game.genetic_operators import next_generation, genomes_from_indexes, genome_indexes, find_duplicates, remove_duplicates, SELECTIONS  # Genetic algorithm of the islands
+from data.fitness_table import NB_GENOMES  # Number of different genetics
+from game.fitness_cache import FitnessCache  # To not simulate the same cars again
+from game.simulation import Simulation  # To evaluate the cars without display
+from game.track import Track  # Data of the map
+import multiprocessing  # To run the islands in worker processes
+import numpy as np  # To store the populations in arrays
+import itertools  # To count the generations
+import queue  # To read the queues without waiting
+import time  # To compute the number of cars evaluated per second
+import os  # To start the workers without window
+
+
+"""
+This file contains the island model: several populations (islands) are evolved and evaluated at the same time, each one
+in its own process with the headless simulation. Every few generations the best cars of an island migrate to another
+island (the next one in a ring or a random one), so the islands exchange good genetics but stay different
+"""
+
+
+class IslandModel:
+    """
+    Islands evolved in worker processes. The workers send their populations after each evaluation, the main process
+    reads them with update (it also sends the migrants to their destinations) and shows the cars of one island
+    """
+    def __init__(self):
+        """
+        Initialization of the island model (the workers are started with start)
+        """
+        self.processes = []  # Process of each island
+        self.inboxes = []  # Queue of each island to send it the migrants (None to stop it)
+        self.outbox = None  # Queue where the islands send their populations and migrants
+        self.configuration = None  # Map and parameters of the islands (to know if they have to be restarted)
+        self.migration_topology = 'ring'  # 'ring' or 'random'
+        self.rng = None  # Generator used to choose the destinations of the random migrations
+
+        self.populations = []  # Last population of each island (num_generation, genomes, scores) or None, the genomes are sorted by score
+        self.num_island_displayed = -1  # Number of the last island displayed
+        self.generation_recorded = None  # Number of the island and number of the generation of the last population recorded
+        self.nb_evaluated = 0  # Number of cars evaluated by all the islands
+        self.time_start = None  # Time when the islands have been started
+
+    def __len__(self):
+        """
+        Returns:
+            int: number of islands running
+        """
+        return len(self.processes)
+
+    def match(self, num_map, parameters, genetic_parameters, nb_islands):
+        """
+        Check if the islands are running with this configuration
+
+        Args:
+            num_map (int): number of the map
+            parameters (SimulationParameters): parameters of the simulation
+            genetic_parameters (GeneticParameters): parameters of the genetic algorithm
+            nb_islands (int): number of islands
+
+        Returns:
+            bool: True if the islands are running with this configuration
+        """
+        return bool(self.processes) and self.configuration == (num_map, str(parameters), str(genetic_parameters), nb_islands)
+
+    def start(self, num_map, parameters, genetic_parameters, nb_islands, seed, migration_interval, nb_migrants,
+              migration_topology='ring'):
+        """
+        Start the islands (the islands already running are stopped)
+
+        Args:
+            num_map (int): number of the map
+            parameters (SimulationParameters): parameters of the simulation
+            genetic_parameters (GeneticParameters): parameters of the genetic algorithm of each island
+            nb_islands (int): number of islands
+            seed (int): seed of the islands (each island has its own generator created from this seed)
+            migration_interval (int): number of generations between two migrations
+            nb_migrants (int): number of best cars sent by an island at each migration
+            migration_topology (str): 'ring' (to the next island) or 'random' (to a random other island)
+        """
+        self.stop()
+        self.configuration = (num_map, str(parameters), str(genetic_parameters), nb_islands)
+        self.migration_topology = migration_topology
+        seeds = np.random.SeedSequence(seed).spawn(nb_islands + 1)
+        self.rng = np.random.default_rng(seeds[-1])
+
+        context = multiprocessing.get_context('spawn')
+        self.outbox = context.Queue()
+        self.inboxes = [context.Queue() for _ in range(nb_islands)]
+        self.processes = start_workers(context, run_island, [
+            (num_island, num_map, parameters, genetic_parameters, migration_interval, nb_migrants, seeds[num_island],
+             self.inboxes[num_island], self.outbox) for num_island in range(nb_islands)])
+
+        self.populations = [None] * nb_islands
+        self.num_island_displayed = -1
+        self.generation_recorded = None
+        self.nb_evaluated = 0
+        self.time_start = time.time()
+
+    def stop(self):
+        """
+        Stop the islands
+        """
+        for inbox in self.inboxes:
+            inbox.put(None)  # The island stops after its current generation
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():  # The island is still simulating its generation
+                process.terminate()
+        self.processes, self.inboxes, self.outbox, self.configuration = [], [], None, None
+        self.populations = []
+
+    def update(self):
+        """
+        Read the populations and the migrants sent by the islands, and send the migrants to their destinations
+        """
+        if self.outbox is None:
+            return
+
+        while True:
+            try:
+                message = self.outbox.get_nowait()
+            except queue.Empty:
+                return
+
+            if message[0] == 'generation':
+                _, num_island, num_generation, genomes, scores = message
+                self.populations[num_island] = (num_generation, genomes, scores)
+                self.nb_evaluated += len(genomes)
+            elif message[0] == 'migrants':
+                _, num_island, genomes = message
+                self.inboxes[self.get_destination(num_island)].put(genomes)
+
+    def get_destination(self, num_island):
+        """
+        Get the island where the migrants of an island go
+
+        Args:
+            num_island (int): number of the island sending the migrants
+
+        Returns:
+            int: number of the island receiving the migrants
+        """
+        nb_islands = len(self.processes)
+        if self.migration_topology == 'random' and nb_islands > 1:
+            return (num_island + self.rng.integers(1, nb_islands)) % nb_islands  # Any island except itself
+        return (num_island + 1) % nb_islands
+
+    def choose_island(self, mode='best'):
+        """
+        Choose the island to display
+
+        Args:
+            mode (str): 'best' (island with the best car) or 'cycle' (each island in turn)
+
+        Returns:
+            int: number of the island (None if no island has evaluated a generation yet)
+        """
+        islands = [num_island for num_island, population in enumerate(self.populations) if population is not None]
+        if not islands:
+            return None
+
+        if mode == 'cycle':
+            next_islands = [num_island for num_island in islands if num_island > self.num_island_displayed]
+            self.num_island_displayed = next_islands[0] if next_islands else islands[0]
+        else:
+            self.num_island_displayed = max(islands, key=lambda num_island: self.populations[num_island][2][0])
+        return self.num_island_displayed
+
+    def cars_per_second(self):
+        """
+        Returns:
+            float: number of cars evaluated per second by all the islands since they have been started
+        """
+        if self.time_start is None or time.time() == self.time_start:
+            return 0
+        return self.nb_evaluated / (time.time() - self.time_start)
+
+
+def start_workers(context, target, list_args):
+    """
+    Start worker processes running the game without display. The workers are spawned (not forked from the window) and
+    import the game, so they must not open a window
+
+    Args:
+        context (multiprocessing.context.BaseContext): context used to create the processes
+        target (function): function run by each worker
+        list_args (list(tuple)): arguments of the function for each worker
+
+    Returns:
+        list(multiprocessing.Process): the processes started
+    """
+    processes = []
+    video_driver = os.environ.get('SDL_VIDEODRIVER')
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    try:
+        for args in list_args:
+            process = context.Process(target=target, args=args, daemon=True)
+            process.start()
+            processes.append(process)
+    finally:
+        if video_driver is None:
+            del os.environ['SDL_VIDEODRIVER']
+        else:
+            os.environ['SDL_VIDEODRIVER'] = video_driver
+    return processes
+
+
+def run_island(num_island, num_map, parameters, genetic_parameters, migration_interval, nb_migrants, seed, inbox, outbox):
+    """
+    Evolve the population of an island until it receives None (function run in a worker process)
+
+    Args:
+        num_island (int): number of the island
+        num_map (int): number of the map
+        parameters (SimulationParameters): parameters of the simulation
+        genetic_parameters (GeneticParameters): parameters of the genetic algorithm
+        migration_interval (int): number of generations between two migrations
+        nb_migrants (int): number of best cars sent at each migration
+        seed (numpy.random.SeedSequence): seed of the generator of the island
+        inbox (multiprocessing.Queue): queue where the island receives the migrants (None to stop)
+        outbox (multiprocessing.Queue): queue where the island sends its populations and its migrants
+    """
+    outbox.cancel_join_thread()  # The island can stop without waiting that the main process reads its messages
+    rng = np.random.default_rng(seed)
+    simulation = Simulation(Track(num_map), parameters)
+    fitness_cache = FitnessCache()
+    selection = SELECTIONS[genetic_parameters.selection]
+    nb_cars = min(genetic_parameters.nb_cars, NB_GENOMES)
+    nb_kept = genetic_parameters.get_nb_cars_kept()
+
+    genomes = genomes_from_indexes(rng.choice(NB_GENOMES, size=nb_cars, replace=False))  # First population (all different)
+    for num_generation in itertools.count(1):
+        # Evaluation
+        scores = np.array(fitness_cache.evaluate(simulation, genomes.tolist()), dtype=np.float64)
+        order = np.argsort(-scores, kind='stable')  # From the best to the worst car
+        genomes, scores = genomes[order], scores[order]
+        outbox.put(('generation', num_island, num_generation, genomes, scores))
+        if num_generation % migration_interval == 0:
+            outbox.put(('migrants', num_island, genomes[:nb_migrants]))
+
+        # Migrants received since the last generation
+        migrants = []
+        while True:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:  # The island has to stop
+                return
+            migrants.append(message)
+
+        # Next generation, the migrants replace new cars
+        new_genomes = next_generation(rng, genomes[:nb_kept], scores[:nb_kept], nb_cars - nb_kept,
+                                      genetic_parameters.chance_crossover, genetic_parameters.chance_mutation, selection)
+        if migrants:
+            indexes_kept = genome_indexes(genomes[:nb_kept])
+            migrants = np.concatenate(migrants)
+            migrants = migrants[~find_duplicates(migrants, indexes_kept)][:len(new_genomes)]  # Migrants not already in the island
+            new_genomes[:len(migrants)] = migrants
+            remove_duplicates(rng, new_genomes, indexes_kept, genetic_parameters.chance_mutation)  # New cars equal to a migrant
+        genomes = np.concatenate((new_genomes, genomes[:nb_kept]))
+
+
+ISLAND_MODEL = IslandModel()  # Islands of the game
@@ -0,0 +1,105 @@
+from game.genetic_operators import genome_indexes  # To count the different genetics
+import numpy as np  # To compute the metrics of all the cars at once
+
+
+"""
+This file contains the class PopulationMetrics used to follow the diversity of the population and the scores from one
+generation to the next, to know when the genetic algorithm has converged. All the metrics cost O(n) per generation: the
+mean Hamming distance between two cars is computed from the number of cars with each value of each dice, not from the
+n² pairs of cars
+"""
+
+
+CONVERGENCE_DIVERSITY = 0.5  # Mean number of different dice between two cars under which the population has converged
+CONVERGENCE_PATIENCE = 10  # Number of generations without a better score after which the population has converged
+
+
+class PopulationMetrics:
+    """
+    Metrics of the populations of a run of the genetic algorithm, updated with each generation evaluated
+    """
+    def __init__(self):
+        """
+        Initialization of the metrics
+        """
+        self.num_generation = 0  # Number of generations evaluated since the beginning of the run
+        self.allele_counts = np.zeros((6, 6), dtype=np.int64)  # Number of cars with each value of each dice [dice, value - 1]
+        self.allele_frequencies = np.zeros((6, 6))  # Proportion of cars with each value of each dice
+        self.diversity = 0  # Mean number of different dice between two cars of the population (mean Hamming distance)
+        self.nb_unique = 0  # Number of different genetics in the population
+        self.best_score = self.mean_score = self.median_score = 0  # Scores of the population
+        self.best_score_run = None  # Best score since the beginning of the run
+        self.generations_without_improvement = 0  # Number of generations since the best score of the run has been reached
+        self.generation_converged = None  # Number of the generation evaluated when the population converged (None if it has not)
+        self.history = []  # Metrics of each generation (best score, mean score, diversity, number of different genetics)
+
+    def __str__(self):
+        """
+        Return the string of the metrics of the last generation (written in the files of the tests)
+        """
+        return f'diversity = {self.diversity:.3f} ; nb_unique = {self.nb_unique} ; best_score = {self.best_score} ; ' \
+               f'mean_score = {self.mean_score:.1f} ; median_score = {self.median_score} ; converged = {self.converged} ; ' \
+               f'generation_converged = {self.generation_converged}'
+
+    def reset(self):
+        """
+        Forget the metrics of the run (a new run begins)
+        """
+        self.__init__()
+
+    @property
+    def converged(self):
+        """
+        Returns:
+            bool: True if the population has converged (all the cars are almost the same or the best score doesn't
+            increase anymore)
+        """
+        return self.collapsed or (self.num_generation > 0 and self.generations_without_improvement >= CONVERGENCE_PATIENCE)
+
+    @property
+    def collapsed(self):
+        """
+        Returns:
+            bool: True if all the cars of the population are almost the same (the best score can still increase with
+            the mutations, but slowly)
+        """
+        return self.num_generation > 0 and self.diversity < CONVERGENCE_DIVERSITY
+
+    def update(self, genomes, scores):
+        """
+        Update the metrics with a generation evaluated
+
+        Args:
+            genomes (numpy.ndarray or list): dice values of each car, shape (n, 6)
+            scores (numpy.ndarray or list): score of each car
+        """
+        genomes = np.asarray(genomes, dtype=np.int64).reshape(-1, 6)
+        scores = np.asarray(scores, dtype=np.float64)
+        nb_cars = len(genomes)
+        if nb_cars == 0:
+            return
+        self.num_generation += 1
+
+        # Diversity: two cars have a different dice i if they have different values, so there are
+        # (n² - sum of the squared counts of the values) / 2 pairs of cars with a different dice i
+        self.allele_counts = np.bincount((genomes - 1 + 6 * np.arange(6)).ravel(), minlength=36).reshape(6, 6)
+        self.allele_frequencies = self.allele_counts / nb_cars
+        nb_pairs_different = (nb_cars * nb_cars - (self.allele_counts * self.allele_counts).sum(axis=1)) / 2
+        self.diversity = float(nb_pairs_different.sum() / (nb_cars * (nb_cars - 1) / 2)) if nb_cars > 1 else 0.
+        self.nb_unique = len(set(genome_indexes(genomes).tolist()))
+
+        # Scores
+        self.best_score, self.mean_score = scores.max().item(), float(scores.mean())
+        self.median_score = float(np.median(scores))
+        if self.best_score_run is None or self.best_score > self.best_score_run:
+            self.best_score_run = self.best_score
+            self.generations_without_improvement = 0
+        else:
+            self.generations_without_improvement += 1
+        if self.generation_converged is None and self.converged:
+            self.generation_converged = self.num_generation
+
+        self.history.append((self.best_score, self.mean_score, self.diversity, self.nb_unique))
+
+
+POPULATION_METRICS = PopulationMetrics()  # Metrics of the population of the game
@@ -0,0 +1,285 @@
+from game.track import ANGLE_STEP_MASKS  # Angle between two precomputed masks of the car
+import numpy as np  # To store the state of the cars in arrays
+
+
+"""
+This file contains the class Simulation used to evaluate cars without display. It reproduces the movements of the class
+Car but it only depends on a Track and on SimulationParameters, so it can be used in tests or in worker processes.
+The state of the population is stored in NumPy arrays (one array per attribute of the cars) so that all the cars alive
+are moved at the same time.
+"""
+
+
+# Constants for the car (same as in game/car.py)
+MIN_SPEED = 1  # Minimum speed of the car
+ADD_TO_SPEED_ANGLE = 2  # Value added to the speed angle each turn to make it equals to the real angle
+TURN_DECREASE_FACTOR = 1  # Factor of the decrease of the turn angle (when at high speed, the car turns 'turn_decrease_factor' times slower)
+MAX_TURNS_WITHOUT_CHECKPOINT = 150  # Number of turns without checkpoint after which the car is going in the wrong way
+
+
+class Simulation:
+    """
+    Headless simulation of a population of cars on a track
+    """
+    def __init__(self, track, parameters):
+        """
+        Initialization of the simulation
+
+        Args:
+            track (Track): track where the cars drive
+            parameters (SimulationParameters): physics parameters of the cars
+        """
+        self.track = track  # Track of the simulation
+        self.parameters = parameters  # Physics parameters of the simulation
+
+        self.half_width_car = track.car_image.get_width() / 2  # Distance between the center and the front of the car
+        self.checkpoints = np.array(track.checkpoints, dtype=np.float64).reshape(-1, 2)  # Coordinates of the checkpoints
+
+        self.reset([])  # Initialize the arrays of the state of the cars (empty population)
+
+    @property
+    def nb_cars_alive(self):
+        """
+        Returns:
+            int: number of cars alive
+        """
+        return len(self.alive)
+
+    def reset(self, genomes):
+        """
+        Place a new population at the start of the track
+
+        Args:
+            genomes (list(list(int))): dice values of each car
+        """
+        nb_cars = len(genomes)
+        self.dice_values = np.array(genomes, dtype=np.int8).reshape(nb_cars, 6)  # Genome of the cars
+
+        # Size of the 3 detection cones of each car (same as compute_cones, they only depend on the genome)
+        dice_values = self.dice_values.astype(np.float64)
+        self.length_cones = dice_values[:, :3] * self.parameters.length_cone
+        width_cones = dice_values[:, 3:] * self.parameters.width_cone
+        self.angle_cones = np.degrees(np.arctan(width_cones / (2 * self.length_cones)))
+        self.x = np.full(nb_cars, self.track.start_position[0], dtype=np.float64)  # Position of the cars on the x-axis
+        self.y = np.full(nb_cars, self.track.start_position[1], dtype=np.float64)  # Position of the cars on the y-axis
+        self.front_x, self.front_y = self.x.copy(), self.y.copy()  # Position of the front of the cars (computed during the first move)
+        self.angle = np.full(nb_cars, self.track.start_angle, dtype=np.float64)  # Angle of the cars
+        self.drift_angle = self.angle.copy()  # Speed angle of the cars
+        self.speed = np.zeros(nb_cars)  # Speed of the cars
+        self.acceleration = np.zeros(nb_cars)  # Acceleration of the cars
+        self.score = np.zeros(nb_cars)  # Score of the cars
+        self.next_checkpoint = np.zeros(nb_cars, dtype=np.int64)  # Next checkpoint to reach
+        self.turn_without_checkpoint = np.zeros(nb_cars, dtype=np.int64)  # Number of turn played without reaching a checkpoint
+        self.dead = np.zeros(nb_cars, dtype=bool)  # True if the car is dead
+        self.reverse = np.zeros(nb_cars, dtype=bool)  # True if the car is going in the wrong way
+        self.alive = np.arange(nb_cars)  # Indexes of the cars alive (the active set)
+        self.cones_used = np.zeros((nb_cars, 3), dtype=bool)  # True if the car has used the slow, medium or fast cone (the other dice are never read)
+        self.ticks_remaining = self.parameters.nb_ticks  # Number of ticks remaining for the generation
+
+        # Data used to know if the cars are stuck (see retire_cars)
+        self.sums_window = np.zeros((4, nb_cars))  # Sums of x, y, x² and y² of the positions of the cars since the beginning of the window
+        self.ticks_window = 0  # Number of ticks played since the beginning of the window
+
+    def evaluate(self, genomes):
+        """
+        Simulate a whole generation and return the scores of the cars
+
+        Args:
+            genomes (list(list(int))): dice values of each car
+
+        Returns:
+            list: score of each car (in the same order as the genomes)
+        """
+        self.reset(genomes)
+        while not self.finished():
+            self.step()
+        return self.scores()
+
+    def scores(self):
+        """
+        Returns:
+            list: score of each car (the number of checkpoints, or the distance driven on the waiting room)
+        """
+        if self.track.num_map == 5:
+            return self.score.tolist()
+        return self.score.astype(np.int64).tolist()
+
+    def finished(self):
+        """
+        Returns:
+            bool: True if all the cars are dead or if the time of the generation is over
+        """
+        return self.nb_cars_alive == 0 or self.ticks_remaining <= 0
+
+    def step(self):
+        """
+        Move all the cars alive by one tick (same as Car.move for each car)
+        """
+        parameters = self.parameters
+        drift_factor = parameters.drift_factor * 1.5 if parameters.rain_mode else parameters.drift_factor  # The rain increases the drift factor
+
+        alive = self.alive
+        is_reversing = self.reverse[alive]  # Cars going in the wrong way, we accelerate them until they crash
+        driving = alive[~is_reversing]  # Cars controlled by their detection cones
+
+        self.update_score(driving)
+        wall_left, wall_top, wall_right = self.detect_walls(driving)
+
+        # Update the acceleration and the speed
+        self.acceleration[driving] = np.where(wall_top != 0, self.acceleration[driving] - parameters.deceleration, parameters.acceleration)
+        self.acceleration[alive[is_reversing]] = parameters.acceleration
+        self.speed[alive] = np.maximum(np.minimum(self.speed[alive] + self.acceleration[alive], parameters.max_speed), MIN_SPEED)
+
+        # Change the angle of the cars depending on the detected walls
+        turn = np.minimum(parameters.turn_angle, parameters.turn_angle * parameters.max_speed / (TURN_DECREASE_FACTOR * self.speed[driving]))
+        has_left, has_right = wall_left != 0, wall_right != 0
+        turn = np.where(has_left & (~has_right | (wall_left < wall_right)), -turn, turn)  # We turn to the right if the closest wall is on the left
+        turn_angle = np.zeros(len(alive))  # The reversing cars don't turn
+        turn_angle[~is_reversing] = np.where(has_left | has_right, turn, 0)  # We don't turn the car if there is no wall
+        self.angle[alive] += turn_angle
+
+        # Update the drift angle
+        angle, drift_angle = self.angle[alive], self.drift_angle[alive]
+        close = np.abs(drift_angle - angle) <= 1e-09 * np.maximum(np.abs(drift_angle), np.abs(angle))  # Same as math.isclose
+        catch_up = (angle - ADD_TO_SPEED_ANGLE < drift_angle) & (drift_angle < angle + ADD_TO_SPEED_ANGLE)
+        drift_angle = np.where(close, drift_angle, np.where(catch_up, angle, np.where(drift_angle > angle, drift_angle - ADD_TO_SPEED_ANGLE, drift_angle + ADD_TO_SPEED_ANGLE)))
+        self.drift_angle[alive] = drift_angle + turn_angle / drift_factor
+
+        # Update the position
+        radians = np.radians(-self.drift_angle[alive])
+        self.x[alive] += np.cos(radians) * self.speed[alive]
+        self.y[alive] += np.sin(radians) * self.speed[alive]
+        self.compute_front_of_cars(alive)
+
+        self.detect_collisions(alive)
+
+        # Detect if the cars are going in the wrong way
+        if self.track.num_map != 5:
+            self.reverse[driving] |= self.turn_without_checkpoint[driving] > MAX_TURNS_WITHOUT_CHECKPOINT
+
+        if parameters.retirement:
+            self.retire_cars(alive[~self.dead[alive]])
+
+        self.alive = alive[~self.dead[alive]]  # Dead cars drop out of the active set
+        self.ticks_remaining -= 1
+
+    def retire_cars(self, cars):
+        """
+        Stop simulating the cars going in the wrong way and the cars that are stuck (same as Car.detect_retirement)
+
+        Args:
+            cars (numpy.ndarray): indexes of the cars alive
+        """
+        self.dead[cars[self.reverse[cars]]] = True  # Their score can't change anymore
+        cars = cars[~self.reverse[cars]]
+
+        x, y = self.x[cars], self.y[cars]
+        self.sums_window[0, cars] += x
+        self.sums_window[1, cars] += y
+        self.sums_window[2, cars] += x * x
+        self.sums_window[3, cars] += y * y
+        self.ticks_window += 1
+
+        if self.ticks_window == self.parameters.retirement_window:
+            sum_x, sum_y, sum_x2, sum_y2 = self.sums_window[:, cars]
+            mean_x, mean_y = sum_x / self.ticks_window, sum_y / self.ticks_window
+            variance = sum_x2 / self.ticks_window - mean_x * mean_x + sum_y2 / self.ticks_window - mean_y * mean_y
+            stuck = cars[variance < self.parameters.retirement_min_deviation * self.parameters.retirement_min_deviation]
+            self.dead[stuck] = True
+
+            self.sums_window[:] = 0
+            self.ticks_window = 0
+
+    def update_score(self, cars):
+        """
+        Update the score of the cars depending on the map and the checkpoints reached
+
+        Args:
+            cars (numpy.ndarray): indexes of the cars
+        """
+        if self.track.num_map == 5:  # This map is a waiting room where the car just have to drive the longest distance possible
+            self.score[cars] += self.speed[cars]
+            return
+
+        radius = self.track.radius_checkpoint
+        checkpoint_found = np.zeros(len(cars), dtype=bool)  # True if the car has passed at least one checkpoint
+        remaining = np.arange(len(cars))  # Cars that can still pass a checkpoint (a car can pass multiple checkpoints)
+        while len(remaining):
+            indexes = cars[remaining]
+            checkpoint = self.checkpoints[self.next_checkpoint[indexes]]
+            front_x, front_y = self.front_x[indexes], self.front_y[indexes]
+            reached = (checkpoint[:, 0] - radius < front_x) & (front_x < checkpoint[:, 0] + radius) & \
+                (checkpoint[:, 1] - radius < front_y) & (front_y < checkpoint[:, 1] + radius)
+            remaining = remaining[reached]
+            indexes = cars[remaining]
+            self.score[indexes] += 1
+            self.next_checkpoint[indexes] = (self.next_checkpoint[indexes] + 1) % len(self.checkpoints)
+            checkpoint_found[remaining] = True
+
+        self.turn_without_checkpoint[cars] = np.where(checkpoint_found, 0, self.turn_without_checkpoint[cars] + 1)
+
+    def detect_walls(self, cars):
+        """
+        Detect if there is wall in the detection cones of the cars
+
+        Args:
+            cars (numpy.ndarray): indexes of the cars
+
+        Returns:
+            numpy.ndarray: distance of the wall at the left, top and right of the cones (0 if there is no wall)
+        """
+        parameters = self.parameters
+        speed = self.speed[cars]
+        cone = np.where(speed < parameters.min_medium_speed, 0, np.where(speed < parameters.min_high_speed, 1, 2))  # Cone used by each car
+        self.cones_used[cars, cone] = True
+        length = self.length_cones[cars, cone]
+        angle_cone = self.angle_cones[cars, cone]
+
+        self.compute_front_of_cars(cars)
+        front_x, front_y = self.front_x[cars], self.front_y[cars]
+
+        # Points of the detection cones (same as compute_detection_cone_points)
+        angle = self.angle[cars]
+        points_x, points_y = [], []
+        for angle_point in (angle + angle_cone, angle, angle - angle_cone):  # Left, top, right
+            points_x.append(front_x + np.cos(np.radians(angle_point)) * length)
+            points_y.append(front_y - np.sin(np.radians(angle_point)) * length)
+
+        # We cast the 3 rays of all the cars at the same time
+        walls = self.track.cast_rays(np.tile(front_x, 3), np.tile(front_y, 3), np.concatenate(points_x), np.concatenate(points_y))
+        return walls.reshape(3, len(cars))
+
+    def compute_front_of_cars(self, cars):
+        """
+        Compute the coordinates of the front of the cars
+
+        Args:
+            cars (numpy.ndarray): indexes of the cars
+        """
+        radians = np.radians(-self.angle[cars])
+        self.front_x[cars] = self.x[cars] + np.cos(radians) * self.half_width_car
+        self.front_y[cars] = self.y[cars] + np.sin(radians) * self.half_width_car
+
+    def detect_collisions(self, cars):
+        """
+        Detect collision of the cars with the walls or with the borders of the window
+
+        Args:
+            cars (numpy.ndarray): indexes of the cars
+        """
+        x, y = self.x[cars], self.y[cars]
+        out_of_window = (x < 0) | (x > 1500) | (y < 0) | (y > 700)
+        self.dead[cars[out_of_window]] = True
+
+        # We use the precomputed masks of the rotated car (same as Track.detect_collision for each car)
+        cars = cars[~out_of_window]
+        num_masks = np.floor(self.angle[cars] / ANGLE_STEP_MASKS + 0.5).astype(np.int64) % len(self.track.car_masks)
+        center_x = np.sign(x[~out_of_window]) * np.floor(np.abs(x[~out_of_window]) + 0.5)  # Rounded like in pygame (half away from zero)
+        center_y = np.sign(y[~out_of_window]) * np.floor(np.abs(y[~out_of_window]) + 0.5)
+        half_sizes = np.array(self.track.car_masks_half_sizes)[num_masks]
+        left, top = (center_x - half_sizes[:, 0]).astype(np.int64), (center_y - half_sizes[:, 1]).astype(np.int64)
+
+        car_masks, overlap = self.track.car_masks, self.track.mask.overlap
+        for index, num_mask, pos_x, pos_y in zip(cars.tolist(), num_masks.tolist(), left.tolist(), top.tolist()):
+            if overlap(car_masks[num_mask], (pos_x, pos_y)) is not None:
+                self.dead[index] = True
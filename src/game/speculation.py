@@ -0,0 +1,190 @@
+from game.genetic_operators import genome_indexes, genomes_from_indexes  # To find the scores of the genetics
+from game.steady_state import run_worker  # Worker evaluating batches of cars
+from game.islands import start_workers  # To start the worker without window
+import data.variables as var  # Variables of the game
+import multiprocessing  # To evaluate the cars in a worker process
+import numpy as np  # To store the genetics in arrays
+import random  # To restore the random state when the prediction is wrong
+import queue  # To read the results without waiting
+
+
+"""
+This file contains the speculative evaluation of the next generation. While a generation is played, most cars die early:
+once enough cars are dead, the cars still alive are simulated without display in a worker process (the simulation is
+deterministic so it gives their final scores), so the cars kept for the next generation are known before the end of the
+generation. The new cars are then created and also simulated by the worker. At the end of the generation, if the cars
+kept are the ones predicted, the new cars created in advance are used and their scores are already known
+"""
+
+
+PROPORTION_DEAD = 0.5  # Proportion of dead cars after which the cars alive are simulated by the worker
+
+
+class Speculation:
+    """
+    Speculative evaluation of the next generation, with its statistics (hit rate)
+    """
+    def __init__(self):
+        """
+        Initialization of the speculation (the worker is started with start)
+        """
+        self.processes = []  # Process of the worker (empty if it's not running)
+        self.tasks, self.results = None, None  # Queues of the cars to simulate (None to stop) and of the cars simulated
+        self.configuration = None  # Map and hash of the parameters of the worker
+
+        self.known_scores = {}  # Scores of the genetics simulated by the worker {index: score}
+        self.waiting = set()  # Indexes of the genetics sent to the worker and not simulated yet
+        self.prediction = None  # Prediction of the generation (cars kept, new genetics, random state before creating them)
+
+        self.nb_speculations, self.nb_hits = 0, 0  # Number of predictions checked and of predictions that were right
+        self.nb_cars_checked, self.nb_cars_right = 0, 0  # Number of cars with a predicted score and of right scores
+
+    def hit_rate(self):
+        """
+        Returns:
+            float: proportion of the predictions of the cars kept that were right
+        """
+        return self.nb_hits / self.nb_speculations if self.nb_speculations else 0
+
+    def start(self, num_map, parameters):
+        """
+        Start the worker (the worker already running is stopped)
+
+        Args:
+            num_map (int): number of the map
+            parameters (SimulationParameters): parameters of the simulation
+        """
+        self.stop()
+        self.configuration = (num_map, parameters.get_hash())
+        context = multiprocessing.get_context('spawn')
+        self.tasks, self.results = context.Queue(), context.Queue()
+        self.processes = start_workers(context, run_worker, [(num_map, parameters, self.tasks, self.results)])
+
+    def stop(self):
+        """
+        Stop the worker and forget the scores (they depend on the map and the parameters)
+        """
+        if self.tasks is not None:
+            self.tasks.put(None)  # The worker stops after its current batch
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self.processes, self.tasks, self.results, self.configuration = [], None, None, None
+        self.known_scores, self.waiting, self.prediction = {}, set(), None
+
+    def send(self, indexes):
+        """
+        Send genetics to the worker (the genetics already simulated or sent are not sent again)
+
+        Args:
+            indexes (list(int)): indexes of the genetics
+        """
+        indexes = [index for index in dict.fromkeys(indexes) if index not in self.known_scores and index not in self.waiting]
+        if indexes:
+            self.waiting.update(indexes)
+            self.tasks.put(genomes_from_indexes(indexes))
+
+    def update(self, cars, num_map, parameters, create_genomes):
+        """
+        Read the scores simulated by the worker, and predict the next generation when the score of each car is known
+        (called at each turn of the game)
+
+        Args:
+            cars (list): cars of the generation played
+            num_map (int): number of the map
+            parameters (SimulationParameters): parameters of the simulation
+            create_genomes (function): function creating the new cars from the cars kept
+            (genomes_to_keep, scores_to_keep, number) -> (genetics of the new cars, parents, operators)
+        """
+        if self.configuration != (num_map, parameters.get_hash()):  # The scores of the worker are not valid anymore
+            self.start(num_map, parameters)
+
+        while True:
+            try:
+                genomes, scores, _ = self.results.get_nowait()
+            except queue.Empty:
+                break
+            for index, score in zip(genome_indexes(genomes).tolist(), scores):
+                self.known_scores[index] = score
+                self.waiting.discard(index)
+
+        if self.prediction is not None:  # The next generation has already been predicted
+            return
+
+        cars = [car for car in cars if not car.id_memory_car]  # The cars of the garage are not used by the genetic algorithm
+        if not cars:
+            return
+        alive = [car.genetic.index for car in cars if not car.dead]
+        if len(alive) > (1 - PROPORTION_DEAD) * len(cars) and any(index not in self.known_scores for index in alive):
+            return  # Too many cars alive to simulate them
+        self.send(alive)
+        if any(index not in self.known_scores for index in alive):
+            return
+
+        # The score of each car is known: final score of the dead cars and score simulated for the cars alive
+        scores = [self.known_scores[car.genetic.index] if not car.dead else car.score for car in cars]
+        order = sorted(range(len(cars)), key=lambda num_car: scores[num_car], reverse=True)  # Same order as apply_genetic
+        nb_kept = max(min(int(var.PROPORTION_CARS_KEPT * len(cars)), var.NB_CARS), 1)
+        kept = order[:nb_kept]
+        genomes_to_keep = np.array([cars[num_car].genetic.dice_values for num_car in kept], dtype=np.int8)
+        scores_to_keep = [scores[num_car] for num_car in kept]
+
+        # The random module is not used during a generation, so the new cars are the same as at the end of the generation
+        random_state = random.getstate()
+        new_cars = create_genomes(genomes_to_keep, scores_to_keep, var.NB_CARS - nb_kept)
+        self.prediction = (self.get_key(genome_indexes(genomes_to_keep).tolist(), scores_to_keep, var.NB_CARS - nb_kept),
+                           new_cars, random_state, {index: self.known_scores[index] for index in alive})
+        self.send(genome_indexes(new_cars[0]).tolist())  # The scores of the next generation are computed in advance
+
+    @staticmethod
+    def get_key(indexes_to_keep, scores_to_keep, number):
+        """
+        Get the key of a prediction: the new cars created in advance can be used if the key is the same at the end of
+        the generation
+
+        Args:
+            indexes_to_keep (list(int)): indexes of the genetics of the cars kept (from the best to the worst)
+            scores_to_keep (list): scores of the cars kept
+            number (int): number of new cars
+
+        Returns:
+            tuple: key of the prediction
+        """
+        return (tuple(indexes_to_keep), tuple(scores_to_keep), number, var.CHANCE_CROSSOVER, var.CHANCE_MUTATION,
+                var.SELECTION)
+
+    def take(self, cars, cars_to_keep, number):
+        """
+        Get the new cars created in advance if the cars kept are the ones predicted (at the end of the generation)
+
+        Args:
+            cars (list): cars of the generation played (without the cars of the garage)
+            cars_to_keep (list): cars kept for the next generation (from the best to the worst)
+            number (int): number of new cars
+
+        Returns:
+            tuple: the new cars (genetics, parents, operators), None if the prediction was wrong or if there is no
+            prediction
+        """
+        if self.prediction is None:
+            return None
+        key, new_cars, random_state, predicted_scores = self.prediction
+        self.prediction = None
+
+        for car in cars:
+            if car.genetic.index in predicted_scores:
+                self.nb_cars_checked += 1
+                self.nb_cars_right += car.score == predicted_scores[car.genetic.index]
+            if car.dead:  # The score of the car is final, it's known if the car is in the next generation
+                self.known_scores[car.genetic.index] = car.score
+
+        self.nb_speculations += 1
+        if key == self.get_key([car.genetic.index for car in cars_to_keep], [car.score for car in cars_to_keep], number):
+            self.nb_hits += 1
+            return new_cars
+        random.setstate(random_state)  # The new cars are created as if there was no prediction
+        return None
+
+
+SPECULATION = Speculation()  # Speculative evaluation of the next generation of the game
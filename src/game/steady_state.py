@@ -0,0 +1,299 @@
+from game.genetic_operators import next_generation, genome_indexes, genomes_from_indexes, SELECTIONS  # To create the new cars
+from game.islands import start_workers  # To start the workers without window
+from data.fitness_table import NB_GENOMES  # Number of different genetics
+from game.fitness_cache import FitnessCache  # To not simulate the same cars again
+from game.simulation import Simulation  # To evaluate the cars without display
+from game.track import Track  # Data of the map
+import multiprocessing  # To evaluate the cars in worker processes
+import numpy as np  # To store the population in arrays
+import math  # To round the number of batches
+import time  # To compute the proportion of time the workers are busy
+
+
+"""
+This file contains the steady-state genetic algorithm: there are no generations, so no car waits for the slowest car of
+its generation. The new cars are sent by small batches to a pool of workers, and as soon as a worker sends the scores of
+a batch, the cars are inserted in the population (each one replaces a car chosen by the replacement policy) and a new
+batch is created from the current population and sent to the free worker. The workers are never waiting for the others
+"""
+
+
+SIZE_TOURNAMENT = 3  # Number of cars in each tournament of the tournament replacement
+NB_BATCHES_PER_WORKER = 2  # Number of batches waiting for each worker (a worker takes the next one as soon as it's free)
+
+
+def replace_worst(rng, scores, births):
+    """
+    Choose the worst car of the population (the oldest one if there are several)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        births (numpy.ndarray): the number of the insertion of each car in the population
+
+    Returns:
+        int: the index of the car replaced
+    """
+    worst = np.flatnonzero(scores == scores.min())
+    return int(worst[births[worst].argmin()])
+
+
+def replace_oldest(rng, scores, births):
+    """
+    Choose the car inserted first in the population
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        births (numpy.ndarray): the number of the insertion of each car in the population
+
+    Returns:
+        int: the index of the car replaced
+    """
+    return int(births.argmin())
+
+
+def replace_tournament(rng, scores, births):
+    """
+    Choose the loser of a tournament: SIZE_TOURNAMENT random cars are compared and the worst one is replaced (the bad
+    cars are often replaced, but not always the same ones)
+
+    Args:
+        rng (numpy.random.Generator): the random generator
+        scores (numpy.ndarray): the score of each car
+        births (numpy.ndarray): the number of the insertion of each car in the population
+
+    Returns:
+        int: the index of the car replaced
+    """
+    candidates = rng.integers(0, len(scores), size=SIZE_TOURNAMENT)
+    return int(candidates[scores[candidates].argmin()])
+
+
+REPLACEMENTS = {'pire': replace_worst, 'ancienne': replace_oldest, 'tournoi': replace_tournament}  # Replacement policies by name
+
+
+class SteadyStateGA:
+    """
+    Steady-state genetic algorithm evaluating the cars in worker processes (or in the main process if there is no worker)
+    """
+    def __init__(self, num_map, parameters, genetic_parameters, replacement='pire', nb_workers=1, size_batch=8, seed=None):
+        """
+        Initialization of the genetic algorithm (the workers are started with run)
+
+        Args:
+            num_map (int): number of the map
+            parameters (SimulationParameters): parameters of the simulation
+            genetic_parameters (GeneticParameters): parameters of the genetic algorithm (nb_cars is the size of the
+            population)
+            replacement (str): name of the replacement policy (see REPLACEMENTS)
+            nb_workers (int): number of worker processes (0 to evaluate the cars in the main process)
+            size_batch (int): number of new cars sent at once to a worker (the crossover exchanges dice between the
+            cars of a batch, so with 1 car per batch the new cars are only mutated)
+            seed (int): seed of the random generator
+        """
+        self.num_map, self.parameters, self.genetic_parameters = num_map, parameters, genetic_parameters
+        self.replacement = replacement  # Name of the replacement policy
+        self.nb_workers, self.size_batch = nb_workers, size_batch
+        self.rng = np.random.default_rng(seed)  # Generator of all the random numbers of the algorithm
+        self.size_population = min(genetic_parameters.nb_cars, NB_GENOMES)  # Number of cars of the population
+
+        self.genomes = np.zeros((0, 6), dtype=np.int8)  # Genetics of the cars of the population
+        self.scores = np.zeros(0)  # Score of each car of the population
+        self.births = np.zeros(0, dtype=np.int64)  # Number of the insertion of each car (to find the oldest car)
+        self.indexes = set()  # Indexes of the genetics of the population (a genetic is only once in the population)
+        self.nb_evaluated = 0  # Number of cars evaluated
+        self.nb_inserted = 0  # Number of cars inserted in the population
+        self.history = []  # Best score of the population after each batch (number of cars evaluated, best score)
+
+        self.time_busy = 0  # Time spent by the workers to evaluate the cars (in seconds)
+        self.time_run = 0  # Time spent in run (in seconds)
+
+    def __str__(self):
+        """
+        Return the string of the algorithm (written in the files of the tests)
+        """
+        return f'replacement = {self.replacement} ; nb_workers = {self.nb_workers} ; size_batch = {self.size_batch} ; ' \
+               f'best_score = {self.best_score()} ; utilization = {self.utilization():.3f}'
+
+    def best_score(self):
+        """
+        Returns:
+            int or float: best score of the population (0 if no car has been evaluated)
+        """
+        return self.scores.max().item() if len(self.scores) else 0
+
+    def utilization(self):
+        """
+        Returns:
+            float: proportion of the time of run spent by the workers to evaluate cars
+        """
+        return self.time_busy / (max(self.nb_workers, 1) * self.time_run) if self.time_run else 0
+
+    def insert(self, genome, score):
+        """
+        Insert a car in the population. When the population is full, the car replaces the car chosen by the replacement
+        policy if it's not worse (except with the replacement of the oldest car, where the new car is always inserted)
+
+        Args:
+            genome (numpy.ndarray): dice values of the car
+            score (int or float): score of the car
+
+        Returns:
+            bool: True if the car has been inserted
+        """
+        index = int(genome_indexes(genome[None])[0])
+        if index in self.indexes:  # This genetic has been created by two batches evaluated at the same time
+            return False
+
+        if len(self.scores) < self.size_population:
+            self.genomes = np.concatenate((self.genomes, genome[None]))
+            self.scores = np.append(self.scores, score)
+            self.births = np.append(self.births, self.nb_inserted)
+        else:
+            replaced = REPLACEMENTS[self.replacement](self.rng, self.scores, self.births)
+            if self.replacement != 'ancienne' and score < self.scores[replaced]:
+                return False
+            self.indexes.discard(int(genome_indexes(self.genomes[replaced][None])[0]))
+            self.genomes[replaced], self.scores[replaced], self.births[replaced] = genome, score, self.nb_inserted
+
+        self.indexes.add(index)
+        self.nb_inserted += 1
+        return True
+
+    def create_batches(self):
+        """
+        Create the next batches of new cars: the first cars are random, then the new cars are created from the current
+        population (selection, crossover, mutation)
+
+        Returns:
+            list(numpy.ndarray): the batches of new cars
+        """
+        if self.nb_evaluated == 0:  # First population (all different), split so that each worker has batches to evaluate
+            genomes = genomes_from_indexes(self.rng.choice(NB_GENOMES, size=self.size_population, replace=False))
+            nb_batches = max(math.ceil(len(genomes) / self.size_batch), NB_BATCHES_PER_WORKER * self.nb_workers)
+            return np.array_split(genomes, min(nb_batches, len(genomes)))
+
+        return [next_generation(self.rng, self.genomes, self.scores, self.size_batch, self.genetic_parameters.chance_crossover,
+                                self.genetic_parameters.chance_mutation, SELECTIONS[self.genetic_parameters.selection])]
+
+    def receive(self, genomes, scores):
+        """
+        Insert the cars of a batch evaluated
+
+        Args:
+            genomes (numpy.ndarray): dice values of the cars of the batch
+            scores (list): score of each car
+        """
+        for genome, score in zip(genomes, scores):
+            self.insert(genome, score)
+        self.nb_evaluated += len(genomes)
+        self.history.append((self.nb_evaluated, self.best_score()))
+
+    def run(self, nb_evaluations, stop_score=None):
+        """
+        Evolve the population until nb_evaluations cars have been evaluated or a car has a score over stop_score
+
+        Args:
+            nb_evaluations (int): maximum number of cars evaluated
+            stop_score (int or float): score after which we stop (None to evaluate nb_evaluations cars)
+
+        Returns:
+            int: number of cars evaluated
+        """
+        time_start = time.time()
+        if self.nb_workers == 0:
+            self.run_main_process(nb_evaluations, stop_score)
+        else:
+            self.run_workers(nb_evaluations, stop_score)
+        self.time_run += time.time() - time_start
+        return self.nb_evaluated
+
+    def finished(self, nb_evaluations, stop_score):
+        """
+        Args:
+            nb_evaluations (int): maximum number of cars evaluated
+            stop_score (int or float): score after which we stop (None to evaluate nb_evaluations cars)
+
+        Returns:
+            bool: True if the algorithm has to stop
+        """
+        return self.nb_evaluated >= nb_evaluations or (stop_score is not None and self.best_score() > stop_score)
+
+    def run_main_process(self, nb_evaluations, stop_score):
+        """
+        Evolve the population evaluating the batches one by one in the main process (same algorithm without worker)
+
+        Args:
+            nb_evaluations (int): maximum number of cars evaluated
+            stop_score (int or float): score after which we stop
+        """
+        simulation = Simulation(Track(self.num_map), self.parameters)
+        fitness_cache = FitnessCache()
+        batches = []  # Batches waiting to be evaluated
+        while not self.finished(nb_evaluations, stop_score):
+            if not batches:
+                batches = self.create_batches()
+            genomes = batches.pop(0)
+            time_start = time.time()
+            scores = fitness_cache.evaluate(simulation, genomes.tolist())
+            self.time_busy += time.time() - time_start
+            self.receive(genomes, scores)
+
+    def run_workers(self, nb_evaluations, stop_score):
+        """
+        Evolve the population with the workers: each batch evaluated is immediately replaced by a new batch
+
+        Args:
+            nb_evaluations (int): maximum number of cars evaluated
+            stop_score (int or float): score after which we stop
+        """
+        context = multiprocessing.get_context('spawn')
+        tasks, results = context.Queue(), context.Queue()  # Batches to evaluate (None to stop) and batches evaluated
+        processes = start_workers(context, run_worker, [(self.num_map, self.parameters, tasks, results)] * self.nb_workers)
+
+        try:
+            nb_waiting = 0  # Number of batches sent and not evaluated yet
+            for genomes in self.create_batches():
+                tasks.put(genomes)
+                nb_waiting += 1
+
+            while nb_waiting:
+                genomes, scores, time_busy = results.get()
+                nb_waiting -= 1
+                self.time_busy += time_busy
+                self.receive(genomes, scores)
+                if not self.finished(nb_evaluations, stop_score):  # The free worker gets a new batch
+                    tasks.put(self.create_batches()[0])
+                    nb_waiting += 1
+                elif stop_score is not None and self.best_score() > stop_score:  # We don't wait for the other batches
+                    break
+        finally:
+            for _ in processes:
+                tasks.put(None)
+            for process in processes:
+                process.join(timeout=1)
+                if process.is_alive():  # The worker is still evaluating a batch
+                    process.terminate()
+
+
+def run_worker(num_map, parameters, tasks, results):
+    """
+    Evaluate the batches of cars until it receives None (function run in a worker process)
+
+    Args:
+        num_map (int): number of the map
+        parameters (SimulationParameters): parameters of the simulation
+        tasks (multiprocessing.Queue): queue where the worker takes the batches to evaluate (None to stop)
+        results (multiprocessing.Queue): queue where the worker sends the batches evaluated
+    """
+    results.cancel_join_thread()  # The worker can stop without waiting that the main process reads its results
+    simulation = Simulation(Track(num_map), parameters)
+    fitness_cache = FitnessCache()
+    while True:
+        genomes = tasks.get()
+        if genomes is None:
+            return
+        time_start = time.time()
+        scores = fitness_cache.evaluate(simulation, genomes.tolist())
+        results.put((genomes, scores, time.time() - time_start))
@@ -0,0 +1,167 @@
+from game.genetic_operators import genome_indexes  # To find the genetics already evaluated
+from data.fitness_table import NB_GENOMES  # Number of different genetics
+import numpy as np  # To predict the scores of all the cars at once
+
+
+"""
+This file contains the class SurrogateModel used to predict the score of a genetic from the scores of the genetics
+already evaluated (mean score of its nearest neighbours on the grid of the dice values). The new cars that are predicted
+far below the cars kept are replaced before being simulated, so the simulation is only spent on promising cars
+"""
+
+
+NB_NEIGHBOURS = 5  # Number of evaluated genetics used to predict the score of a genetic
+MIN_NB_EVALUATED = 20  # Number of evaluated genetics needed to use the predictions
+PROPORTION_CUTOFF = 0.5  # A new car is rejected if its predicted score is lower than this proportion of the cutoff
+MAX_ROUNDS_SCREENING = 3  # Maximum number of times the rejected cars are replaced
+CHANCE_AUDIT = 0.1  # Chance that a rejected car is simulated anyway (to know if the rejections are right)
+SIZE_CHUNK = 256  # Number of genetics predicted at the same time (to limit the memory used by the distances)
+
+
+class SurrogateModel:
+    """
+    Model predicting the scores of the genetics on a map from all the genetics evaluated on this map, it also counts how
+    often its predictions were right once the cars have been simulated
+    """
+    def __init__(self):
+        """
+        Initialization of the model
+        """
+        self.configuration = None  # Map and hash of the parameters of the scores
+        self.scores = np.full(NB_GENOMES, np.nan)  # Score of each genetic evaluated (NaN if not evaluated)
+        self.evaluated = np.zeros((0, 6), dtype=np.int64)  # Dice values of the genetics evaluated
+        self.scores_evaluated = np.zeros(0)  # Scores of the genetics evaluated (same order)
+
+        self.predictions = {}  # Predictions waiting for the simulation {index: (threshold, True if the car was rejected)}
+        self.nb_rejected = 0  # Number of new cars rejected
+        self.nb_checked, self.nb_right = 0, 0  # Number of cars kept that have been simulated and that were right (score over the threshold)
+        self.nb_audited, self.nb_audited_right = 0, 0  # Number of rejected cars simulated and that were right (score under the threshold)
+
+    def __str__(self):
+        """
+        Return the string of the model
+        """
+        return f'SurrogateModel : nb_evaluated = {len(self.scores_evaluated)} ; nb_rejected = {self.nb_rejected} ; ' \
+               f'accuracy = {self.accuracy():.3f} ; accuracy_rejections = {self.accuracy_rejections():.3f}'
+
+    def set_configuration(self, num_map, hash_parameters):
+        """
+        Forget the scores if the map or the parameters have changed
+
+        Args:
+            num_map (int): number of the map
+            hash_parameters (str): hash of the parameters of the simulation
+        """
+        if self.configuration != (num_map, hash_parameters):
+            self.__init__()
+            self.configuration = (num_map, hash_parameters)
+
+    def accuracy(self):
+        """
+        Returns:
+            float: proportion of the cars kept by the model that got a score over the threshold of rejection
+        """
+        return self.nb_right / self.nb_checked if self.nb_checked else 0
+
+    def accuracy_rejections(self):
+        """
+        Returns:
+            float: proportion of the rejected cars simulated anyway that got a score under the threshold of rejection
+        """
+        return self.nb_audited_right / self.nb_audited if self.nb_audited else 0
+
+    def add(self, genomes, scores):
+        """
+        Add the scores of cars that have been simulated (and check the predictions made for these cars)
+
+        Args:
+            genomes (numpy.ndarray or list): dice values of each car, shape (n, 6)
+            scores (numpy.ndarray or list): score of each car
+        """
+        genomes = np.asarray(genomes, dtype=np.int64).reshape(-1, 6)
+        scores = np.asarray(scores, dtype=np.float64)
+        indexes = genome_indexes(genomes)
+
+        for index, score in zip(indexes.tolist(), scores.tolist()):
+            prediction = self.predictions.pop(index, None)
+            if prediction is not None:
+                threshold, rejected = prediction
+                if rejected:
+                    self.nb_audited += 1
+                    self.nb_audited_right += score < threshold
+                else:
+                    self.nb_checked += 1
+                    self.nb_right += score >= threshold
+
+        new = np.zeros(len(indexes), dtype=bool)  # Genetics not evaluated before (first occurrence only)
+        new[np.unique(indexes, return_index=True)[1]] = True
+        new &= np.isnan(self.scores[indexes])
+        self.scores[indexes[new]] = scores[new]
+        self.evaluated = np.concatenate((self.evaluated, genomes[new]))
+        self.scores_evaluated = np.concatenate((self.scores_evaluated, scores[new]))
+
+    def predict(self, genomes):
+        """
+        Predict the scores of genetics (the real score if the genetic has been evaluated, else the mean score of the
+        NB_NEIGHBOURS closest genetics evaluated, with the sum of the differences of the dice as distance)
+
+        Args:
+            genomes (numpy.ndarray): dice values of each car, shape (n, 6)
+
+        Returns:
+            numpy.ndarray: predicted score of each car (NaN if no genetic has been evaluated)
+        """
+        genomes = np.asarray(genomes, dtype=np.int64).reshape(-1, 6)
+        predictions = self.scores[genome_indexes(genomes)]
+        nb_neighbours = min(NB_NEIGHBOURS, len(self.scores_evaluated))
+        if nb_neighbours == 0:
+            return predictions
+
+        unknown = np.flatnonzero(np.isnan(predictions))
+        for start in range(0, len(unknown), SIZE_CHUNK):
+            cars = unknown[start:start + SIZE_CHUNK]
+            distances = np.abs(genomes[cars, None, :] - self.evaluated[None, :, :]).sum(axis=2)
+            neighbours = np.argpartition(distances, nb_neighbours - 1, axis=1)[:, :nb_neighbours]
+            predictions[cars] = self.scores_evaluated[neighbours].mean(axis=1)
+        return predictions
+
+    def screen(self, rng, genomes, cutoff, create_genomes, *data):
+        """
+        Replace the new cars predicted far below the cutoff by other new cars (at most MAX_ROUNDS_SCREENING times)
+
+        Args:
+            rng (numpy.random.Generator): the random generator
+            genomes (numpy.ndarray): dice values of the new cars (modified in place)
+            cutoff (float): score of the worst car kept for the next generation
+            create_genomes (function): function creating a number of new cars (number -> numpy.ndarray, or a tuple
+            (genomes, *data) if data is given)
+            data (numpy.ndarray): other arrays with one line per new car (modified in place, the lines of the cars
+            replaced are replaced by the lines created with the new cars)
+        """
+        self.predictions = {}  # The predictions of the previous generation have all been checked
+        if len(self.scores_evaluated) < MIN_NB_EVALUATED or cutoff <= 0:
+            return
+
+        threshold = PROPORTION_CUTOFF * cutoff  # Score under which a car is rejected
+        audited = np.zeros(len(genomes), dtype=bool)  # Rejected cars simulated anyway
+        for _ in range(MAX_ROUNDS_SCREENING):
+            rejected = (self.predict(genomes) < threshold) & ~audited
+            new_audited = rejected & (rng.random(len(genomes)) < CHANCE_AUDIT)
+            audited |= new_audited
+            rejected &= ~new_audited
+            if not rejected.any():
+                break
+            self.nb_rejected += int(rejected.sum())
+            created = create_genomes(int(rejected.sum()))
+            if data:
+                created, *data_created = created
+                for array, array_created in zip(data, data_created):
+                    array[rejected] = array_created
+            genomes[rejected] = created
+
+        # The predictions are checked when the cars are simulated
+        for index, car_audited in zip(genome_indexes(genomes).tolist(), audited.tolist()):
+            self.predictions[index] = (threshold, car_audited)
+
+
+SURROGATE_MODEL = SurrogateModel()  # Model predicting the scores of the cars of the current map
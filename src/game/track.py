@@ -0,0 +1,206 @@
+from data.constants import PATH_DATA, PATH_IMAGE, CAR_SIZES, START_POSITIONS, START_ANGLES  # Import the constants
+from other.utils import compute_distance_transform  # To compute the distance between each pixel and the walls
+import numpy as np  # To cast the rays of all the cars at the same time
+import pygame  # To use pygame
+import math  # To use math
+
+
+"""
+This file contains the class Track used to store all the data of a map that is needed to simulate the cars. It doesn't
+use the window of the game so that it can be used by the headless simulation (tests, worker processes, ...)
+"""
+
+
+WALL_PADDING = 1  # Number of pixels of walls added around the window in the padded array of the walls
+ANGLE_STEP_MASKS = 1  # Angle (in degrees) between two precomputed collision masks of the car
+
+
+class Track:
+    """
+    Class representing a map (circuit) used to simulate the cars
+    """
+    def __init__(self, num_map):
+        """
+        Load the data of the map
+
+        Args:
+            num_map (int): number of the map
+        """
+        self.num_map = num_map  # Number of the map
+        self.start_position = START_POSITIONS[num_map]  # Start position of the cars
+        self.start_angle = START_ANGLES[num_map]  # Start angle of the cars
+        self.radius_checkpoint = 7.5 * CAR_SIZES[num_map]  # Radius of the checkpoints
+
+        # We create a background to create the mask of collision, this background has a size of 1500*700
+        background = pygame.Surface((1500, 700))  # Image of the background
+        background.blit(pygame.transform.scale(pygame.image.load(f'{PATH_IMAGE}background/background_{num_map}.png'), (1500, 585)), (0, 115))  # Blit the circuit on the background surface
+        self.mask = pygame.mask.from_threshold(background, (0, 0, 0, 255), threshold=(1, 1, 1, 1))  # Mask of the black pixels of the background (used to detect collisions)
+        self.walls = pygame.surfarray.array_red(self.mask.to_surface()).T > 0  # Same mask in a boolean array (indexed by [y, x])
+        self.padded_walls = np.pad(self.walls, WALL_PADDING, constant_values=True)  # Walls surrounded by walls (the outside of the window is a wall)
+        self.distances = compute_distance_transform(self.walls)  # Distance between each pixel and the closest wall (0 for the walls)
+        self.distances_bytes = self.distances.tobytes()  # Same distances in bytes (faster to read one by one, index y * 1500 + x)
+
+        # Image of the car (scaled like in render.resizing.scale_image)
+        image = pygame.image.load(PATH_IMAGE + 'car.png')
+        factor = CAR_SIZES[num_map] / 75
+        self.car_image = pygame.transform.scale(image, (round(image.get_width() * factor), round(image.get_height() * factor)))
+
+        # Masks of the rotated car used to detect collisions (one mask every ANGLE_STEP_MASKS degrees)
+        self.car_masks = [pygame.mask.from_surface(pygame.transform.rotate(self.car_image, num_mask * ANGLE_STEP_MASKS)) for num_mask in range(round(360 / ANGLE_STEP_MASKS))]
+        self.car_masks_half_sizes = [(mask.get_size()[0] // 2, mask.get_size()[1] // 2) for mask in self.car_masks]  # Offsets between the centers and the top left corners of the masks
+
+        self.checkpoints = []  # List of checkpoints
+        with open(f'{PATH_DATA}checkpoints/{num_map}', 'r') as file_checkpoint_read:
+            """
+            Format of the file checkpoints:
+            x1 y1
+            x2 y2
+            ...
+            """
+            for checkpoint in file_checkpoint_read.readlines():
+                a, b = checkpoint.split(' ')
+                self.checkpoints.append((int(a), int(b)))
+
+    def __str__(self):
+        """
+        Return the string representation of the track
+
+        Return:
+            str: string representation of the track
+        """
+        return f'Track {self.num_map} : {len(self.checkpoints)} checkpoints'
+
+    def checkpoint_reached(self, pos, num_checkpoint):
+        """
+        Check if the position is in the radius of a checkpoint
+
+        Args:
+            pos (tuple(float, float)): the position to check
+            num_checkpoint (int): the index of the checkpoint to check
+
+        Returns:
+            True if the position is in the radius of the checkpoint
+        """
+        checkpoint = self.checkpoints[num_checkpoint]
+        return checkpoint[0] - self.radius_checkpoint < pos[0] < checkpoint[0] + self.radius_checkpoint and \
+            checkpoint[1] - self.radius_checkpoint < pos[1] < checkpoint[1] + self.radius_checkpoint
+
+    def num_car_mask(self, angle):
+        """
+        Find the precomputed mask of the car closest to the angle
+
+        Args:
+            angle (float): angle of the car
+
+        Returns:
+            int: index of the mask in car_masks
+        """
+        return math.floor(angle / ANGLE_STEP_MASKS + 0.5) % len(self.car_masks)
+
+    def detect_collision(self, pos, angle):
+        """
+        Detect if the car at this position and with this angle touches a wall, using the precomputed masks of the car
+
+        Args:
+            pos (tuple(float, float)): position of the center of the car
+            angle (float): angle of the car
+
+        Returns:
+            bool: True if the car touches a wall
+        """
+        num_mask = self.num_car_mask(angle)
+        center_x, center_y = self.car_image.get_rect(center=pos).center  # Center of the car rounded like in pygame
+        half_width, half_height = self.car_masks_half_sizes[num_mask]
+        return self.mask.overlap(self.car_masks[num_mask], (center_x - half_width, center_y - half_height)) is not None
+
+    def detect_wall(self, front_of_car, point):
+        """
+        Detect if there is a wall between the front of the car and the point. We walk on the line pixel by pixel along
+        the x-axis, but we use the distance to the closest wall of the current pixel to skip the pixels that can't be walls.
+        If the front of the car is far from the walls, we don't need to walk on the line at all
+
+        Args:
+            front_of_car (tuple(float, float)): the coordinates of the front of the car
+            point (tuple(float, float)): the coordinates of the point
+
+        Returns:
+            bool or float : False if there is no wall, else the distance between the front of the car and the wall
+        """
+        distances = self.distances_bytes
+        x1, y1 = front_of_car  # Coordinates of the front of the car
+        x2, y2 = point  # Coordinates of the point
+
+        if x1 == x2:  # If the line is vertical we walk along the y-axis
+            x = int(x1)
+            y, y_end = int(min(y1, y2)), int(max(y1, y2))
+            if not 0 <= x < 1500:  # All the pixels are out of the window
+                return math.sqrt((x1 - x) * (x1 - x) + (y1 - y) * (y1 - y)) if y < y_end else False
+            while y < y_end:
+                if not 0 <= y < 700 or distances[y * 1500 + x] == 0:
+                    return math.sqrt((x1 - x) * (x1 - x) + (y1 - y) * (y1 - y))  # We return the distance between the front of the car and the wall
+                y += max(1, distances[y * 1500 + x])  # The pixels closer than the distance to the wall are not walls
+            return False
+
+        # We determine the equation of the line between the front of the car and the point (y = ax + b)
+        a = (y2 - y1) / (x2 - x1)
+        b = y1 - a * x1
+        step = math.sqrt(1 + a * a)  # Distance between two pixels of the line that are separated by 1 on the x-axis
+        x, x_end = int(min(x1, x2)), int(max(x1, x2))
+
+        # If the front of the car is farther from the walls than all the pixels of the line, there is no wall
+        front_x, front_y = int(x1), int(y1)
+        if 0 <= front_x < 1500 and 0 <= front_y < 700 and \
+                distances[front_y * 1500 + front_x] > max(abs(x - x1), abs(x_end - 1 - x1)) * step + 3:
+            return False
+
+        while x < x_end:
+            y = int(a * x + b)
+            if not 0 <= y < 700 or not 0 <= x < 1500 or distances[y * 1500 + x] == 0:
+                return math.sqrt((x1 - x) * (x1 - x) + (y1 - y) * (y1 - y))  # We return the distance between the front of the car and the wall
+            x += max(1, int((distances[y * 1500 + x] - 1) / step))  # The pixels closer than the distance to the wall are not walls
+        return False  # There is no wall
+
+    def cast_rays(self, front_x, front_y, points_x, points_y):
+        """
+        Detect if there is a wall between the fronts of the cars and the points for many rays at the same time (same
+        results as detect_wall for each ray). All the pixels of all the rays are read in the padded array of the walls
+        at once, the pixels out of the window are moved on the padding so there are no bounds checks
+
+        Args:
+            front_x (numpy.ndarray): coordinates on the x-axis of the starts of the rays (fronts of the cars)
+            front_y (numpy.ndarray): coordinates on the y-axis of the starts of the rays
+            points_x (numpy.ndarray): coordinates on the x-axis of the ends of the rays (points of the cones)
+            points_y (numpy.ndarray): coordinates on the y-axis of the ends of the rays
+
+        Returns:
+            numpy.ndarray: distance between the start of each ray and the first wall (0 if there is no wall)
+        """
+        nb_rays = len(front_x)
+        if nb_rays == 0:
+            return np.zeros(0)
+
+        # We walk along the x-axis, or along the y-axis for the vertical rays
+        vertical = front_x == points_x
+        a = np.where(vertical, 0, (points_y - front_y) / np.where(vertical, 1, points_x - front_x))  # Equation of the lines (y = ax + b)
+        b = front_y - a * front_x
+        start = np.where(vertical, np.minimum(front_y, points_y), np.minimum(front_x, points_x)).astype(np.int64)
+        end = np.where(vertical, np.maximum(front_y, points_y), np.maximum(front_x, points_x)).astype(np.int64)
+
+        # Coordinates of all the pixels of the rays (one line per ray)
+        nb_pixels = (end - start).max()  # Number of pixels of the longest ray
+        if nb_pixels <= 0:
+            return np.zeros(nb_rays)
+        steps = start[:, None] + np.arange(nb_pixels)[None, :]
+        x = np.where(vertical[:, None], front_x.astype(np.int64)[:, None], steps)
+        y = np.where(vertical[:, None], steps, (a[:, None] * steps + b[:, None]).astype(np.int64))
+
+        # We read all the pixels at once (the pixels out of the window are on the padding, so they are walls)
+        height, width = self.padded_walls.shape
+        walls = self.padded_walls[np.clip(y + WALL_PADDING, 0, height - 1), np.clip(x + WALL_PADDING, 0, width - 1)]
+        walls &= steps < end[:, None]  # The pixels after the end of the ray are not checked
+
+        # Distance to the first wall of each ray
+        rays = np.arange(nb_rays)
+        first_wall = walls.argmax(axis=1)
+        distance_x, distance_y = front_x - x[rays, first_wall], front_y - y[rays, first_wall]
+        return np.where(walls[rays, first_wall], np.sqrt(distance_x * distance_x + distance_y * distance_y), 0)  # Same operations as in detect_wall to have exactly the same distances
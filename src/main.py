@@ -1,15 +1,28 @@
-from data.variables_functions import load_cars, load_parameters, change_map, exit_game, init_variables, blit_circuit
-from game.genetic_algorithm import apply_genetic  # Import the genetic algorithm
+from data.variables_functions import load_cars, load_parameters, change_map, exit_game, init_variables, blit_circuit, get_simulation_parameters, get_genetic_parameters, start_islands
+from game.genetic_algorithm import apply_genetic, create_new_genomes, record_island  # Import the genetic algorithm
 from data.constants import PATH_DATA, PATH_IMAGE  # Import the constants
 from menus.settings_menu import SETTINGS  # Import the settings menu
 from other.camera import change_camera  # To change the camera
-from game.genetic import Genetic  # Import the genetic class
+from game.genetic import Genetic, sample_genomes  # Import the genetic class
 from game.car import Car, add_garage_cars  # Import the car
+from game.simulation import Simulation  # Import the headless simulation
+from game.fitness_cache import FitnessCache, FINISHED_CARS  # To not simulate the same cars again
+from game.genetic_operators import genome_indexes  # To create the cars of an island
+from game.islands import ISLAND_MODEL  # Islands evolved in worker processes
+from game.speculation import SPECULATION  # To create the next generation before the end of the generation
+from game.steady_state import SteadyStateGA  # Genetic algorithm without generations (for the tests)
+from game.hyperparameter_search import SuccessiveHalving, grid_configurations, random_configurations  # To search the genetic parameters
+from data.search_results import SearchResults  # Results of the search of the genetic parameters
+from data.lineage import LINEAGE  # To write the last cars of the lineage at the end of the tests
+from game.population_metrics import POPULATION_METRICS  # Metrics of the population written in the files of the tests
+from data.fitness_table import open_checked_table, write_fitness_table, get_path_table  # To save or read the scores of all the cars
 from other.utils import union_rect  # Import the utils
 import render.display as display  # Import the display
 import data.variables as var  # Import the data
 import traceback  # To get the traceback of errors
 import itertools  # To iterate over the cars
+import numpy as np  # To draw the random configurations of the search
+import os  # To create the folders of the results of the tests
 import random  # To generate random numbers
 import render.ui as ui  # Import the ui
 import pygame  # To use pygame
@@ -47,15 +60,17 @@ def open_window():
         var.CLOCK.tick(25)  # Limit the fps
 
 
-def play(cars=None):
+def play(cars=None, replay=False):
     """
     Play the game
 
     Args:
         cars (list): list of cars (if None, it is the first time we play)
+        replay (bool): True if we replay the last run (all the cars are moved again)
     """
     blit_circuit()  # Blit the circuit (to hide the dead cars)
     cars = init_cars_to_play(cars)  # Initialize the cars and add cars from the garage if needed
+    finish_cached_cars(cars, replay)  # The cars already played are not moved again
 
     while var.PLAY:  # While the game is not stopped
         ui.handle_events(cars)  # Detect events in the ui and do the corresponding action
@@ -71,13 +86,20 @@ def play(cars=None):
             if var.PLAY_LAST_RUN:
                 replay_last_run()  # Replay the last run
 
+            # If we want to skip generations
+            if var.FAST_FORWARD:
+                fast_forward(cars)  # Skip the generations
+
+            # We read the populations of the islands
+            if var.ISLANDS:
+                ISLAND_MODEL.update()
+            # We create the next generation in advance (not with the islands or the predictions that need the whole generation)
+            elif var.SPECULATION and not var.SURROGATE:
+                SPECULATION.update(cars, var.NUM_MAP, get_simulation_parameters(), create_new_genomes)
+
             # We stop the game if all the cars are dead or if the time is over or if we want to change the generation
             if var.NB_CARS_ALIVE == 0 or var.TICKS_REMAINING == 0 or var.CHANGE_GENERATION:
                 stop_play(cars)  # Stop the game
-                if var.TEST_ALL_CARS:
-                    return  # If we want to test all the cars, we stop the game here so that we can test the next cars
-                if (var.TEST_VALUE_GENETIC_PARAMETERS or var.TEST_MUTATION_CROSSOVER) and var.TEST_FINISHED:
-                    return  # We quit if we finished the tests
 
         ui.erase()  # Erase the buttons
         ui.display(cars)  # Activate the buttons (This is here because we have to do this after erasing the screen and
@@ -104,14 +126,7 @@ def init_cars_to_play(cars):
 
     if not cars:  # If it is the first time we play (or if we were watching to cars from the garage only)
         # We add the cars without repetition
-        cars = []  # List of cars
-        for i in range(var.NB_CARS):
-            added = False
-            while not added:
-                car = Car()  # Create a car
-                if car not in cars:
-                    added = True
-                    cars.append(car)
+        cars = [Car(genetic=Genetic(index=index)) for index in sample_genomes(var.NB_CARS)]
 
         cars = add_garage_cars(cars)  # We add the car from the garage to the list of cars
         init_variables(len(cars))  # Initialize the data
@@ -123,6 +138,42 @@ def init_cars_to_play(cars):
     return cars
 
 
+def finish_cached_cars(cars, replay=False):
+    """
+    Give the cars already played with the same map and the same parameters their final score and position, they are
+    drawn where they finished and are not moved again (the cars kept by the genetic algorithm are played again at each
+    generation). The cars of the garage are always moved to be watched
+
+    Args:
+        cars (list): list of cars
+        replay (bool): True if we replay the last run
+    """
+    var.KEY_GENERATION = (var.NUM_MAP, get_simulation_parameters().get_hash())
+    if not var.FINISH_CACHED_CARS or replay:
+        return
+    for car in cars:
+        if car.id_memory_car is None:
+            finished = FINISHED_CARS.get(FitnessCache.get_key(car.genetic.dice_values, *var.KEY_GENERATION))
+            if finished is not None:
+                car.finish(*finished)
+
+
+def save_finished_cars(cars):
+    """
+    Save the final state of the cars at the end of the generation (only the cars whose score is final: the dead cars,
+    and the cars alive if the time is over), if the map and the parameters have not changed during the generation
+
+    Args:
+        cars (list): list of cars
+    """
+    if var.KEY_GENERATION != (var.NUM_MAP, get_simulation_parameters().get_hash()):
+        return
+    for car in cars:
+        if car.dead or var.TICKS_REMAINING == 0:
+            key = FitnessCache.get_key(car.genetic.dice_values, *var.KEY_GENERATION)
+            FINISHED_CARS.add(key, (car.score, car.pos, car.angle, car.reverse))
+
+
 def play_turn(cars):
     """
     Play one turn of the game
@@ -145,6 +196,16 @@ def play_turn(cars):
     if var.SHOW_CHECKPOINTS:
         display.show_checkpoints()  # Display the checkpoints
 
+    # In turbo mode we play several turns, only the last one is displayed
+    nb_turns = min(var.TICKS_PER_FRAME, var.TICKS_REMAINING) if var.TURBO else 1
+    for _ in range(nb_turns - 1):
+        if var.NB_CARS_ALIVE == 0:
+            break
+        for car in cars:  # For each car
+            if not car.dead:  # If the car is not dead
+                car.move()  # Move the car
+        var.TICKS_REMAINING -= 1  # We decrease the number of iterations remaining
+
     for car in cars:  # For each car
         if not car.dead:  # If the car is not dead
             car.move()  # Move the car
@@ -169,7 +230,7 @@ def replay_last_run():
     for car in var.CARS_LAST_RUN:
         car.reset()
         cars.append(car)
-    play(cars)  # We restart the game with the last run
+    play(cars, replay=True)  # We restart the game with the last run
 
 
 def stop_play(cars):
@@ -181,61 +242,137 @@ def stop_play(cars):
     """
 
     time_before = time.time()  # We get the time before the genetic algorithm
+    time_wait = 0 if var.TURBO else 1  # We don't wait between the generations in turbo mode
 
-    if not var.TEST_MUTATION_CROSSOVER and not var.TEST_ALL_CARS:  # If we don't want to test the mutation and crossover
-        while time.time() - time_before < 1:  # We wait 1 second
-            # Erase explosions
-            rect_blit_explosion = union_rect(var.RECTS_BLIT_EXPLOSION)  # Union of the rects for the blit
-            var.WINDOW.blit(var.BACKGROUND, rect_blit_explosion, rect_blit_explosion)  # Erase the explosions
-            var.RECTS_BLIT_EXPLOSION = []  # We reset the list of rects to blit
+    while time.time() - time_before < time_wait:  # We wait 1 second
+        # Erase explosions
+        rect_blit_explosion = union_rect(var.RECTS_BLIT_EXPLOSION)  # Union of the rects for the blit
+        var.WINDOW.blit(var.BACKGROUND, rect_blit_explosion, rect_blit_explosion)  # Erase the explosions
+        var.RECTS_BLIT_EXPLOSION = []  # We reset the list of rects to blit
 
-            # Erase cars
-            rect_blit_car = union_rect(var.RECTS_BLIT_CAR)  # Union of the rects for the blit
-            var.WINDOW.blit(var.BACKGROUND, rect_blit_car, rect_blit_car)  # Erase the cars
-            var.RECTS_BLIT_CAR = []  # We reset the list of rects to blit
+        # Erase cars
+        rect_blit_car = union_rect(var.RECTS_BLIT_CAR)  # Union of the rects for the blit
+        var.WINDOW.blit(var.BACKGROUND, rect_blit_car, rect_blit_car)  # Erase the cars
+        var.RECTS_BLIT_CAR = []  # We reset the list of rects to blit
 
-            # Display cars
-            for car in cars:  # For each car
-                car.draw()  # Draw the cars
+        # Display cars
+        for car in cars:  # For each car
+            car.draw()  # Draw the cars
 
-            # Display explosions
-            var.EXPLOSIONS.draw(var.WINDOW)  # Display the explosions
-            var.EXPLOSIONS.update()  # Update the explosions
+        # Display explosions
+        var.EXPLOSIONS.draw(var.WINDOW)  # Display the explosions
+        var.EXPLOSIONS.update()  # Update the explosions
 
-            # Display the buttons
-            ui.handle_events(cars)  # Detect events in the ui and do the corresponding action
-            ui.erase()  # Erase the buttons
-            ui.display(cars)  # Activate the buttons
+        # Display the buttons
+        ui.handle_events(cars)  # Detect events in the ui and do the corresponding action
+        ui.erase()  # Erase the buttons
+        ui.display(cars)  # Activate the buttons
 
-            pygame.display.flip()  # Update the screen
+        pygame.display.flip()  # Update the screen
 
     var.CHANGE_GENERATION = False  # We stop the change of generation
     var.WINDOW.blit(var.BACKGROUND, (0, 0))  # Reset the screen
+    save_finished_cars(cars)  # The cars played again in the next generations will not be moved
 
     var.CARS_LAST_RUN = cars  # Save the last run
     if var.LAST_RUN_PLAYING:
         var.PLAY_LAST_RUN = False  # We are no longer replaying something
 
-    if var.TEST_ALL_CARS:  # If we want to test all cars
-        for car in cars:
-            var.FILE_TEST.write(f'{car.genetic} {car.score}\n')  # Write the score of the car
-        return  # We stop the game
-
+    if var.ISLANDS:
+        cars = get_cars_island(cars)  # Cars of an island
     else:
-        if var.TEST_MUTATION_CROSSOVER or var.TEST_VALUE_GENETIC_PARAMETERS:  # If we want to test the mutation and the crossover order
-            var.LAP_COMPLETED = False
-            for car in cars:
-                if car.score > 150:
-                    var.FILE_TEST.write(f'{var.NUM_GENERATION}\n')
-                    var.TEST_FINISHED = True
-                    return  # We stop the game
-            if var.NUM_GENERATION > 24:
-                var.FILE_TEST.write(f'{var.NUM_GENERATION}\n')
-                var.TEST_FINISHED = True
-                return
-
         cars = apply_genetic(cars)  # Genetic algorithm
-        play(cars)  # Restart the game with the new cars
+    play(cars)  # Restart the game with the new cars
+
+
+def get_cars_island(cars):
+    """
+    Get the cars of the last generation of the island to display (the island with the best car or each island in turn).
+    The generation is recorded like the generations of the game (memory car, metrics of the population) the first time
+    it is displayed
+
+    Args:
+        cars (list): list of cars of the generation that has been played (used if no island has finished a generation)
+
+    Returns:
+        list: list of cars of the island
+    """
+    if not ISLAND_MODEL.match(var.NUM_MAP, get_simulation_parameters(), get_genetic_parameters(), var.NB_ISLANDS):
+        start_islands()  # The map or the parameters have changed
+
+    ISLAND_MODEL.update()
+    num_island = ISLAND_MODEL.choose_island(var.ISLAND_DISPLAYED)
+    if num_island is None:  # The islands are starting
+        return apply_genetic(cars)
+
+    num_generation, genomes, scores = ISLAND_MODEL.populations[num_island]
+    if ISLAND_MODEL.generation_recorded != (num_island, num_generation):  # New generation of the island
+        ISLAND_MODEL.generation_recorded = (num_island, num_generation)
+        record_island(num_generation, genomes, scores)
+    var.NUM_GENERATION = num_generation - 1  # The number of the generation is incremented when the cars are played
+
+    indexes = genome_indexes(genomes)  # Genetics from the best to the worst car
+    cars = [Car(genetic=Genetic(index=int(index))) for index in indexes[:0:-1]]
+    cars.append(Car(genetic=Genetic(index=int(indexes[0])), color='yellow'))  # The best car at the end to see it on top of the others
+    return cars
+
+
+def fast_forward(cars):
+    """
+    Skip NB_GENERATIONS_FAST_FORWARD generations without display (starting from the current generation), then continue
+    the game with the cars of the next generation. The best car of each generation is added to the memory as usual
+
+    Args:
+        cars (list): list of cars of the current generation
+    """
+    var.FAST_FORWARD = False
+
+    # We read the scores in the fitness table of the map if it has been computed with the current parameters and if
+    # some cars simulated again get the same scores
+    simulation = Simulation(var.TRACK, get_simulation_parameters())  # Else we simulate the cars without display
+    fitness_table = open_checked_table(var.NUM_MAP, simulation)
+    fitness_cache = FitnessCache()
+
+    try:
+        for num_generation in range(var.NB_GENERATIONS_FAST_FORWARD):
+            if num_generation > 0:
+                cars = init_cars_to_play(cars)  # Next generation (with the cars of the garage)
+
+            scores = evaluate_without_display(cars, simulation, fitness_cache, fitness_table)
+            for car, score in zip(cars, scores):
+                car.score = score
+                car.update_best_scores()
+
+            var.CARS_LAST_RUN = cars  # Save the last run
+            cars = apply_genetic(cars)  # Genetic algorithm
+    finally:
+        if fitness_table is not None:
+            fitness_table.close()  # The scores of the table are released
+
+    var.EXPLOSIONS.empty()  # We remove the explosions of the generation we left
+    var.WINDOW.blit(var.BACKGROUND, (0, 0))  # Reset the screen
+    play(cars)  # Restart the game with the new cars
+
+
+def evaluate_without_display(cars, simulation, fitness_cache, fitness_table=None):
+    """
+    Get the scores of the cars without displaying them
+
+    Args:
+        cars (list): list of cars
+        simulation (Simulation): the headless simulation used if the scores are not in the fitness table
+        fitness_cache (FitnessCache): the scores of the cars already simulated
+        fitness_table (FitnessTable): the scores of all the cars of the map (None if we have to simulate the cars)
+
+    Returns:
+        list: the score of each car
+    """
+    genomes = [car.genetic.dice_values for car in cars]
+    if fitness_table is not None:
+        scores = [fitness_table.get_score(dice_values) for dice_values in genomes]
+        if not any(score != score for score in scores):  # If no score is NaN (car not in the table)
+            return scores if var.NUM_MAP == 5 else [int(score) for score in scores]
+    return fitness_cache.evaluate(simulation, genomes)
 
 
 def update_fps():
@@ -247,6 +384,11 @@ def update_fps():
     except ZeroDivisionError:
         var.ACTUAL_FPS = 0
 
+    if var.TURBO and var.TURBO_SPEED == 'max' and not var.FPS_TOO_HIGH and not var.PAUSE:  # We adapt the number of turns per frame to keep the FPS
+        time_frame = max(time.time() - var.TIME_LAST_TURN, 1e-6)  # Time of the frame (turns and display)
+        factor = min(2, max(0.5, 1 / (var.FPS * time_frame)))  # The number of turns can't change too quickly
+        var.TICKS_PER_FRAME = max(1, min(var.MAX_TICKS_PER_FRAME, int(var.TICKS_PER_FRAME * factor)))
+
     if time.time() - var.TIME_LAST_TURN < 1 / var.FPS:  # Wait to have the right FPS
         var.ACTUAL_FPS = var.FPS
         var.FPS_TOO_HIGH = True  # The fps are too high
@@ -276,56 +418,134 @@ def change_checkpoints():
 
 def run_test_all_cars():
     """
-    Run all cars and save the results in a file
+    Run all cars and save the results in a file and in a fitness table (the cars are simulated without display). They
+    are written in 'all_cars/simulation' so the results of the previous tests are kept
     """
-    var.FPS = 9999
-    var.SHOW_EXPLOSIONS = False
+    simulation = Simulation(var.TRACK, get_simulation_parameters())  # Headless simulation of the current map
 
-    var.FILE_TEST = open(f'{PATH_DATA}tests/all_cars/results/{var.NUM_MAP}', 'w')  # We open the file to write the results
-    var.WINDOW.blit(var.BACKGROUND, (0, 0))  # Screen initialization
-    var.PLAY = True
+    scores = []  # Scores of all the cars, in the order of the fitness table (dice values in base 6)
+    os.makedirs(f'{PATH_DATA}tests/all_cars/simulation/results', exist_ok=True)  # The results of the tests are not overwritten
+    os.makedirs(f'{PATH_DATA}tests/all_cars/simulation/tables', exist_ok=True)
+    with open(f'{PATH_DATA}tests/all_cars/simulation/results/{var.NUM_MAP}', 'w') as file_test:  # We open the file to write the results
+        genetic_combinations = [list(combination) for combination in itertools.product(range(1, 7), repeat=6)]
+        for index in range(0, len(genetic_combinations), 10000):  # We simulate the cars 10000 by 10000
+            genomes = genetic_combinations[index:index + 10000]
+            for dice_values, score in zip(genomes, simulation.evaluate(genomes)):
+                file_test.write(f'{Genetic(dice_values)} {score}\n')  # Write the score of the car
+                scores.append(score)
 
-    tab_cars = []
-    genetic_combinations = itertools.product(range(1, 7), repeat=6)
-    for combination in genetic_combinations:
-        genetic = Genetic(list(combination))
-        tab_cars.append(Car(genetic))
-        if len(tab_cars) == 10000:
-            play(tab_cars)  # We play the game to test the cars
-            tab_cars = []
-    play(tab_cars)  # We play the game to test the cars
+    write_fitness_table(get_path_table(var.NUM_MAP, simulated=True), var.NUM_MAP, simulation.parameters, scores)  # Binary table of the scores
 
 
 def run_test_mutation_crossover():
     """
     Run the genetic algorithm with different mutation and crossover orders
     """
-    var.WINDOW.blit(var.BACKGROUND, (0, 0))  # Screen initialization
-    var.PLAY = True
+    simulation = Simulation(var.TRACK, get_simulation_parameters())  # Headless simulation of the current map
+    fitness_cache = FitnessCache()  # Scores of the cars already simulated (shared by all the runs)
 
     for var.TEST_MODE in ['crossover_mutation']:
-        var.FILE_TEST = open(f'{PATH_DATA}tests/genetic_parameters/{var.TEST_MODE}_{var.NUM_MAP}', 'a')
-        for var.SEED in range(100, 200):
-            play()
-            var.NUM_GENERATION = 0
+        with open(f'{PATH_DATA}tests/genetic_parameters/{var.TEST_MODE}_{var.NUM_MAP}', 'a') as file_test:
+            for var.SEED in range(100, 200):
+                file_test.write(f'{run_genetic_until_lap(simulation, fitness_cache)} {POPULATION_METRICS}\n')
 
 
 def run_test_value_genetic_parameters():
     """
     Run the genetic algorithm with different genetic parameters and save the results in a file
     """
-    var.FPS = 9999  # We set the fps to a high value to run the game faster
-    var.SHOW_EXPLOSIONS = False  # We don't show the explosions to run the game faster
-
-    path_test = f'{PATH_DATA}tests/'
-    var.WINDOW.blit(var.BACKGROUND, (0, 0))  # Screen initialization
-    var.PLAY = True
+    simulation = Simulation(var.TRACK, get_simulation_parameters())  # Headless simulation of the current map
+    fitness_cache = FitnessCache()  # Scores of the cars already simulated (shared by all the runs)
 
     for var.CHANCE_MUTATION, var.CHANCE_CROSSOVER, var.PROPORTION_CARS_KEPT in [(0.3, 0.1, 0.2)]:
-        var.FILE_TEST = open(f'{path_test}tests/genetic_parameters/{var.CHANCE_MUTATION}_{var.CHANCE_CROSSOVER}_{var.PROPORTION_CARS_KEPT}', 'a')
-        for var.SEED in range(50):
-            play()
-            var.NUM_GENERATION = 0
+        with open(f'{PATH_DATA}tests/genetic_parameters/test_{var.CHANCE_MUTATION}_{var.CHANCE_CROSSOVER}_{var.PROPORTION_CARS_KEPT}', 'a') as file_test:
+            for var.SEED in range(50):
+                file_test.write(f'{run_genetic_until_lap(simulation, fitness_cache)} {POPULATION_METRICS}\n')
+
+
+def run_test_steady_state():
+    """
+    Run the steady-state genetic algorithm with each replacement policy until a car completes a lap (or until as many
+    cars as in 25 generations have been evaluated) and save the number of cars evaluated in a file
+    """
+    parameters, genetic_parameters = get_simulation_parameters(), get_genetic_parameters()
+    for replacement in var.LIST_REPLACEMENT:
+        with open(f'{PATH_DATA}tests/genetic_parameters/steady_state_{replacement}_{var.NUM_MAP}', 'a') as file_test:
+            for var.SEED in range(50):
+                steady_state = SteadyStateGA(var.NUM_MAP, parameters, genetic_parameters, replacement,
+                                             var.NB_WORKERS_STEADY_STATE, var.SIZE_BATCH_STEADY_STATE, var.SEED)
+                nb_evaluated = steady_state.run(25 * var.NB_CARS, stop_score=150)
+                file_test.write(f'{nb_evaluated} {steady_state}\n')
+
+
+def run_test_search_genetic_parameters():
+    """
+    Search the best genetic parameters (grid or random configurations) with successive halving and save the best
+    configurations in a file (each run is saved in the results, see data/search_results.py)
+    """
+    simulation = Simulation(var.TRACK, get_simulation_parameters())  # Headless simulation of the current map
+    fitness_cache = FitnessCache()  # Scores of the cars already simulated (shared by all the runs)
+    results = SearchResults(var.NUM_MAP, simulation.parameters.get_hash())
+    values_before = {name: getattr(var, name) for name in var.SEARCH_GRID}  # To restore the parameters of the map
+
+    def run(configuration, seed):
+        """
+        Run the genetic algorithm with a configuration of the genetic parameters and a seed
+
+        Args:
+            configuration (dict): value of each genetic parameter {name of the variable: value}
+            seed (int): seed of the run
+
+        Returns:
+            int: the number of the generation where we stopped
+        """
+        for name, value in configuration.items():
+            setattr(var, name, value)
+        var.SEED = seed
+        return run_genetic_until_lap(simulation, fitness_cache)
+
+    if var.NB_RANDOM_CONFIGURATIONS:
+        configurations = random_configurations(np.random.default_rng(var.NUM_MAP), var.SEARCH_GRID, var.NB_RANDOM_CONFIGURATIONS)
+    else:
+        configurations = grid_configurations(var.SEARCH_GRID)
+    search = SuccessiveHalving(results, run, var.MIN_SEEDS_SEARCH, var.MAX_SEEDS_SEARCH)
+    best = search.search(configurations)
+    for name, value in values_before.items():
+        setattr(var, name, value)
+
+    with open(f'{PATH_DATA}tests/genetic_parameters/search_best_{var.NUM_MAP}', 'a') as file_test:
+        file_test.write(f'{search} ; nb_runs_grid = {len(configurations) * var.MAX_SEEDS_SEARCH}\n')
+        for configuration, generation in best:
+            file_test.write(f'{configuration} {generation:.2f}\n')
+
+
+def run_genetic_until_lap(simulation, fitness_cache):
+    """
+    Run the genetic algorithm without display until a car completes a lap (or until the generation 25). With
+    STOP_COLLAPSED_TESTS, if all the cars become almost the same before, we stop and return 25 like if we had reached the
+    generation 25 (else the generation of the convergence is only saved in POPULATION_METRICS)
+
+    Args:
+        simulation (Simulation): the headless simulation used to evaluate the cars
+        fitness_cache (FitnessCache): the scores of the cars already simulated
+
+    Returns:
+        int: the number of the generation where we stopped
+    """
+    cars = init_cars_to_play(None)  # First generation (random cars)
+    while 1:
+        scores = fitness_cache.evaluate(simulation, [car.genetic.dice_values for car in cars])  # We simulate the new cars of the generation
+        for car, score in zip(cars, scores):
+            car.score = score
+            car.update_best_scores()
+
+        if max(scores) > 150 or var.NUM_GENERATION > 24:
+            return var.NUM_GENERATION
+
+        cars = apply_genetic(cars)  # Next generation (the metrics of the population are updated)
+        if var.STOP_COLLAPSED_TESTS and POPULATION_METRICS.collapsed:
+            return 25
+        cars = init_cars_to_play(cars)
 
 
 def main():
@@ -348,6 +568,10 @@ def main():
             run_test_mutation_crossover()  # Test the mutation and the crossover
         elif var.TEST_VALUE_GENETIC_PARAMETERS:
             run_test_value_genetic_parameters()
+        elif var.TEST_STEADY_STATE:
+            run_test_steady_state()  # Test the genetic algorithm without generations
+        elif var.TEST_SEARCH_GENETIC_PARAMETERS:
+            run_test_search_genetic_parameters()  # Search the best genetic parameters
         else:
             open_window()  # Start the application
 
@@ -357,6 +581,9 @@ def main():
         exit_game()  # Exit the game if there is an error
         raise e
 
+    finally:
+        LINEAGE.flush()  # The tests end without exit_game, the cars of the lineage still in memory are written
+
 
 if __name__ == '__main__':
     """
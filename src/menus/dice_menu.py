@@ -44,7 +44,7 @@ class DiceMenu:
             id_memory_car (int): Id of the memory car
             by_camera (bool): True if the dice menu is called by the camera, False if we are modifying the dice
         """
-        self.dice_values = values
+        self.dice_values = list(values)  # We copy the values because they are modified by the buttons
         self.id_memory_car = id_memory_car
         self.by_camera = by_camera
         if self.by_camera:
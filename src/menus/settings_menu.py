@@ -47,6 +47,8 @@ class Settings:
         self.mutation_button = None  # The button to change the mutation chance
         self.proportion_button = None  # The button to change the proportion of cars kept per generation
         self.time_generation_button = None  # The button to change the time per generation
+        self.selection_button = None  # The button to change the selection of the cars
+        self.text_selection = None  # Text in front of the selection button
 
         # Cone section
         self.width_cone_button = None  # The button to change the width of the cones
@@ -88,6 +90,8 @@ class Settings:
         self.crossover_button = Button(x=1240, y=295, image_name='writing', variable=var.CHANCE_CROSSOVER, name='CHANCE_CROSSOVER', scale_x=0.5, text_displayed="Probabilité de crossover")
         self.mutation_button = Button(x=1222, y=369, image_name='writing', variable=var.CHANCE_MUTATION, name='CHANCE_MUTATION', scale_x=0.5, text_displayed="Probabilité de mutation")
         self.time_generation_button = Button(x=1280, y=446, image_name='writing', variable=var.TIME_GENERATION, name='TIME_GENERATION', scale_x=0.5, text_displayed="Durée d'une génération")
+        self.selection_button = Button(x=1060, y=479, image_name='writing', variable=var.SELECTION, name='SELECTION', scale_x=0.5, text_displayed="roulette, tournoi, rang, troncature ou sus")
+        self.text_selection = pygame.font.SysFont('Courier New', round(19 * var.SCALE_RESIZE_Y), bold=True).render('Sélection :', True, (0, 0, 0))  # The label is not in the image of the window
 
         # Cone section
         self.width_cone_button = Button(x=718, y=610, image_name='writing', variable=var.WIDTH_CONE, name='WIDTH_CONE', scale_x=0.5, text_displayed="Largeur des triangles devant les voitures")
@@ -95,7 +99,8 @@ class Settings:
 
         self.writing_buttons = [self.fps_button, self.seed_button, self.camera_button, self.max_speed_button, self.turn_angle_button,
                                 self.acceleration_button, self.deceleration_button, self.drift_button, self.proportion_button,
-                                self.mutation_button, self.crossover_button, self.time_generation_button,  self.width_cone_button, self.length_cone_button]
+                                self.mutation_button, self.crossover_button, self.time_generation_button,  self.width_cone_button, self.length_cone_button,
+                                self.selection_button]
 
     def update_parameters(self):
         """
@@ -111,6 +116,7 @@ class Settings:
         self.mutation_button.update_text(var.CHANCE_MUTATION)  # Update the text of the mutation button
         self.proportion_button.update_text(var.PROPORTION_CARS_KEPT)  # Update the text of the proportion button
         self.time_generation_button.update_text(var.TIME_GENERATION)  # Update the text of the time per generation button
+        self.selection_button.update_text(var.SELECTION)  # Update the text of the selection button
         self.width_cone_button.update_text(var.WIDTH_CONE)  # Update the text of the width cone button
         self.length_cone_button.update_text(var.LENGTH_CONE)  # Update the text of the length cone button
 
@@ -119,6 +125,7 @@ class Settings:
         Display the settings window
         """
         var.WINDOW.blit(self.image, (self.x, self.y))  # Display the settings window
+        var.WINDOW.blit(self.text_selection, convert_to_new_window((958, 483)))  # Display the label of the selection button
 
         # To make the buttons work, you have to add code in the handle_key_press function of the ui.py file
         for button in self.writing_buttons:
@@ -1,3 +1,5 @@
+from functools import lru_cache  # To compute the images of the cars only once
+import numpy as np  # To compute the distance transform and change the color of the cars
 import pygame  # To use pygame
 import math  # To use math
 
@@ -6,7 +8,7 @@ This file contains all the utility functions used in multiple other files
 """
 
 
-def compute_detection_cone_points(angle, front_of_car, width, length):
+def compute_detection_cone_points(angle, front_of_car, width, length, angle_cone=None):
     """
     Compute the coordinates of the points of the detection cone
     Args:
@@ -14,11 +16,13 @@ def compute_detection_cone_points(angle, front_of_car, width, length):
         front_of_car (tuple(int, int)): the coordinates of the front of the car
         width (int): the width of the cone
         length (int): the length of the cone
+        angle_cone (float): the angle of the cone if it is already known (see compute_cones)
 
     Returns:
         [left, top, right] (list(tuple(int, int))): the coordinates of the points of the detection cone
     """
-    angle_cone = math.degrees(math.atan(width / (2 * length)))  # Angle of the detection cone
+    if angle_cone is None:
+        angle_cone = math.degrees(math.atan(width / (2 * length)))  # Angle of the detection cone
 
     top = front_of_car[0] + math.cos(math.radians(angle)) * length, front_of_car[1] - math.sin(math.radians(angle)) * length  # Position of the top of the cone
     left = front_of_car[0] + math.cos(math.radians(angle + angle_cone)) * length, front_of_car[1] - math.sin(math.radians(angle + angle_cone)) * length  # Position of the left of the cone
@@ -26,6 +30,27 @@ def compute_detection_cone_points(angle, front_of_car, width, length):
     return [left, top, right]
 
 
+@lru_cache(maxsize=50000)
+def compute_cones(dice_values, width_cone, length_cone):
+    """
+    Compute the size and the angle of the 3 detection cones of a car. They only depend on the dice values and on the
+    multipliers of the map, so they are computed once for each genetic instead of at each turn
+
+    Args:
+        dice_values (tuple(int)): the dice values of the car
+        width_cone (int): the width multiplier of the cones
+        length_cone (int): the length multiplier of the cones
+
+    Returns:
+        tuple(tuple(int, int, float)): the width, the length and the angle of the slow, medium and fast cones
+    """
+    cones = []
+    for num_cone in range(3):
+        width, length = dice_values[num_cone + 3] * width_cone, dice_values[num_cone] * length_cone
+        cones.append((width, length, math.degrees(math.atan(width / (2 * length)))))
+    return tuple(cones)
+
+
 def point_out_of_window(point):
     """
     Check if a point is out of the window
@@ -79,9 +104,28 @@ def text_rec(text, pos):
     return rect
 
 
+# Functions computing the new color of the pixels of the car from the average value of their red, green and blue values
+COLOR_FUNCTIONS = {
+    'black': lambda value: (value // 2, value // 2, value // 2),
+    'blue': lambda value: (0, 0, value),
+    'brown': lambda value: (np.minimum(value, 255), np.minimum(value, 255) // 2, 0),
+    'gray': lambda value: (value, value, value),
+    'green': lambda value: (0, value, 0),
+    'light_blue': lambda value: (0, np.minimum(value + 100, 255), np.minimum(value + 100, 255)),
+    'light_gray': lambda value: (np.minimum(value + 75, 255), np.minimum(value + 75, 255), np.minimum(value + 75, 255)),
+    'light_green': lambda value: (0, np.minimum(value + 100, 255), 0),
+    'orange': lambda value: (np.minimum(value + 125, 255), np.minimum(value + 125, 255) // 2, 0),
+    'pink': lambda value: (np.minimum(value + 100, 255), 0, np.minimum(value + 100, 255)),
+    'purple': lambda value: (value, 0, value),
+    'yellow': lambda value: (np.minimum(value + 50, 255), np.minimum(value + 50, 255), 0),
+}
+
+
+@lru_cache(maxsize=64)
 def change_color_car(image, str_color):
     """
-    Change the color of an image representing a car
+    Change the color of an image representing a car. The new image is computed once for each image and color, then the
+    same surface is returned (it must not be modified)
 
     Args:
         image (pygame.surface.Surface): the image to change
@@ -93,52 +137,16 @@ def change_color_car(image, str_color):
     # Create a new surface with the same dimensions and transparency settings as the original image
     new_image = pygame.Surface(image.get_size(), flags=image.get_flags(), depth=image.get_bitsize()).convert_alpha()
 
-    # Iterate over each pixel in the original image
-    for x in range(image.get_width()):
-        for y in range(image.get_height()):
-            # Get the color of the pixel at (x, y)
-            color = image.get_at((x, y))
-
-            # Check if the pixel is transparent
-            if color.a != 0:
-                average_value = sum(color[:3]) // 3
-
-                if str_color == 'black':
-                    r, g, b = average_value // 2, average_value // 2, average_value // 2
-                elif str_color == 'blue':
-                    r, g, b = 0, 0, average_value
-                elif str_color == 'brown':
-                    orange_value = min(average_value, 255)
-                    r, g, b = orange_value, orange_value // 2, 0
-                elif str_color == 'gray':
-                    r, g, b = average_value, average_value, average_value
-                elif str_color == 'green':
-                    r, g, b = 0, average_value, 0
-                elif str_color == 'light_blue':
-                    light_blue_value = min(average_value + 100, 255)
-                    r, g, b = 0, light_blue_value, light_blue_value
-                elif str_color == 'light_gray':
-                    light_gray_value = min(average_value + 75, 255)
-                    r, g, b = light_gray_value, light_gray_value, light_gray_value
-                elif str_color == 'light_green':
-                    light_green_value = min(average_value + 100, 255)
-                    r, g, b = 0, light_green_value, 0
-                elif str_color == 'orange':
-                    orange_value = min(average_value + 125, 255)
-                    r, g, b = orange_value, orange_value // 2, 0
-                elif str_color == 'pink':
-                    pink_value = min(average_value + 100, 255)
-                    r, g, b = pink_value, 0, pink_value
-                elif str_color == 'purple':
-                    r, g, b = average_value, 0, average_value
-                elif str_color == 'yellow':
-                    yellow_value = min(average_value + 50, 255)
-                    r, g, b = yellow_value, yellow_value, 0
-                else:
-                    r, g, b = 0, 0, 0
-
-                # Set the pixel in the new image to the correct value
-                new_image.set_at((x, y), (r, g, b, color.a))
+    # We compute the new color of all the pixels at the same time from the average of their red, green and blue values
+    alpha = pygame.surfarray.array_alpha(image)
+    average_value = pygame.surfarray.array3d(image).astype(np.int32).sum(axis=2) // 3
+    r, g, b = COLOR_FUNCTIONS.get(str_color, lambda value: (0, 0, 0))(average_value)
+    new_colors = np.stack(np.broadcast_arrays(r, g, b, average_value)[:3], axis=2)  # The constant values are broadcast to the size of the image
+    new_colors[alpha == 0] = 0  # The transparent pixels stay transparent and black
+
+    pixels, pixels_alpha = pygame.surfarray.pixels3d(new_image), pygame.surfarray.pixels_alpha(new_image)
+    pixels[...], pixels_alpha[...] = new_colors, alpha
+    del pixels, pixels_alpha  # We release the views to unlock the surface
 
     return new_image
 
@@ -188,3 +196,37 @@ def add_offset_to_rect(rect, offset):
         the rect with the offset added
     """
     return pygame.Rect(rect.x - offset, rect.y - offset, rect.width + 2 * offset, rect.height + 2 * offset)
+
+
+def compute_distance_transform(walls, max_distance=255):
+    """
+    Compute the Euclidean distance transform of a mask of walls: for each pixel, the distance to the closest wall
+    (the pixels outside the mask are considered as walls)
+    The distance is computed column by column and then row by row, it's exact up to max_distance
+
+    Args:
+        walls (numpy.ndarray): boolean array of shape (height, width), True for the pixels of the walls
+        max_distance (int): maximum distance computed (the distances above are set to max_distance)
+
+    Returns:
+        distances (numpy.ndarray): array of shape (height, width) with the distance to the closest wall (rounded down)
+    """
+    height, width = walls.shape
+    padded_walls = np.ones((height + 2, width + 2), dtype=bool)  # We add a border of walls around the mask
+    padded_walls[1:-1, 1:-1] = walls
+
+    # Distance to the closest wall in the same column
+    rows = np.arange(height + 2)[:, np.newaxis]
+    wall_above = np.maximum.accumulate(np.where(padded_walls, rows, -1), axis=0)  # Closest wall above (or on) each pixel
+    wall_below = np.minimum.accumulate(np.where(padded_walls, rows, height + 2)[::-1], axis=0)[::-1]  # Closest wall below
+    distances_column = np.minimum(np.minimum(rows - wall_above, wall_below - rows), max_distance + 1) ** 2
+
+    # Distance to the closest wall using the distances of the columns on the left and on the right
+    squared_distances = distances_column.copy()
+    offset = 1
+    while offset <= max_distance and squared_distances.max() > offset ** 2:  # The distances smaller than offset are final
+        np.minimum(squared_distances[:, offset:], distances_column[:, :-offset] + offset ** 2, out=squared_distances[:, offset:])
+        np.minimum(squared_distances[:, :-offset], distances_column[:, offset:] + offset ** 2, out=squared_distances[:, :-offset])
+        offset += 1
+
+    return np.minimum(np.sqrt(squared_distances[1:-1, 1:-1]), max_distance).astype(np.uint8)
@@ -2,6 +2,7 @@ from render.resizing import convert_to_new_window  # To convert the coordinates
 from other.utils import add_offset_to_rect  # To add an offset to a rect
 from data.constants import PATH_IMAGE  # To get the path of the image
 from other.camera import change_camera  # To change the camera
+from game.genetic_operators import SELECTIONS  # To check the name of the selection
 import data.variables as var  # Import the data
 import pygame  # To use pygame
 import time  # To get the time
@@ -212,6 +213,10 @@ class Button:
                     if self.variable == '':
                         self.variable = '_'
 
+                elif self.name == 'SELECTION':  # We keep the previous selection if the name is not a selection
+                    if self.text.lower() in SELECTIONS:
+                        self.variable = self.text.lower()
+
                 elif '.' in self.text:
                     self.variable = float(self.text)
                     if self.variable <= 0:
@@ -0,0 +1,84 @@
+from render.resizing import scale_image  # To scale the images to the size of the window
+from other.utils import change_color_car  # To change the color of the car
+from collections import OrderedDict  # To remember the order of use of the sprites
+import data.variables as var  # Import the variables
+import pygame  # To use pygame
+import math  # To round the angles
+
+
+"""
+This file contains the SpriteAtlas class, used to share the rotated and scaled images of the cars between all the cars
+"""
+
+
+ANGLE_STEP_SPRITES = 1  # Angle (in degrees) between two rotated images of the car
+MAX_SIZE_ATLAS = 5000  # Maximum number of rotated images kept in the atlas (the least recently used are removed)
+
+
+class SpriteAtlas:
+    """
+    Atlas of the images of the cars, the images are created the first time they are needed and are shared by all the
+    cars with the same colors. It must be cleared when the window is resized or when the map is changed
+    """
+    def __init__(self, max_size=MAX_SIZE_ATLAS):
+        """
+        Initialization of the atlas
+
+        Args:
+            max_size (int): maximum number of rotated images in the atlas
+        """
+        self.max_size = max_size  # Maximum number of rotated images in the atlas
+        self.images = {}  # Images of the car for each tuple of colors {colors: image}
+        self.sprites = OrderedDict()  # Rotated and scaled images {(colors, num_angle, scale): image}, from the least to the most recently used
+
+    def clear(self):
+        """
+        Remove all the images of the atlas (the size of the car or of the window has changed)
+        """
+        self.images.clear()
+        self.sprites.clear()
+
+    def get_image(self, colors):
+        """
+        Get the image of the car of the map with the colors applied one after the other (for example ('blue', 'light_gray')
+        for a blue car going in the wrong way)
+
+        Args:
+            colors (tuple(str)): colors applied to the red car
+
+        Returns:
+            pygame.Surface: image of the car (not rotated, at the size of the map)
+        """
+        image = self.images.get(colors)
+        if image is None:
+            image = var.RED_CAR_IMAGE
+            for color in colors:
+                image = change_color_car(image, color)
+            self.images[colors] = image
+        return image
+
+    def get_sprite(self, colors, angle):
+        """
+        Get the image of the car rotated and scaled to the size of the window
+
+        Args:
+            colors (tuple(str)): colors applied to the red car
+            angle (float): angle of the car (rounded to ANGLE_STEP_SPRITES)
+
+        Returns:
+            pygame.Surface: image of the car to display
+        """
+        num_angle = math.floor(angle / ANGLE_STEP_SPRITES + 0.5) % round(360 / ANGLE_STEP_SPRITES)
+        key = (colors, num_angle, var.SCALE_RESIZE_X)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = scale_image(pygame.transform.rotate(self.get_image(colors), num_angle * ANGLE_STEP_SPRITES), var.SCALE_RESIZE_X)
+            self.sprites[key] = sprite
+            if len(self.sprites) > self.max_size:
+                self.sprites.popitem(last=False)  # We remove the least recently used sprite
+        else:
+            self.sprites.move_to_end(key)
+        return sprite
+
+
+SPRITE_ATLAS = SpriteAtlas()  # Atlas of the images of the cars
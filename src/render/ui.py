@@ -1,5 +1,5 @@
 from data.variables_functions_ui import add_to_rects_blit_ui  # Import the function to add a rect to the list of rects to blit
-from data.variables_functions import resize_window, blit_circuit, change_map, exit_game  # Import functions from variables
+from data.variables_functions import resize_window, blit_circuit, change_map, exit_game, start_islands  # Import functions from variables
 from render.display import show_car_window, erase_car_window, display_text_ui  # Import the function to show the car
 from render.resizing import convert_to_new_window, scale_image  # To convert the coordinates to the new window
 from other.utils import union_rect, add_offset_to_rect  # Import the utils functions
@@ -9,6 +9,10 @@ from menus.settings_menu import SETTINGS  # Import the settings menu
 from menus.garage_menu import GARAGE  # Import the garage menu
 from menus.dice_menu import DICE_MENU  # Import the dice menu
 from render.button import Button  # Import the button
+from game.islands import ISLAND_MODEL  # Islands evolved in worker processes
+from game.population_metrics import POPULATION_METRICS  # Metrics of the population
+from game.surrogate import SURROGATE_MODEL  # Model predicting the scores of the new cars
+from game.speculation import SPECULATION  # New cars created before the end of the generation
 import data.variables as var  # Import the data
 import pygame  # To use pygame
 import time  # To get the time
@@ -178,10 +182,61 @@ def handle_key_press(event):
                     rect_garage.save_new_car_name()  # Save the name of the car
 
     # We change value of settings if necessary
+    writing = nb_cars_button.activated or var.DISPLAY_DICE_MENU  # True if the key is used to write in a button
     if var.DISPLAY_SETTINGS:
         for button in SETTINGS.writing_buttons:
+            writing = writing or button.activated
             if button.activated and button.update_after_key_press(event):  # If the value has been saved
                 setattr(var, button.name, button.variable)  # Change the value of the variable
+    if GARAGE.rectangles:
+        writing = writing or any(rect_garage.name_button.activated for rect_garage in GARAGE.rectangles)
+
+    # We activate or deactivate the turbo mode with the key T
+    if event.key == pygame.K_t and not writing:
+        var.TURBO = not var.TURBO
+        change_turbo_speed(0)
+
+    # We change the speed of the turbo mode with the keys + and - (the turbo mode is activated)
+    if event.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS) and not writing:
+        var.TURBO = True
+        change_turbo_speed(1)
+    if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) and not writing:
+        var.TURBO = True
+        change_turbo_speed(-1)
+
+    # We skip generations with the key F
+    if event.key == pygame.K_f and not writing and var.PLAY:
+        var.FAST_FORWARD = True
+
+    # We activate or deactivate the prediction of the scores of the new cars with the key S
+    if event.key == pygame.K_s and not writing:
+        var.SURROGATE = not var.SURROGATE
+
+    # We activate or deactivate the creation of the next generation in advance with the key A
+    if event.key == pygame.K_a and not writing:
+        var.SPECULATION = not var.SPECULATION
+        if not var.SPECULATION:
+            SPECULATION.stop()
+
+    # We start or stop the islands with the key I
+    if event.key == pygame.K_i and not writing:
+        var.ISLANDS = not var.ISLANDS
+        if var.ISLANDS:
+            start_islands()
+        else:
+            ISLAND_MODEL.stop()
+
+
+def change_turbo_speed(step):
+    """
+    Choose the next or the previous speed of the turbo mode in LIST_TURBO_SPEEDS and reset the number of turns per frame
+
+    Args:
+        step (int): 1 for the next speed, -1 for the previous one, 0 to keep the speed
+    """
+    index = var.LIST_TURBO_SPEEDS.index(var.TURBO_SPEED) + step
+    var.TURBO_SPEED = var.LIST_TURBO_SPEEDS[max(0, min(len(var.LIST_TURBO_SPEEDS) - 1, index))]
+    var.TICKS_PER_FRAME = 1 if var.TURBO_SPEED == 'max' else var.TURBO_SPEED  # The maximum speed is adapted from 1
 
 
 def display(cars=None):
@@ -415,8 +470,9 @@ def display_text():
     Display the text of the UI (time remaining, nb cars, generation, FPS)
     """
     # Time remaining
+    speed = var.TICKS_PER_FRAME if var.TURBO else 1  # Number of turns played per frame
     if var.PLAY and var.ACTUAL_FPS != 0:  # If the simulation is playing we display the time remaining in seconds if the simulation stays at this fps
-        time_remaining = int(var.TICKS_REMAINING / var.ACTUAL_FPS)
+        time_remaining = int(var.TICKS_REMAINING / (var.ACTUAL_FPS * speed))
         var.LAST_TIME_REMAINING.append(time_remaining)
         if len(var.LAST_TIME_REMAINING) > 50:
             var.LAST_TIME_REMAINING.pop(0)
@@ -426,7 +482,11 @@ def display_text():
 
     display_text_ui(f'Tours restants : {var.TICKS_REMAINING} ({time_remaining}s)', convert_to_new_window((1, 20)), var.FONT)
     display_text_ui(f'Nombre de voitures restantes : {var.NB_CARS_ALIVE}', convert_to_new_window((1, 50)), var.FONT)
-    display_text_ui(f'Génération : {var.NUM_GENERATION}', convert_to_new_window((1, 80)), var.FONT)
+    text_generation = f'Génération : {var.NUM_GENERATION}'
+    if POPULATION_METRICS.num_generation:  # Diversity of the previous generation
+        text_generation += f' (diversité : {POPULATION_METRICS.diversity:.2f}, {POPULATION_METRICS.nb_unique} génomes'
+        text_generation += ', convergée)' if POPULATION_METRICS.converged else ')'
+    display_text_ui(text_generation, convert_to_new_window((1, 80)), var.FONT)
 
     # FPS display
     if var.PLAY:
@@ -434,6 +494,18 @@ def display_text():
     else:
         fps = str(int(var.CLOCK.get_fps()))
     display_text_ui('FPS : ' + fps, convert_to_new_window((1, 1)), var.VERY_SMALL_FONT)
+    if var.TURBO:
+        text_turbo = f'Turbo : x{speed} (max)' if var.TURBO_SPEED == 'max' else f'Turbo : x{speed}'
+        display_text_ui(text_turbo, convert_to_new_window((60, 1)), var.VERY_SMALL_FONT)
+    if var.ISLANDS and ISLAND_MODEL.num_island_displayed >= 0:
+        display_text_ui(f'Île {ISLAND_MODEL.num_island_displayed + 1}/{len(ISLAND_MODEL)} ({int(ISLAND_MODEL.cars_per_second())} voitures/s)',
+                        convert_to_new_window((120, 1)), var.VERY_SMALL_FONT)
+    if var.SURROGATE:
+        display_text_ui(f'Prédiction : {SURROGATE_MODEL.nb_rejected} voitures rejetées, {int(100 * SURROGATE_MODEL.accuracy())}% justes',
+                        convert_to_new_window((260, 1)), var.VERY_SMALL_FONT)
+    if var.SPECULATION:
+        display_text_ui(f'Anticipation : {SPECULATION.nb_hits}/{SPECULATION.nb_speculations} générations prévues',
+                        convert_to_new_window((520, 1)), var.VERY_SMALL_FONT)
 
 
 def display_text_mouse():